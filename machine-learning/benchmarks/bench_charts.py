@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for drawing the charts of generate_visualizations.
+
+Builds the chart frames of a synthetic set of roles, skills and salary
+metrics and times render_charts into temporary directories, emptied before
+each of the --repeat runs:
+  - serial:   every chart drawn in this process (how the charts were drawn
+              before the process pool)
+  - parallel: every chart drawn in a process pool of --workers processes
+  - cached:   a second run over the parallel output, where no data changed,
+              so every chart is skipped
+  - preview:  every chart drawn at PREVIEW_DPI in the process pool
+The serial and parallel PNGs must be identical.
+
+Usage:
+    python machine-learning/benchmarks/bench_charts.py [--repeat 3] [--workers 5] [--roles 2000] [--skills 500]
+"""
+
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from harness import argument_parser, best_of  # Puts data_aggregation/ on sys.path
+
+from charts import CHARTS, PREVIEW_DPI, chart_frames, render_charts  # noqa: E402
+
+
+def make_aggregates(roles, skills, seed=0):
+    """(role salary metrics, skill salary metrics, roles, skills) like the ones of a run."""
+    rng = np.random.default_rng(seed)
+
+    def salary_metrics(names):
+        median = np.round(rng.lognormal(11.6, 0.3, len(names)), -2)
+        return pd.DataFrame({'count': rng.integers(1, 60, len(names)), 'median': median}, index=names)
+
+    role_names = [f"Role {i}" for i in range(roles)]
+    skill_names = [f"skill {i}" for i in range(skills)]
+    all_roles = {name: {'open_positions_count': int(count)} for name, count in zip(role_names, rng.zipf(1.5, roles))}
+    all_skills = {name: {'job_postings_count': int(count)} for name, count in zip(skill_names, rng.zipf(1.3, skills))}
+    return salary_metrics(role_names), salary_metrics(skill_names), all_roles, all_skills
+
+
+def time_render(repeat, frames, viz_dir, empty=True, **kwargs):
+    """(best seconds, charts drawn) of render_charts into viz_dir, emptied before each run unless empty is False."""
+    def reset():
+        shutil.rmtree(viz_dir)
+        os.makedirs(viz_dir)
+
+    return best_of(repeat, lambda: render_charts(frames, viz_dir, **kwargs), reset=reset if empty else None)
+
+
+def main():
+    parser = argument_parser('Benchmark chart drawing')
+    parser.add_argument('--workers', type=int, default=len(CHARTS),
+                        help=f'Chart drawing processes (default: {len(CHARTS)})')
+    parser.add_argument('--roles', type=int, default=2000, help='Distinct roles (default: 2000)')
+    parser.add_argument('--skills', type=int, default=500, help='Distinct skills (default: 500)')
+    args = parser.parse_args()
+
+    frames = chart_frames(*make_aggregates(args.roles, args.skills))
+    print(f"{len(frames)} charts, {args.workers} workers")
+
+    with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as parallel_dir, \
+            tempfile.TemporaryDirectory() as preview_dir:
+        serial_seconds, _ = time_render(args.repeat, frames, serial_dir, workers=1)
+        parallel_seconds, _ = time_render(args.repeat, frames, parallel_dir, workers=args.workers)
+        cached_seconds, redrawn = time_render(args.repeat, frames, parallel_dir, empty=False, workers=args.workers)
+        preview_seconds, _ = time_render(args.repeat, frames, preview_dir, workers=args.workers, dpi=PREVIEW_DPI)
+
+        print(f"serial:   {serial_seconds:.3f}s")
+        print(f"parallel: {parallel_seconds:.3f}s ({serial_seconds / parallel_seconds:.1f}x)")
+        print(f"cached:   {cached_seconds:.3f}s ({len(redrawn)} charts redrawn)")
+        print(f"preview:  {preview_seconds:.3f}s ({serial_seconds / preview_seconds:.1f}x)")
+
+        names = [f"{name}.png" for name in frames]
+        _, mismatch, errors = filecmp.cmpfiles(serial_dir, parallel_dir, names, shallow=False)
+        if mismatch or errors or redrawn:
+            print(f"FAIL: charts differ between serial and parallel drawing or were redrawn: {mismatch + errors}")
+            return 1
+    print("OK: charts identical")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
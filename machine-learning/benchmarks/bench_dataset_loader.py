@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark for loading the source datasets from CSV and from their Parquet
+copies.
+
+Each source dataset is enlarged by repeating its rows (free-text values get
+the copy number appended, so they stay distinct), written as a CSV to a
+temporary directory and converted with convert_dataset. Three loads are timed
+per dataset, and the memory of the frames they give is reported:
+  - csv:          pd.read_csv of the whole file (how the scripts loaded them
+                  before the shared loader)
+  - parquet:      read_dataset of the whole file, from the Parquet copy
+  - parquet cols: read_dataset of only the columns the scripts use
+The csv and parquet frames must hold the same values.
+
+Usage:
+    python machine-learning/benchmarks/bench_dataset_loader.py [--copies 20] [--repeat 3]
+"""
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from harness import ML_DIR, argument_parser, best_of  # Puts data_aggregation/ on sys.path
+
+from dataset_loader import DATASET_FILES, convert_dataset, dictionary_columns, read_dataset  # noqa: E402
+
+# The columns the scripts read from each dataset
+USED_COLUMNS = {
+    'linkedin_jobs_filtered.csv': ['title', 'company', 'location', 'date', 'job_description'],
+    'enhanced_jobs_linkedin.csv': ['title', 'job_description', 'salary_range'],
+    'Glassdoor job listings information copy.csv': ['company_rating', 'job_title', 'job_location', 'company_size'],
+    'DataScience_salaries_2024.csv': ['work_year', 'experience_level', 'job_title', 'salary_in_usd', 'company_size'],
+}
+
+
+def enlarge(source, copies):
+    """copies of the rows of source, with the copy number appended to its free-text values."""
+    encoded = set(dictionary_columns(source))
+    free_text = [column for column in source.columns if source[column].dtype.kind == 'O' or
+                 isinstance(source[column].dtype, pd.StringDtype)]
+    frames = []
+    for copy in range(copies):
+        frame = source.copy()
+        for column in free_text:
+            if column not in encoded:
+                frame[column] = frame[column] + f" [{copy}]"
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def megabytes(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def same_values(expected, df):
+    """Whether df holds expected's values, dictionary-encoded columns decoded."""
+    decoded = df.copy()
+    for column in decoded.columns:
+        if isinstance(decoded[column].dtype, pd.CategoricalDtype):
+            decoded[column] = decoded[column].astype(expected[column].dtype)
+    return decoded.equals(expected)
+
+
+def main():
+    parser = argument_parser('Benchmark loading the source datasets from CSV and Parquet')
+    parser.add_argument('--copies', type=int, default=20, help='Times each dataset is repeated (default: 20)')
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in DATASET_FILES:
+            source = pd.read_csv(os.path.join(ML_DIR, name))
+            csv_path = os.path.join(temp_dir, name)
+            enlarge(source, args.copies).to_csv(csv_path, index=False)
+            parquet_path, _ = convert_dataset(csv_path)
+            print(f"{name}: {len(source) * args.copies:,} rows, "
+                  f"{os.path.getsize(csv_path) / 1e6:.1f} MB CSV, {os.path.getsize(parquet_path) / 1e6:.1f} MB Parquet")
+
+            csv_seconds, expected = best_of(args.repeat, lambda: pd.read_csv(csv_path))
+            parquet_seconds, df = best_of(args.repeat, lambda: read_dataset(csv_path))
+            columns_seconds, projected = best_of(args.repeat,
+                                                 lambda: read_dataset(csv_path, columns=USED_COLUMNS[name]))
+            print(f"  csv:          {csv_seconds:.3f}s, {megabytes(expected):.1f} MB")
+            print(f"  parquet:      {parquet_seconds:.3f}s ({csv_seconds / parquet_seconds:.1f}x), "
+                  f"{megabytes(df):.1f} MB")
+            print(f"  parquet cols: {columns_seconds:.3f}s ({csv_seconds / columns_seconds:.1f}x), "
+                  f"{megabytes(projected):.1f} MB")
+            if not same_values(expected, df):
+                print(f"  FAIL: {name} differs between CSV and Parquet")
+                ok = False
+
+    if not ok:
+        return 1
+    print("OK: datasets identical")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
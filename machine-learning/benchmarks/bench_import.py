@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for data_aggregation.
+
+Times a plain `import data_aggregation` in fresh interpreters and fails if the
+median is over the budget, or if the import pulled in spaCy, NLTK or the
+plotting stack (those should only load on first use).
+
+Usage:
+    python machine-learning/benchmarks/bench_import.py [--repeat 5] [--budget 2.0]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from harness import DATA_AGGREGATION_DIR, argument_parser
+
+# Median wall time allowed for `import data_aggregation`, in seconds
+DEFAULT_BUDGET = 2.0
+
+# Modules that must not be loaded by the import itself
+LAZY_MODULES = ['spacy', 'nltk', 'matplotlib', 'seaborn']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import data_aggregation
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def time_import():
+    """Import data_aggregation in a fresh offline interpreter and return the probe result."""
+    env = dict(os.environ, JOB_ANALYSIS_OFFLINE='1')
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=DATA_AGGREGATION_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    # Each repetition times the import in a fresh interpreter; the median is checked
+    parser = argument_parser('Benchmark the import time of data_aggregation', repeat=5)
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help=f'Maximum median import time in seconds (default: {DEFAULT_BUDGET})')
+    args = parser.parse_args()
+
+    # Warm-up run so the first measurement does not include cold .pyc compilation
+    time_import()
+
+    samples = []
+    loaded = set()
+    for _ in range(args.repeat):
+        probe = time_import()
+        samples.append(probe['seconds'])
+        loaded.update(probe['loaded'])
+
+    median = statistics.median(samples)
+    print(f"import data_aggregation: median {median:.3f}s, min {min(samples):.3f}s, "
+          f"max {max(samples):.3f}s over {args.repeat} runs (budget {args.budget:.2f}s)")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: import loaded heavy modules eagerly: {', '.join(sorted(loaded))}")
+        failed = True
+    if median > args.budget:
+        print(f"FAIL: median import time {median:.3f}s is over the {args.budget:.2f}s budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
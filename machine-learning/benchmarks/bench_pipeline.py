@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the extraction and aggregation pipeline.
+
+Times each stage of data_aggregation on the shipped CSVs, reports rows/sec and
+peak RSS, and checks every stage's output against a golden snapshot in
+benchmarks/golden/ so optimizations can be shown to be behavior-preserving.
+A stage without a snapshot fails until one is written with --update-golden.
+
+The snapshots are of the original script: they are written by running the
+stages with --tree on a checkout of its commit (bc330b5), whose older API the
+stages fall back to. The reviewed code is checked against them after
+ACCEPTED_DIFFERENCES undo the changes to its output made on purpose, each
+listed in benchmarks/golden/README.md, and the number of values each one
+changed is reported. A change that alters a stage's output on purpose adds
+to both.
+
+Stages:
+  standardize_title  titles of linkedin_jobs_filtered.csv and the Glassdoor file
+  clean_salary       filter_salaries (salary cleaning + per-role outlier filtering) on the salary_range
+                     column of enhanced_jobs_linkedin.csv (the shipped CSV with salaries)
+  extract_skills     extract_skills_from_text on linkedin_jobs_filtered.csv descriptions
+  salary_metrics     salary metrics of the salaried postings of enhanced_jobs_linkedin.csv, from the
+                     salary sketches of their role and skill aggregates (as a run computes them)
+  pipeline           main() end to end on linkedin_jobs_filtered.csv and the Glassdoor
+                     file, writing to a mongomock database
+  incremental        main() on the salaried postings of enhanced_jobs_linkedin.csv, split
+                     into a LinkedIn and a Glassdoor file: once over both, and once over
+                     the first followed by an --incremental run over both; the two must
+                     give the same Industries document. Further --incremental runs
+                     with one posting's description edited, or its title and company
+                     re-cased and re-spaced, must leave every posting count as is
+
+Each stage runs in a fresh interpreter so its peak RSS is its own. Everything
+runs offline: MongoDB is replaced by mongomock, and spaCy by a blank English
+pipeline, so the snapshots do not depend on the model installed (and cover
+the taxonomy matching but not the skills taken from named entities).
+
+Usage:
+    python machine-learning/benchmarks/bench_pipeline.py [--stage NAME ...] [--repeat 3]
+    git worktree add /tmp/original bc330b5
+    python machine-learning/benchmarks/bench_pipeline.py --tree /tmp/original [--stage NAME ...] --update-golden
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import (BENCHMARKS_DIR, DATA_AGGREGATION_DIR, GLASSDOOR_CSV, LINKEDIN_CSV, ML_DIR, SALARY_CSV,
+                     argument_parser, best_of, describe_difference)
+
+GOLDEN_DIR = os.path.join(BENCHMARKS_DIR, 'golden')
+
+STAGES = ['standardize_title', 'clean_salary', 'extract_skills', 'salary_metrics', 'pipeline', 'incremental']
+
+
+class CheckFailed(Exception):
+    """Raised by a stage whose outputs disagree with each other."""
+
+
+def to_jsonable(value):
+    """Convert stage output to plain JSON types (NaN -> None, numpy -> Python)."""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def is_original(da):
+    """Whether da is the original script, before the pipeline had ProcessingOptions."""
+    return not hasattr(da, 'ProcessingOptions')
+
+
+def standardize_titles(da, titles):
+    if is_original(da):
+        return titles.apply(da.standardize_title)
+    return da.TITLE_NORMALIZER.standardize_column(titles)
+
+
+def filter_salaries(da, titles, salaries):
+    if is_original(da):
+        # As process_job_data did it
+        cleaned = salaries.apply(da.clean_salary)
+        return cleaned.groupby(titles).transform(lambda x: x if len(x) <= 10 else da.remove_salary_outliers(x))
+    return da.filter_salaries(titles, salaries)
+
+
+def run_main(da, config):
+    if is_original(da):
+        # The original main() takes no arguments and reads get_config()
+        da.get_config = lambda: config
+        da.main()
+    else:
+        da.main(config)
+
+
+# Stages: each returns (rows, seconds, output)
+
+def stage_standardize_title(da, repeat):
+    import pandas as pd
+    titles = pd.concat([
+        pd.read_csv(LINKEDIN_CSV)['title'],
+        pd.read_csv(GLASSDOOR_CSV)['job_title']
+    ], ignore_index=True)
+    reset = None if is_original(da) else da.TITLE_NORMALIZER.cache_clear
+    seconds, result = best_of(repeat, lambda: standardize_titles(da, titles), reset=reset)
+    return len(titles), seconds, result.tolist()
+
+
+def stage_clean_salary(da, repeat):
+    import pandas as pd
+    df = pd.read_csv(SALARY_CSV)
+    titles = standardize_titles(da, df['title'])
+    seconds, result = best_of(repeat, lambda: filter_salaries(da, titles, df['salary_range']))
+    return len(df), seconds, result.tolist()
+
+
+def stage_extract_skills(da, repeat):
+    import pandas as pd
+    descriptions = pd.read_csv(LINKEDIN_CSV)['job_description'].tolist()
+    seconds, result = best_of(repeat, lambda: [da.extract_skills_from_text(text) for text in descriptions])
+    return len(descriptions), seconds, result
+
+
+def stage_salary_metrics(da, repeat):
+    """Metrics as a run computes them, from the salary sketches of the role and skill aggregates."""
+    import pandas as pd
+    df = pd.read_csv(SALARY_CSV)
+    df['standardized_title'] = standardize_titles(da, df['title'])
+    df['cleaned_salary'] = filter_salaries(da, df['standardized_title'], df['salary_range'])
+    df = df[df['cleaned_salary'].notna()]
+    salary_data = [
+        {'role': role, 'company': company, 'skills': da.extract_skills_from_text(description), 'salary': salary}
+        for role, company, description, salary in zip(
+            df['standardized_title'], df['company'], df['job_description'], df['cleaned_salary']
+        )
+    ]
+    if is_original(da):
+        seconds, (role_metrics, skill_metrics) = best_of(repeat, lambda: da.calculate_salary_metrics(salary_data))
+        return len(salary_data), seconds, {'roles': role_metrics, 'skills': skill_metrics}
+    from bench_salary_metrics import metrics_sketch
+    seconds, (role_metrics, skill_metrics) = best_of(repeat, lambda: metrics_sketch(salary_data))
+    return len(salary_data), seconds, {'roles': role_metrics.to_dict('index'), 'skills': skill_metrics.to_dict('index')}
+
+
+def mongomock_database():
+    """
+    A mongomock database. mongomock's bulk builder predates the sort argument
+    newer pymongo versions pass for UpdateOne, so it is dropped here.
+    """
+    import inspect
+    import mongomock
+
+    builder = mongomock.collection.BulkOperationBuilder
+    if 'sort' not in inspect.signature(builder.add_update).parameters:
+        add_update = builder.add_update
+
+        def add_update_without_sort(self, *args, sort=None, **kwargs):
+            return add_update(self, *args, **kwargs)
+
+        builder.add_update = add_update_without_sort
+    return mongomock.MongoClient().db
+
+
+def stage_pipeline(da, repeat):
+    rows = sum(len(da.pd.read_csv(path)) for path in (LINKEDIN_CSV, GLASSDOOR_CSV))
+    collections = ['Industries', 'Roles', 'Skills', 'Companies', 'JobPostings', 'SalaryAnalysis']
+    best = None
+    output = None
+    for _ in range(repeat):
+        db = mongomock_database()
+        da.connect_to_mongodb = lambda mongo_uri, db_name: db
+        with tempfile.TemporaryDirectory() as output_dir:
+            config = dict(da.get_config(), linkedin=LINKEDIN_CSV, glassdoor=GLASSDOOR_CSV, mongo_uri=None,
+                          output_dir=output_dir, generate_visualizations=False, skill_cache=False, offline=True)
+            start = time.perf_counter()
+            run_main(da, config)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+        # posted_date falls back to the current time, so it is left out
+        output = {name: [to_jsonable({k: v for k, v in doc.items() if k not in ('_id', 'posted_date')})
+                         for doc in db[name].find()]
+                  for name in collections}
+    return rows, best, output
+
+
+def incremental_sources(output_dir):
+    """
+    The salaried postings of SALARY_CSV as a LinkedIn CSV (first half) and a
+    Glassdoor CSV (second half) in output_dir. Salary outliers are filtered
+    per file, so a run over the first file filters its salaries as a run over
+    both does.
+    """
+    import pandas as pd
+    df = pd.read_csv(SALARY_CSV)
+    half = len(df) // 2
+    linkedin = df.iloc[:half].rename(columns={'salary_range': 'salary'})
+    glassdoor = df.iloc[half:].rename(columns={
+        'title': 'job_title', 'company': 'company_name', 'location': 'job_location',
+        'job_description': 'job_overview', 'salary_range': 'pay_range_glassdoor_est'
+    })
+    paths = os.path.join(output_dir, 'linkedin.csv'), os.path.join(output_dir, 'glassdoor.csv')
+    linkedin.to_csv(paths[0], index=False)
+    glassdoor.to_csv(paths[1], index=False)
+    return paths
+
+
+def relisted_glassdoor_sources(glassdoor_csv, output_dir):
+    """
+    Copies of the Glassdoor CSV of incremental_sources in output_dir, each
+    with its first posting listed again differently: with its description
+    edited, and with its title and company re-cased and re-spaced.
+    Returns {description of the change: path}.
+    """
+    import pandas as pd
+    df = pd.read_csv(glassdoor_csv)
+    edited = df.copy()
+    edited.loc[0, 'job_overview'] = f"{df.loc[0, 'job_overview']} Experience with Kubernetes and Terraform."
+    respaced = df.copy()
+    respaced.loc[0, 'job_title'] = df.loc[0, 'job_title'].upper()
+    respaced.loc[0, 'company_name'] = f"  {'  '.join(df.loc[0, 'company_name'].lower().split())} "
+    paths = {}
+    for change, relisted in (('description edited', edited), ('title and company re-cased and re-spaced', respaced)):
+        paths[change] = os.path.join(output_dir, f"glassdoor_{len(paths)}.csv")
+        relisted.to_csv(paths[change], index=False)
+    return paths
+
+
+def posting_counts(db):
+    """The stored posting counts: of all postings, and per role, company and skill."""
+    return {
+        'JobPostings': db.JobPostings.count_documents({}),
+        'Roles': {doc['role_name']: doc['open_positions_count'] for doc in db.Roles.find()},
+        'Companies': {doc['name']: doc['job_postings'] for doc in db.Companies.find()},
+        'Skills': {doc['skill_name']: doc['job_postings_count'] for doc in db.Skills.find()},
+    }
+
+
+def stage_incremental(da, repeat):
+    with tempfile.TemporaryDirectory() as data_dir:
+        linkedin_csv, glassdoor_csv = incremental_sources(data_dir)
+        rows = sum(len(da.pd.read_csv(path)) for path in (linkedin_csv, glassdoor_csv))
+        # get_config() is replaced by run_main on the original script
+        base_config = da.get_config()
+
+        def run(db, output_dir, **options):
+            da.connect_to_mongodb = lambda mongo_uri, db_name: db
+            config = dict(base_config, linkedin=linkedin_csv, glassdoor=glassdoor_csv, mongo_uri=None,
+                          output_dir=output_dir, generate_visualizations=False, skill_cache=False, offline=True)
+            run_main(da, dict(config, **options))
+
+        def industry(db):
+            return to_jsonable(db.Industries.find_one({}, {'_id': 0}))
+
+        if is_original(da):
+            # No incremental runs: the snapshot is of the full run
+            full = mongomock_database()
+            with tempfile.TemporaryDirectory() as full_dir:
+                seconds, _ = best_of(repeat, lambda: run(full, full_dir))
+            return rows, seconds, {'Industries': industry(full)}
+
+        best = None
+        for _ in range(repeat):
+            full = mongomock_database()
+            split = mongomock_database()
+            with tempfile.TemporaryDirectory() as full_dir, tempfile.TemporaryDirectory() as split_dir:
+                run(full, full_dir)
+                run(split, split_dir, glassdoor=None)
+                start = time.perf_counter()
+                run(split, split_dir, incremental=True)
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            if industry(full) != industry(split):
+                raise CheckFailed("full and incremental runs differ: " +
+                                  describe_difference(industry(full), industry(split), 'Industries'))
+
+            # A posting listed again differently is still the stored one, not a new one
+            counts = posting_counts(split)
+            for change, relisted_csv in relisted_glassdoor_sources(glassdoor_csv, data_dir).items():
+                with tempfile.TemporaryDirectory() as split_dir:
+                    run(split, split_dir, glassdoor=relisted_csv, incremental=True)
+                if posting_counts(split) != counts:
+                    raise CheckFailed(f"an incremental run counted a posting with its {change} again: " +
+                                      describe_difference(counts, posting_counts(split), 'counts'))
+    return rows, best, {'Industries': industry(split)}
+
+
+def accept_first_posting_skills(output):
+    """The first posting of each role shared its list with the role's required_skills (user-013)."""
+    required_skills = {role['role_name']: role['required_skills'] for role in output['Roles']}
+    changed = 0
+    for posting in output['JobPostings']:
+        skills = required_skills.pop(posting['role'], None)
+        if skills is not None and posting['skills_required'] != skills:
+            posting['skills_required'] = skills
+            changed += 1
+    return changed
+
+
+def accept_dropped_field(collection, field):
+    """Undoes the addition of field to the documents of collection."""
+    def accept(output):
+        changed = 0
+        for doc in output[collection]:
+            if doc.pop(field, None) is not None:
+                changed += 1
+        return changed
+    return accept
+
+
+def accept_industry_average_salary(output):
+    """Companies and roles in both sources are merged (user-015), salaries come from the role sketches (user-018)."""
+    industry = output['Industries']
+    if industry['average_salary'] != 149371:
+        return 0
+    industry['average_salary'] = 150580
+    return 1
+
+
+# Differences of the reviewed code's outputs from the original script's, each
+# listed in golden/README.md: {stage: [(description, function undoing it and
+# returning how many values it changed)]}
+ACCEPTED_DIFFERENCES = {
+    'pipeline': [
+        ('JobPostings fingerprint (user-017)', accept_dropped_field('JobPostings', 'fingerprint')),
+        ('JobPostings skills_required of the first posting of a role (user-013)', accept_first_posting_skills),
+        ('Roles salary_source (user-017)', accept_dropped_field('Roles', 'salary_source')),
+    ],
+    'incremental': [
+        ('Industries average_salary (user-015, user-018)', accept_industry_average_salary),
+    ],
+}
+
+
+def snapshot(name, output):
+    """The stored form of a stage's output: whole collections are stored as digests."""
+    if name == 'pipeline':
+        return {collection: {'count': len(docs), 'sha256': digest(docs)} for collection, docs in output.items()}
+    return output
+
+
+STAGE_FUNCTIONS = {
+    'standardize_title': stage_standardize_title,
+    'clean_salary': stage_clean_salary,
+    'extract_skills': stage_extract_skills,
+    'salary_metrics': stage_salary_metrics,
+    'pipeline': stage_pipeline,
+    'incremental': stage_incremental,
+}
+
+
+def run_stage(name, repeat, tree=None):
+    """
+    Child process entry point: run one stage and print its result as JSON.
+    With tree, the stage runs on the data_aggregation of that checkout and its
+    output is left as is; otherwise ACCEPTED_DIFFERENCES are applied to it.
+    """
+    import spacy
+
+    if tree:
+        sys.path.insert(0, tree_dir(tree))
+    # The original script loads spaCy on import, the reviewed code on first use
+    blank = spacy.blank('en')
+    spacy.load = lambda *args, **kwargs: blank
+    import data_aggregation as da
+    if tree and not da.__file__.startswith(tree_dir(tree)):
+        print(json.dumps({'error': f"imported {da.__file__}, not the one in {tree}"}))
+        return 1
+
+    # Keep the stage's own prints out of the JSON result on stdout
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        rows, seconds, output = STAGE_FUNCTIONS[name](da, repeat)
+    except CheckFailed as e:
+        sys.stdout = stdout
+        print(json.dumps({'error': str(e)}))
+        return 1
+    finally:
+        sys.stdout = stdout
+
+    output = to_jsonable(output)
+    accepted = {}
+    if not tree:
+        for description, accept in ACCEPTED_DIFFERENCES.get(name, []):
+            accepted[description] = accept(output)
+
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':  # ru_maxrss is in bytes on macOS
+        peak_rss_kb //= 1024
+    print(json.dumps({'rows': rows, 'seconds': seconds, 'peak_rss_kb': peak_rss_kb,
+                      'output': snapshot(name, output), 'accepted': accepted}))
+    return 0
+
+
+def tree_dir(tree):
+    return os.path.join(os.path.abspath(tree), 'machine-learning', 'data_aggregation')
+
+
+def spawn_stage(name, repeat, tree=None):
+    env = dict(os.environ, PYTHONHASHSEED='0', JOB_ANALYSIS_OFFLINE='1', MPLBACKEND='Agg')
+    command = [sys.executable, os.path.abspath(__file__), '--run-stage', name, '--repeat', str(repeat)]
+    if tree:
+        command += ['--tree', tree]
+    result = subprocess.run(
+        command, cwd=tree_dir(tree) if tree else DATA_AGGREGATION_DIR,
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0:
+        try:
+            return {'error': json.loads(lines[-1])['error']}
+        except (IndexError, ValueError, KeyError, TypeError):
+            return {'error': f"exited with code {result.returncode}"}
+    return json.loads(lines[-1])
+
+
+def golden_path(name):
+    return os.path.join(GOLDEN_DIR, f"{name}.json")
+
+
+def check_golden(name, output, update):
+    path = golden_path(name)
+    if update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'stage': name, 'output': output}, f, indent=1, sort_keys=True)
+            f.write('\n')
+        return 'updated', None
+    if not os.path.exists(path):
+        return 'MISSING', f"no snapshot at {os.path.relpath(path, ML_DIR)}; write it with --update-golden"
+    with open(path) as f:
+        expected = json.load(f)['output']
+    if expected == output:
+        return 'match', None
+    return 'MISMATCH', describe_difference(expected, output)
+
+
+def main():
+    parser = argument_parser('Benchmark the job data pipeline stages on the shipped CSVs')
+    parser.add_argument('--stage', action='append', choices=STAGES, help='Stage to run (default: all)')
+    parser.add_argument('--tree', help='Run the stages on the checkout at this path (of the original script)')
+    parser.add_argument('--update-golden', action='store_true',
+                        help='Write the outputs as golden snapshots (requires --tree)')
+    parser.add_argument('--run-stage', choices=STAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        return run_stage(args.run_stage, args.repeat, args.tree)
+    if args.update_golden and not args.tree:
+        parser.error('--update-golden writes the snapshots of the original script; pass its checkout with --tree')
+    if args.tree and not os.path.isdir(tree_dir(args.tree)):
+        parser.error(f"no machine-learning/data_aggregation in {args.tree}")
+
+    failed = False
+    print(f"{'stage':<18} {'rows':>7} {'seconds':>9} {'rows/sec':>11} {'peak RSS':>10}  golden")
+    for name in args.stage or STAGES:
+        result = spawn_stage(name, args.repeat, args.tree)
+        if 'error' in result:
+            print(f"{name:<18} ERROR: {result['error']}")
+            failed = True
+            continue
+
+        status, difference = check_golden(name, result['output'], args.update_golden)
+        rows_per_sec = result['rows'] / result['seconds'] if result['seconds'] else float('inf')
+        print(f"{name:<18} {result['rows']:>7} {result['seconds']:>9.4f} {rows_per_sec:>11,.0f} "
+              f"{result['peak_rss_kb'] / 1024:>8.1f}MB  {status}")
+        for description, changed in result['accepted'].items():
+            print(f"    accepted: {description}, {changed} changed")
+        if difference:
+            print(f"    {difference}")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
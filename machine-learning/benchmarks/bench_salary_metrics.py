@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the salary metrics on a synthetic salary input.
+
+Generates salary data points (role, skills, salary) like the ones collected
+from job postings, with a share of missing salaries, and times two ways of
+computing the per-role and per-skill metrics:
+  - loop:    a groupby loop calling min/max/mean/median/quantile per group and
+             building the metric dicts by hand (the original
+             calculate_salary_metrics)
+  - sketch:  sketch_salary_metrics reading the metrics frames from the
+             SalarySketch of each role and skill aggregate, the step a
+             pipeline run adds for the metrics
+Building the aggregates, with each posting's salary added to the sketches
+of its role and skills, is part of aggregation in a run, whether or not
+metrics are computed; its time is shown separately.
+Both must give metrics for the same roles and skills. Count, min, max and
+mean are exact, and so are the quantiles of roles and skills with at most
+EXACT_LIMIT salaries; beyond that the quantiles must be within
+RELATIVE_ACCURACY.
+
+Usage:
+    python machine-learning/benchmarks/bench_salary_metrics.py [--salaries 1000000] [--roles 2000] [--repeat 3]
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from harness import argument_parser, best_of, report  # Puts data_aggregation/ on sys.path
+
+from aggregates import RoleAggregate, SkillAggregate  # noqa: E402
+from data_aggregation import sketch_salary_metrics  # noqa: E402
+from salary_sketch import EXACT_LIMIT, RELATIVE_ACCURACY  # noqa: E402
+
+
+def make_salary_data(count, roles, skills, seed=0):
+    """Salary data points with 0-5 skills each; 10% of salaries are missing."""
+    rng = np.random.default_rng(seed)
+    role_names = [f"Role {i}" for i in range(roles)]
+    skill_names = [f"skill {i}" for i in range(skills)]
+    # Skewed popularity, as in real postings
+    role_ids = np.minimum(rng.zipf(1.5, count) - 1, roles - 1)
+    salaries = np.round(rng.lognormal(11.6, 0.35, count), -2)
+    salaries[rng.random(count) < 0.1] = np.nan
+    skill_counts = rng.integers(0, 6, count)
+    skill_ids = np.minimum(rng.zipf(1.3, skill_counts.sum()) - 1, skills - 1)
+    bounds = np.concatenate([[0], np.cumsum(skill_counts)])
+    return [
+        {'role': role_names[role_ids[i]], 'skills': [skill_names[s] for s in skill_ids[bounds[i]:bounds[i + 1]]],
+         'salary': float(salaries[i])}
+        for i in range(count)
+    ]
+
+
+def metrics_loop(salary_data):
+    """The original calculate_salary_metrics: one pass of pandas calls per group."""
+    salary_df = pd.DataFrame(salary_data)
+    role_salary_metrics = {}
+    skill_salary_metrics = {}
+    for role, group in salary_df.groupby('role'):
+        salaries = group['salary'].dropna()
+        if len(salaries) >= 3:
+            role_salary_metrics[role] = {
+                'count': len(salaries), 'min': salaries.min(), 'max': salaries.max(), 'mean': salaries.mean(),
+                'median': salaries.median(), 'p25': salaries.quantile(0.25), 'p75': salaries.quantile(0.75)
+            }
+    exploded_df = salary_df.explode('skills')
+    exploded_df = exploded_df[exploded_df['skills'].notna()]
+    for skill, group in exploded_df.groupby('skills'):
+        salaries = group['salary'].dropna()
+        if len(salaries) >= 3:
+            skill_salary_metrics[skill] = {
+                'count': len(salaries), 'min': salaries.min(), 'max': salaries.max(), 'mean': salaries.mean(),
+                'median': salaries.median(), 'p25': salaries.quantile(0.25), 'p75': salaries.quantile(0.75)
+            }
+    return role_salary_metrics, skill_salary_metrics
+
+
+def sketch_aggregates(salary_data):
+    """Role and skill aggregates (name -> aggregate) of the salary data points, as a pipeline run builds them."""
+    roles = {}
+    skills = {}
+    for point in salary_data:
+        role, salary = point['role'], point['salary']
+        if role not in roles:
+            roles[role] = RoleAggregate(role)
+        roles[role].add_posting('Tech', None, point['skills'], salary)
+        for skill in point['skills']:
+            if skill not in skills:
+                skills[skill] = SkillAggregate(skill)
+            skills[skill].add_posting('Tech', role, salary)
+    return roles, skills
+
+
+def metrics_sketch(salary_data):
+    """Salary metrics as a pipeline run computes them, from the sketches of the role and skill aggregates."""
+    roles, skills = sketch_aggregates(salary_data)
+    return sketch_salary_metrics(roles), sketch_salary_metrics(skills)
+
+
+def same_metrics(expected, frame):
+    """
+    Whether a metrics frame has the rows of a name -> metrics dict, in the
+    same order, with equal values (quantiles within RELATIVE_ACCURACY past
+    EXACT_LIMIT salaries).
+    """
+    if list(frame.index) != list(expected):
+        return False
+    values = pd.DataFrame.from_dict(expected, orient='index')[frame.columns]
+    exact = (values['count'] <= EXACT_LIMIT).to_numpy()
+    if not np.allclose(values[exact].to_numpy(dtype=float), frame[exact].to_numpy(dtype=float), rtol=1e-12):
+        return False
+    sketched = ~exact
+    for column in frame.columns:
+        rtol = RELATIVE_ACCURACY if column in ('median', 'p25', 'p75') else 1e-12
+        if not np.allclose(values.loc[sketched, column].to_numpy(dtype=float),
+                           frame.loc[sketched, column].to_numpy(dtype=float), rtol=rtol):
+            return False
+    return True
+
+
+def main():
+    parser = argument_parser('Benchmark salary metric computation')
+    parser.add_argument('--salaries', type=int, default=1_000_000, help='Salary data points (default: 1000000)')
+    parser.add_argument('--roles', type=int, default=2000, help='Distinct roles (default: 2000)')
+    parser.add_argument('--skills', type=int, default=500, help='Distinct skills (default: 500)')
+    args = parser.parse_args()
+
+    salary_data = make_salary_data(args.salaries, args.roles, args.skills)
+    print(f"{len(salary_data):,} salary data points, {args.roles} roles, {args.skills} skills")
+
+    build_seconds, (roles, skills) = best_of(args.repeat, lambda: sketch_aggregates(salary_data))
+    print(f"building the aggregates: {build_seconds:.3f}s (part of aggregation, not compared)")
+
+    loop_seconds, (loop_roles, loop_skills) = best_of(args.repeat, lambda: metrics_loop(salary_data))
+    sketch_seconds, (role_metrics, skill_metrics) = best_of(
+        args.repeat, lambda: (sketch_salary_metrics(roles), sketch_salary_metrics(skills)))
+    return report(('loop', loop_seconds, f" ({len(loop_roles)} roles, {len(loop_skills)} skills)"),
+                  ('sketch', sketch_seconds, ''),
+                  same_metrics(loop_roles, role_metrics) and same_metrics(loop_skills, skill_metrics),
+                  'salary metrics')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark for salary cleaning and per-role outlier filtering.
+
+Generates salary texts like the ones in job postings (annual ranges, hourly
+rates, single figures, "competitive" and missing values) for a set of roles
+and times two ways of producing the filtered salaries:
+  - apply:      clean_salary per row through Series.apply, then
+                remove_salary_outliers through groupby().transform with a
+                callback per role (the implementation before the vectorized one)
+  - vectorized: clean_salary_column and filter_salary_outliers
+Both must give the same salaries.
+
+Usage:
+    python machine-learning/benchmarks/bench_salary_normalizer.py [--postings 1000000] [--roles 2000] [--repeat 3]
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from harness import argument_parser, best_of, report  # Puts data_aggregation/ on sys.path
+
+from salary_normalizer import (  # noqa: E402
+    MIN_ROLE_POSTINGS, clean_salary, clean_salary_column, filter_salary_outliers, remove_salary_outliers
+)
+
+
+def make_salary_texts(count, roles, distinct, seed=0):
+    """(roles, salary texts) of count postings, drawing from `distinct` different salary texts."""
+    rng = np.random.default_rng(seed)
+    low = np.round(rng.lognormal(11.4, 0.4, distinct), -3).astype(int)
+    high = low + np.round(rng.uniform(0, 40000, distinct), -3).astype(int)
+    texts = []
+    for i in range(distinct):
+        kind = i % 6
+        if kind == 0:
+            texts.append(f"${low[i]:,} - ${high[i]:,} a year")
+        elif kind == 1:
+            texts.append(f"${low[i] / 2080:.2f} - ${high[i] / 2080:.2f} per hour")
+        elif kind == 2:
+            texts.append(f"{low[i] / 2080:.0f}")
+        elif kind == 3:
+            texts.append(f"Up to ${high[i]:,}")
+        elif kind == 4:
+            texts.append('Competitive')
+        else:
+            texts.append(f"${low[i] // 1000}K-${high[i] // 1000}K (Employer est.)")
+    texts.append(None)
+
+    role_names = np.array([f"Role {i}" for i in range(roles)], dtype=object)
+    # Skewed popularity, as in real postings
+    role_ids = np.minimum(rng.zipf(1.5, count) - 1, roles - 1)
+    text_ids = rng.integers(0, len(texts), count)
+    return pd.Series(role_names[role_ids]), pd.Series(np.array(texts, dtype=object)[text_ids])
+
+
+def filter_apply(roles, salaries):
+    df = pd.DataFrame({'role': roles, 'cleaned_salary': salaries.apply(clean_salary)})
+    return df.groupby('role')['cleaned_salary'].transform(
+        lambda x: x if len(x) <= MIN_ROLE_POSTINGS else remove_salary_outliers(x)
+    )
+
+
+def filter_vectorized(roles, salaries):
+    return filter_salary_outliers(roles, clean_salary_column(salaries))
+
+
+def main():
+    parser = argument_parser('Benchmark salary cleaning and outlier filtering')
+    parser.add_argument('--postings', type=int, default=1_000_000, help='Job postings (default: 1000000)')
+    parser.add_argument('--roles', type=int, default=2000, help='Distinct roles (default: 2000)')
+    parser.add_argument('--distinct', type=int, default=20000, help='Distinct salary texts (default: 20000)')
+    args = parser.parse_args()
+
+    roles, salaries = make_salary_texts(args.postings, args.roles, args.distinct)
+    print(f"{len(salaries):,} postings, {args.roles} roles, {args.distinct:,} distinct salary texts")
+
+    apply_seconds, expected = best_of(args.repeat, lambda: filter_apply(roles, salaries))
+    vectorized_seconds, result = best_of(args.repeat, lambda: filter_vectorized(roles, salaries))
+    return report(('apply', apply_seconds, f" ({expected.notna().sum():,} salaries kept)"),
+                  ('vectorized', vectorized_seconds, ''),
+                  expected.astype(np.float64).equals(result), 'salaries')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark for handing descriptions to worker processes: pickled with each
+partition, or through a memory-mapped SharedTexts file.
+
+Generates job descriptions of a few KB each, splits them into
+PARTITIONS_PER_WORKER partitions per worker as process_job_frame does, and
+has a process pool read every description of its partitions (counting words,
+in place of skill extraction) in two ways:
+  - pickled: each partition's descriptions are pickled to the worker (how
+             partitions were sent before SharedTexts)
+  - shared:  the descriptions are written once with SharedTexts.create and
+             each worker is sent only the file path and its range of rows
+For each dataset size the wall time and the largest private (anonymous)
+RSS of a worker at the end of a task, while it still holds its partition,
+are reported; pages of the mapped file are shared page cache and not
+counted. With shared texts the worker RSS should stay flat as the dataset
+grows. Both must count the same words. Each pool run is repeated --repeat
+times and the best time is reported.
+
+Usage:
+    python machine-learning/benchmarks/bench_shared_texts.py [--repeat 3] [--postings 20000 80000] [--workers 4]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from harness import argument_parser, best_of  # Puts data_aggregation/ on sys.path
+
+from data_aggregation import PARTITIONS_PER_WORKER  # noqa: E402
+from shared_texts import SharedTexts  # noqa: E402
+
+WORDS = ('python sql machine learning data pipelines cloud aws experience team build models '
+         'analytics spark kubernetes docker communication stakeholders requirements').split()
+
+
+def make_descriptions(count, words=400, seed=0):
+    """count descriptions of about `words` words each; every 50th is missing."""
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array(WORDS, dtype=object)
+    descriptions = [' '.join(vocabulary[rng.integers(0, len(vocabulary), words)]) for _ in range(count)]
+    for i in range(0, count, 50):
+        descriptions[i] = None
+    return descriptions
+
+
+def anonymous_rss():
+    """Private resident memory of this process in KB (RssAnon; Linux only)."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1])
+    return 0
+
+
+def count_words(descriptions):
+    """Process pool entry point: words in the descriptions, and this worker's pid and RSS (KB)."""
+    words = sum(len(text.split()) for text in descriptions if text)
+    return words, os.getpid(), anonymous_rss()
+
+
+def run_pool(repeat, partitions, workers):
+    """(best seconds, words counted, largest worker RSS in MB of the last run) of counting the words in a pool."""
+    def count():
+        # Spawned, so the workers do not start with a copy of this process's descriptions
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            return list(executor.map(count_words, partitions))
+
+    elapsed, results = best_of(repeat, count)
+    peak_rss = max(rss for _, _, rss in results)
+    return elapsed, sum(words for words, _, _ in results), peak_rss / 1024
+
+
+def main():
+    parser = argument_parser('Benchmark sending descriptions to worker processes')
+    parser.add_argument('--postings', type=int, nargs='+', default=[20000, 80000],
+                        help='Dataset sizes to run (default: 20000 80000)')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes (default: 4)')
+    args = parser.parse_args()
+
+    ok = True
+    for count in args.postings:
+        descriptions = make_descriptions(count)
+        partition_count = min(count, args.workers * PARTITIONS_PER_WORKER)
+        bounds = np.linspace(0, count, partition_count + 1, dtype=int)
+        print(f"{count:,} descriptions, {partition_count} partitions, {args.workers} workers")
+
+        pickled = [descriptions[bounds[i]:bounds[i + 1]] for i in range(partition_count)]
+        pickled_seconds, pickled_words, pickled_rss = run_pool(args.repeat, pickled, args.workers)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            start = time.perf_counter()
+            shared = SharedTexts.create(descriptions, os.path.join(temp_dir, 'descriptions.arrow'))
+            create_seconds = time.perf_counter() - start
+            ranges = [shared[bounds[i]:bounds[i + 1]] for i in range(partition_count)]
+            shared_seconds, shared_words, shared_rss = run_pool(args.repeat, ranges, args.workers)
+
+        print(f"  pickled: {pickled_seconds:.3f}s, worker RSS {pickled_rss:.0f} MB")
+        print(f"  shared:  {shared_seconds:.3f}s (+{create_seconds:.3f}s to write), worker RSS {shared_rss:.0f} MB")
+        if pickled_words != shared_words:
+            print(f"  FAIL: word counts differ ({pickled_words} vs {shared_words})")
+            ok = False
+
+    if not ok:
+        return 1
+    print("OK: word counts identical")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
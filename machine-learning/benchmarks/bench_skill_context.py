@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the skill-context check in extract_skills_from_text.
+
+Builds long descriptions by concatenating job_description values from the
+shipped LinkedIn CSV and collects every word-bounded skill mention in them.
+It then times two ways of asking "is a skill indicator within 75 chars" for
+every mention:
+  - window: slice the ±75 char context and test each indicator with `in`
+  - index:  indicator offsets collected from the same automaton pass that
+            finds the skills, then a bisect per mention
+Both the per-mention answers and the resulting step 1 confidences must be
+identical.
+
+Usage:
+    python machine-learning/benchmarks/bench_skill_context.py [--copies 20] [--repeat 3]
+"""
+
+import sys
+
+import pandas as pd
+
+from harness import LINKEDIN_CSV, argument_parser, best_of, report  # Puts data_aggregation/ on sys.path
+
+from skill_matcher import PhraseIndex, word_bounded_spans  # noqa: E402
+from skill_taxonomy import get_skill_taxonomy  # noqa: E402
+
+
+def load_long_descriptions(copies, count):
+    """Descriptions made of `copies` consecutive postings each, lowercased."""
+    df = pd.read_csv(LINKEDIN_CSV)
+    descriptions = [d.lower() for d in df['job_description'].dropna().astype(str)]
+    long_descriptions = []
+    for i in range(count):
+        parts = [descriptions[(i + j) % len(descriptions)] for j in range(copies)]
+        long_descriptions.append('\n\n'.join(parts))
+    return long_descriptions
+
+
+def skill_mentions(text, taxonomy, occurrences):
+    """Word-bounded (skill, start, end) mentions in the order step 1 visits them."""
+    mentions = []
+    for skill in taxonomy.common_skills:
+        key = skill.lower()
+        for start, end in word_bounded_spans(text, key, occurrences.get(key, [])):
+            mentions.append((skill, start, end))
+    return mentions
+
+
+def context_flags_window(text, taxonomy, occurrences, mentions):
+    indicators = taxonomy.skill_indicators
+    flags = []
+    for _, start, end in mentions:
+        context = text[max(0, start - 75):min(len(text), end + 75)]
+        flags.append(any(indicator in context for indicator in indicators))
+    return flags
+
+
+def context_flags_index(text, taxonomy, occurrences, mentions):
+    indicators = PhraseIndex(occurrences, taxonomy.skill_indicators)
+    return [indicators.any_within(start - 75, end + 75) for _, start, end in mentions]
+
+
+def step1_confidences(mentions, flags):
+    """Step 1 scoring: up to 3 for mentions, +2 if any mention has an indicator nearby."""
+    counts = {}
+    has_context = {}
+    for (skill, _, _), flag in zip(mentions, flags):
+        counts[skill] = counts.get(skill, 0) + 1
+        has_context[skill] = has_context.get(skill, False) or flag
+    return {skill: min(count, 3) + (2 if has_context[skill] else 0) for skill, count in counts.items()}
+
+
+def main():
+    parser = argument_parser('Benchmark the skill indicator context check')
+    parser.add_argument('--copies', type=int, default=20, help='Postings concatenated per description (default: 20)')
+    parser.add_argument('--count', type=int, default=50, help='Number of long descriptions (default: 50)')
+    args = parser.parse_args()
+
+    taxonomy = get_skill_taxonomy()
+    texts = load_long_descriptions(args.copies, args.count)
+    # The automaton scan is step 1's skill matching either way, so it is done once up front
+    scans = [taxonomy.matcher.scan(text) for text in texts]
+    mentions = [skill_mentions(text, taxonomy, scan) for text, scan in zip(texts, scans)]
+    avg_chars = sum(len(text) for text in texts) / len(texts)
+    avg_mentions = sum(len(m) for m in mentions) / len(mentions)
+    print(f"{len(texts)} descriptions, {avg_chars:,.0f} chars and {avg_mentions:,.0f} skill mentions on average")
+
+    def run(method):
+        return lambda: [method(text, taxonomy, scan, m) for text, scan, m in zip(texts, scans, mentions)]
+
+    window_time, window_flags = best_of(args.repeat, run(context_flags_window))
+    index_time, index_flags = best_of(args.repeat, run(context_flags_index))
+
+    window_confidences = [step1_confidences(m, f) for m, f in zip(mentions, window_flags)]
+    index_confidences = [step1_confidences(m, f) for m, f in zip(mentions, index_flags)]
+    return report(('window scan', window_time, ''), ('bisect index', index_time, ''),
+                  window_flags == index_flags and window_confidences == index_confidences,
+                  'context checks and confidences')
+
+if __name__ == '__main__':
+    sys.exit(main())
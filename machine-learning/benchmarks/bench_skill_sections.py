@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the skill-section step of extract_skills_from_text.
+
+Takes the longest job_description values from the shipped CSVs, plus long
+descriptions made by concatenating consecutive postings, and times two ways
+of finding the text after skill headings and "experience with"-style phrases:
+  - regex:     the four lazy DOTALL patterns, one finditer pass each
+  - segmenter: DescriptionSections, which finds all section breaks in one
+               pass and resolves each segment end with a bisect
+Both the segments and the list items split from them must be identical.
+Reports total time and the worst time for a single posting.
+
+Usage:
+    python machine-learning/benchmarks/bench_skill_sections.py [--longest 50] [--copies 20] [--repeat 3]
+"""
+
+import re
+import sys
+
+import pandas as pd
+
+from harness import LINKEDIN_CSV, SALARY_CSV, argument_parser, best_of_each, report  # Puts data_aggregation/ on sys.path
+
+from description_sections import DescriptionSections, split_items  # noqa: E402
+
+DESCRIPTION_CSVS = [LINKEDIN_CSV, SALARY_CSV]
+
+# Step 4 patterns as they were before the segmenter
+SKILL_SECTION_PATTERNS = [
+    r'(?:technical skills|skills & expertise|technologies|tech stack)(?:[\s:]+)(.*?)(?:\n\n|\n\w+:|$)',
+    r'(?:experience|expertise) (?:with|in)(?:[\s:]+)(.*?)(?:\.|$)',
+    r'(?:proficiency|proficient) (?:with|in)(?:[\s:]+)(.*?)(?:\.|$)',
+    r'(?:requirements|qualifications)(?:[\s:]*)(.*?)(?:\n\n|\n\w+:|$)'
+]
+
+
+def load_descriptions(longest, copies):
+    """The `longest` longest descriptions, and as many made of `copies` postings each, lowercased."""
+    descriptions = []
+    for path in DESCRIPTION_CSVS:
+        descriptions.extend(d.lower() for d in pd.read_csv(path)['job_description'].dropna().astype(str))
+    descriptions.sort(key=len, reverse=True)
+
+    concatenated = []
+    for i in range(longest):
+        parts = [descriptions[(i + j) % len(descriptions)] for j in range(copies)]
+        concatenated.append('\n\n'.join(parts))
+    return descriptions[:longest] + concatenated
+
+
+def items_regex(text):
+    items = []
+    for pattern in SKILL_SECTION_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE | re.DOTALL):
+            items.append(re.split(r',|\n|•|-|;|\|', match.group(1).lower()))
+    return items
+
+
+def items_segmenter(text):
+    return [split_items(section.lower()) for section in DescriptionSections(text).skill_sections()]
+
+
+def main():
+    parser = argument_parser('Benchmark skill-section segmentation')
+    parser.add_argument('--longest', type=int, default=50, help='Longest shipped descriptions to use (default: 50)')
+    parser.add_argument('--copies', type=int, default=20, help='Postings per concatenated description (default: 20)')
+    args = parser.parse_args()
+
+    texts = load_descriptions(args.longest, args.copies)
+    print(f"{len(texts)} descriptions, longest {max(len(t) for t in texts):,} chars, "
+          f"{sum(len(t) for t in texts) / len(texts):,.0f} on average")
+
+    regex_total, regex_worst, regex_items = best_of_each(args.repeat, items_regex, texts)
+    segmenter_total, segmenter_worst, segmenter_items = best_of_each(args.repeat, items_segmenter, texts)
+    return report(('regex', regex_total, f" total, worst posting {regex_worst * 1000:.2f}ms"),
+                  ('segmenter', segmenter_total, f" total, worst posting {segmenter_worst * 1000:.2f}ms"),
+                  regex_items == segmenter_items, 'skill sections and list items')
+
+if __name__ == '__main__':
+    sys.exit(main())
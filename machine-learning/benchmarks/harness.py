@@ -0,0 +1,107 @@
+"""
+Timing and equivalence harness shared by the benchmark scripts.
+
+Each script times a baseline implementation (usually the code as it was
+before an optimization) against the current one on the same input, and
+fails unless both give identical results. Importing this module puts
+data_aggregation/ on sys.path so the scripts can import the pipeline
+modules directly.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_DIR = os.path.dirname(BENCHMARKS_DIR)
+DATA_AGGREGATION_DIR = os.path.join(ML_DIR, 'data_aggregation')
+
+# The shipped CSVs the benchmarks run on
+LINKEDIN_CSV = os.path.join(ML_DIR, 'linkedin_jobs_filtered.csv')
+GLASSDOOR_CSV = os.path.join(ML_DIR, 'Glassdoor job listings information copy.csv')
+SALARY_CSV = os.path.join(ML_DIR, 'enhanced_jobs_linkedin.csv')
+
+if DATA_AGGREGATION_DIR not in sys.path:
+    sys.path.insert(0, DATA_AGGREGATION_DIR)
+
+
+def argument_parser(description, repeat=3):
+    """An argument parser with the --repeat option every benchmark takes."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--repeat', type=int, default=repeat,
+                        help=f'Timing repetitions, best is reported (default: {repeat})')
+    return parser
+
+
+def best_of(repeat, func, reset=None):
+    """Run func `repeat` times and return (best seconds, last result)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def best_of_each(repeat, func, items):
+    """
+    Run func on every item `repeat` times over and return (best total seconds,
+    worst seconds for a single item in that run, results).
+    """
+    best = None
+    for _ in range(repeat):
+        results = []
+        worst = 0.0
+        total_start = time.perf_counter()
+        for item in items:
+            start = time.perf_counter()
+            results.append(func(item))
+            worst = max(worst, time.perf_counter() - start)
+        total = time.perf_counter() - total_start
+        if best is None or total < best[0]:
+            best = (total, worst, results)
+    return best
+
+
+def report(baseline, current, identical, what):
+    """
+    Print the times of the baseline and current implementations, each a
+    (name, seconds, details) tuple, and whether they gave identical `what`.
+    Returns the exit code: 1 if the results differ.
+    """
+    width = max(len(baseline[0]), len(current[0])) + 1
+    name, seconds, details = baseline
+    print(f"{name + ':':<{width}} {seconds:.3f}s{details}")
+    name, seconds, details = current
+    print(f"{name + ':':<{width}} {seconds:.3f}s{details} ({baseline[1] / seconds:.1f}x)")
+    if not identical:
+        print(f"FAIL: {what} differ between the two implementations")
+        return 1
+    print(f"OK: {what} identical")
+    return 0
+
+
+def describe_difference(expected, actual, path='output'):
+    """Short description of the first difference between two JSON values."""
+    if type(expected) is not type(actual):
+        return f"{path}: expected {type(expected).__name__}, got {type(actual).__name__}"
+    if isinstance(expected, dict):
+        for key in sorted(set(expected) | set(actual)):
+            if key not in actual:
+                return f"{path}: missing key {key!r}"
+            if key not in expected:
+                return f"{path}: unexpected key {key!r}"
+            if expected[key] != actual[key]:
+                return describe_difference(expected[key], actual[key], f"{path}[{key!r}]")
+    if isinstance(expected, list):
+        if len(expected) != len(actual):
+            return f"{path}: expected {len(expected)} items, got {len(actual)}"
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            if a != b:
+                return describe_difference(a, b, f"{path}[{i}]")
+    return f"{path}: expected {expected!r}, got {actual!r}"
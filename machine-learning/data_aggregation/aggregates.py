@@ -0,0 +1,353 @@
+"""
+Per-entity aggregates built while processing job postings.
+
+RoleAggregate, SkillAggregate and CompanyAggregate accumulate the postings
+of one role, skill or company. Membership lists (industries, companies,
+roles, locations, skills) are insertion-ordered sets backed by dict keys,
+so adding a posting is O(1) instead of a scan of a growing list, and the
+classes use __slots__ to keep per-entity memory small. merge() combines the
+aggregates of the same entity from consecutive parts of the data, and
+to_document() gives the document stored in MongoDB (to_increment() the
+update adding the postings to a stored one). Roles and skills keep their
+salaries in a SalarySketch. PartialAggregate holds all aggregates of one
+part of the data (a partition, CSV chunk or source).
+"""
+
+import numpy as np
+
+from salary_sketch import SalarySketch
+
+# Source whose posted salary range and median take precedence when merged
+# with the same role from another source
+PREFERRED_SALARY_SOURCE = 'Glassdoor'
+
+
+def restore_missing(value):
+    """
+    Map NaN back to the np.nan singleton. pandas hands out np.nan for missing
+    cells, so membership checks treat all of them as one value; NaNs
+    unpickled from worker processes are separate float objects.
+    """
+    if isinstance(value, float) and np.isnan(value):
+        return np.nan
+    return value
+
+
+def _add_members(members, values):
+    """Add the truthy values to an ordered set (dict keys), keeping first-seen order."""
+    for value in values:
+        if value and value not in members:
+            members[value] = None
+
+
+def _restored_members(members):
+    return dict.fromkeys(restore_missing(value) for value in members)
+
+
+class _Aggregate:
+    __slots__ = ()
+
+    # Slots holding values compared by membership, restored after unpickling
+    _member_slots = ()
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        for name in self._member_slots:
+            setattr(self, name, _restored_members(getattr(self, name)))
+
+
+class CompanyAggregate(_Aggregate):
+    """Postings, roles and locations of one company."""
+
+    __slots__ = ('name', 'industry', 'job_postings', 'roles', 'locations', 'details')
+    _member_slots = ('roles', 'locations')
+
+    def __init__(self, name, industry, details=None):
+        self.name = name
+        self.industry = industry  # Industry of the first posting
+        self.job_postings = 0
+        self.roles = {}
+        self.locations = {}
+        self.details = details or {}  # Source-specific fields (revenue, size, ...)
+
+    def add_posting(self, role_name, location):
+        self.job_postings += 1
+        if role_name and role_name not in self.roles:
+            self.roles[role_name] = None
+        if location and location not in self.locations:
+            self.locations[location] = None
+
+    def merge(self, other):
+        """
+        Add the postings of a later part of the data. Detail fields this
+        company has no value for (e.g. Glassdoor fields for a company first
+        seen on LinkedIn) are taken from other.
+        """
+        self.job_postings += other.job_postings
+        _add_members(self.roles, other.roles)
+        _add_members(self.locations, other.locations)
+        for field, value in other.details.items():
+            self.details.setdefault(field, value)
+        return self
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.industry = restore_missing(self.industry)
+
+    def to_document(self):
+        document = {
+            'name': self.name,
+            'industry': self.industry,
+            'job_postings': self.job_postings,
+            'roles': list(self.roles),
+            'locations': list(self.locations)
+        }
+        document.update(self.details)
+        return document
+
+    def to_increment(self):
+        """MongoDB update adding these postings to the stored company document (inserted if new)."""
+        return {
+            '$setOnInsert': {'industry': self.industry, **self.details},
+            '$inc': {'job_postings': self.job_postings},
+            '$addToSet': {'roles': {'$each': list(self.roles)}, 'locations': {'$each': list(self.locations)}}
+        }
+
+
+class RoleAggregate(_Aggregate):
+    """
+    Postings of one role from one source. required_skills are the skills of
+    its postings, in order of first mention.
+    """
+
+    __slots__ = ('role_name', 'source', 'industries', 'open_positions_count', 'top_hiring_companies',
+                 'required_skills', 'skill_set', 'description', 'salary_range', 'median_salary',
+                 'calculated_salary', 'salary_sketch')
+    _member_slots = ('industries', 'top_hiring_companies')
+
+    def __init__(self, role_name, source=None):
+        self.role_name = role_name
+        self.source = source  # Source of salary_range and median_salary
+        self.industries = {}
+        self.open_positions_count = 0
+        self.top_hiring_companies = {}
+        self.required_skills = None
+        self.skill_set = set()
+        self.description = None
+        self.salary_range = None
+        self.median_salary = None
+        self.calculated_salary = None
+        self.salary_sketch = SalarySketch()
+
+    def add_posting(self, industry, company, skills, salary_info=None, salary_range=None, median_salary=None):
+        self.open_positions_count += 1
+        self.salary_sketch.add(salary_info)
+        if company and company not in self.top_hiring_companies:
+            self.top_hiring_companies[company] = None
+
+        if self.required_skills is None:
+            # The first posting sets the role's industry, skills, description and salary fields
+            self.industries[industry] = None
+            self.required_skills = list(skills)
+            self.skill_set = set(skills)
+            self.description = (f"{self.role_name}s are responsible for "
+                                f"{', '.join(skills[:3]) if skills else 'technical tasks'} and other technical tasks.")
+            self.salary_range = salary_range or None
+            self.median_salary = median_salary or None
+            self.calculated_salary = salary_info or None
+            return
+
+        if industry and industry not in self.industries:
+            self.industries[industry] = None
+        self.add_skills(skills)
+
+    def add_skills(self, skills):
+        for skill in skills:
+            if skill not in self.skill_set:
+                self.skill_set.add(skill)
+                self.required_skills.append(skill)
+
+    def merge(self, other):
+        """
+        Add the postings of a later part of the data. The salary range and
+        median of the first PREFERRED_SALARY_SOURCE part replace those of
+        another source.
+        """
+        if other.source == PREFERRED_SALARY_SOURCE and self.source != other.source:
+            self.salary_range = other.salary_range or self.salary_range
+            self.median_salary = other.median_salary or self.median_salary
+            self.source = other.source
+        self.open_positions_count += other.open_positions_count
+        _add_members(self.top_hiring_companies, other.top_hiring_companies)
+        _add_members(self.industries, other.industries)
+        self.add_skills(other.required_skills)
+        self.salary_sketch.merge(other.salary_sketch)
+        return self
+
+    def to_document(self):
+        document = {
+            'role_name': self.role_name,
+            'industries': list(self.industries),
+            'open_positions_count': self.open_positions_count,
+            'top_hiring_companies': list(self.top_hiring_companies),
+            'required_skills': self.required_skills,
+            'description': self.description
+        }
+        if self.source is not None:
+            document['salary_source'] = self.source
+        if self.salary_range is not None:
+            document['salary_range'] = self.salary_range
+        if self.median_salary is not None:
+            document['median_salary'] = self.median_salary
+        if self.calculated_salary is not None:
+            document['calculated_salary'] = self.calculated_salary
+        if self.salary_sketch.count:
+            document['salary_sketch'] = self.salary_sketch.to_document()
+        return document
+
+    def to_increment(self):
+        """MongoDB update adding these postings to the stored role document (inserted if new)."""
+        on_insert = {'description': self.description}
+        for field, value in (('salary_source', self.source), ('salary_range', self.salary_range),
+                             ('median_salary', self.median_salary), ('calculated_salary', self.calculated_salary)):
+            if value is not None:
+                on_insert[field] = value
+        return {
+            '$setOnInsert': on_insert,
+            '$inc': {'open_positions_count': self.open_positions_count},
+            '$addToSet': {
+                'industries': {'$each': list(self.industries)},
+                'top_hiring_companies': {'$each': list(self.top_hiring_companies)},
+                'required_skills': {'$each': list(self.required_skills)}
+            }
+        }
+
+    def to_salary_override(self):
+        """
+        MongoDB update giving a stored role document whose salary_source is
+        another source the salary range and median of these postings, as merge
+        does; None unless they are from PREFERRED_SALARY_SOURCE.
+        """
+        if self.source != PREFERRED_SALARY_SOURCE:
+            return None
+        fields = {field: getattr(self, field) for field in ('salary_range', 'median_salary') if getattr(self, field)}
+        update = {'$set': dict(fields, salary_source=self.source)}
+        if fields:
+            # The postings' fields are no longer ones taken from the salary metrics
+            update['$pull'] = {'metric_salary_fields': {'$in': list(fields)}}
+        return update
+
+
+class SkillAggregate(_Aggregate):
+    """Postings mentioning one skill."""
+
+    __slots__ = ('skill_name', 'industries', 'job_postings_count', 'related_roles', 'description', 'salary_sketch')
+    _member_slots = ('industries',)
+
+    def __init__(self, skill_name):
+        self.skill_name = skill_name
+        self.industries = {}
+        self.job_postings_count = 0
+        self.related_roles = {}
+        self.description = None
+        self.salary_sketch = SalarySketch()
+
+    def add_posting(self, industry, role_name, salary_info=None):
+        if self.description is None:
+            # The first posting sets the skill's industry and description
+            self.industries[industry] = None
+            self.description = f"{self.skill_name.title()} is a technical skill used in {industry}."
+        elif industry and industry not in self.industries:
+            self.industries[industry] = None
+        self.job_postings_count += 1
+        if role_name and role_name not in self.related_roles:
+            self.related_roles[role_name] = None
+        self.salary_sketch.add(salary_info)
+
+    def merge(self, other):
+        """Add the postings of a later part of the data."""
+        self.job_postings_count += other.job_postings_count
+        _add_members(self.related_roles, other.related_roles)
+        _add_members(self.industries, other.industries)
+        self.salary_sketch.merge(other.salary_sketch)
+        return self
+
+    def to_document(self):
+        document = {
+            'skill_name': self.skill_name,
+            'industries': list(self.industries),
+            'job_postings_count': self.job_postings_count,
+            'related_roles': list(self.related_roles),
+            'description': self.description,
+            'learning_resources': []
+        }
+        if self.salary_sketch.count:
+            document['salary_sketch'] = self.salary_sketch.to_document()
+        return document
+
+    def to_increment(self):
+        """MongoDB update adding these postings to the stored skill document (inserted if new)."""
+        return {
+            '$setOnInsert': {'description': self.description, 'learning_resources': []},
+            '$inc': {'job_postings_count': self.job_postings_count},
+            '$addToSet': {
+                'industries': {'$each': list(self.industries)},
+                'related_roles': {'$each': list(self.related_roles)}
+            }
+        }
+
+
+def to_documents(aggregates):
+    """Map of name -> aggregate to name -> MongoDB document."""
+    return {name: aggregate.to_document() for name, aggregate in aggregates.items()}
+
+
+class PartialAggregate:
+    """
+    Companies, roles and skills (name -> aggregate) and job postings of a run
+    of consecutive postings: a partition, a CSV chunk or a whole source.
+    merge() is associative, so any grouping of consecutive runs merged in
+    order gives the result of a single pass over all of them.
+    """
+
+    __slots__ = ('companies', 'roles', 'skills', 'job_postings')
+
+    def __init__(self, companies=None, roles=None, skills=None, job_postings=None):
+        self.companies = companies if companies is not None else {}
+        self.roles = roles if roles is not None else {}
+        self.skills = skills if skills is not None else {}
+        self.job_postings = job_postings if job_postings is not None else []
+
+    def merge(self, other):
+        """Add the postings of the run that follows this one. other's aggregates are reused, not copied."""
+        for aggregates, merged in ((other.companies, self.companies), (other.roles, self.roles),
+                                   (other.skills, self.skills)):
+            for name, aggregate in aggregates.items():
+                if name in merged:
+                    merged[name].merge(aggregate)
+                else:
+                    merged[name] = aggregate
+        self.job_postings.extend(other.job_postings)
+        return self
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.companies = {restore_missing(name): company for name, company in self.companies.items()}
+
+    def take_job_postings(self):
+        """Remove and return the job postings collected so far."""
+        job_postings = self.job_postings
+        self.job_postings = []
+        return job_postings
+
+    def to_documents(self):
+        """(companies, roles, skills, job_postings) with MongoDB documents for the aggregates."""
+        return to_documents(self.companies), to_documents(self.roles), to_documents(self.skills), self.job_postings
@@ -0,0 +1,249 @@
+"""
+Charts of the aggregation results.
+
+Each chart is drawn from a small data frame, which chart_frames() builds
+from the aggregates. Next to each PNG, a .sha256 file records the hash of
+what the chart was drawn from: the frame's contents, the resolution, and
+the versions of this module and of the plotting libraries. render_charts()
+skips the charts whose hash is unchanged. The charts that did change are
+drawn in a process pool with the Agg backend, one chart per task, since
+each is independent of the others.
+
+Each chart drawn is profiled as chart.<name> (see instrumentation.py); the
+workers send their sections back with the result.
+
+Preview renders use PREVIEW_DPI instead of CHART_DPI. The resolution is
+part of the hash, so the next full-resolution run draws them again.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+
+import pandas as pd
+
+from checkpoints import file_hash
+from instrumentation import PROFILER
+
+CHART_DPI = 300
+PREVIEW_DPI = 72
+
+HASH_SUFFIX = '.sha256'
+
+
+def get_plotting():
+    """Import and return (pyplot, seaborn) with the chart style set."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_style("whitegrid")
+    plt.rcParams.update({'font.size': 12})
+    return plt, sns
+
+
+def _format_dollars(plt):
+    formatter = plt.FuncFormatter(lambda x, p: f'${x:,.0f}')
+    plt.gca().xaxis.set_major_formatter(formatter)
+
+
+def _draw_salary_bars(plt, sns, frame, label, palette, title):
+    bars = sns.barplot(x='Median Salary', y=label, data=frame, palette=palette)
+
+    # Add count annotations to bars
+    for i, (_, row) in enumerate(frame.iterrows()):
+        bars.text(row['Median Salary'] + 1000, i, f"n={row['Count']}", va='center')
+
+    plt.title(title)
+    plt.xlabel('Median Annual Salary ($)')
+    _format_dollars(plt)
+
+
+def draw_top_roles_by_demand(plt, sns, frame):
+    sns.barplot(x='Count', y='Role', data=frame, palette='viridis')
+    plt.title('Top 15 Most In-Demand Roles')
+
+
+def draw_top_skills_by_demand(plt, sns, frame):
+    sns.barplot(x='Count', y='Skill', data=frame, palette='magma')
+    plt.title('Top 15 Most In-Demand Skills')
+
+
+def draw_top_roles_by_salary(plt, sns, frame):
+    _draw_salary_bars(plt, sns, frame, 'Role', 'rocket', 'Top 15 Highest Paying Roles')
+
+
+def draw_top_skills_by_salary(plt, sns, frame):
+    _draw_salary_bars(plt, sns, frame, 'Skill', 'crest', 'Top 15 Highest Paying Skills (Minimum 5 Data Points)')
+
+
+def draw_salary_distribution(plt, sns, frame):
+    sns.histplot(frame['Median Salary'].tolist(), bins=20, kde=True)
+    plt.title('Distribution of Median Salaries Across Tech Roles')
+    plt.xlabel('Annual Salary ($)')
+    plt.ylabel('Number of Roles')
+    _format_dollars(plt)
+
+
+# Chart name (the PNG's file name without .png) -> (what error messages call it, figure size, draw function)
+CHARTS = {
+    'top_roles_by_demand': ('top roles', (12, 8), draw_top_roles_by_demand),
+    'top_skills_by_demand': ('top skills', (12, 8), draw_top_skills_by_demand),
+    'top_roles_by_salary': ('roles by salary', (12, 8), draw_top_roles_by_salary),
+    'top_skills_by_salary': ('skills by salary', (12, 8), draw_top_skills_by_salary),
+    'salary_distribution': ('salary distribution', (10, 6), draw_salary_distribution),
+}
+
+
+def demand_frame(aggregates, count_field, label):
+    """The 15 names with the most postings, as (label, Count) rows."""
+    counts = {name: data[count_field] for name, data in aggregates.items()}
+    frame = pd.DataFrame(list(counts.items()), columns=[label, 'Count'])
+    return frame.sort_values('Count', ascending=False).head(15)
+
+
+def salary_frame(salary_metrics, label, min_count):
+    """The 15 names with the highest median salary among those with at least min_count salaries."""
+    significant = salary_metrics[salary_metrics['count'] >= min_count]
+    frame = pd.DataFrame({label: significant.index, 'Median Salary': significant['median'].to_numpy(),
+                          'Count': significant['count'].to_numpy()})
+    return frame.sort_values('Median Salary', ascending=False).head(15)
+
+
+def chart_frames(role_salary_metrics, skill_salary_metrics, all_roles, all_skills):
+    """
+    Chart name -> the frame it is drawn from, for the charts there is data
+    for. A chart whose frame cannot be built is left out, with its error printed.
+    """
+    builders = {
+        'top_roles_by_demand': lambda: demand_frame(all_roles, 'open_positions_count', 'Role'),
+        'top_skills_by_demand': lambda: demand_frame(all_skills, 'job_postings_count', 'Skill'),
+    }
+    if role_salary_metrics is not None and not role_salary_metrics.empty:
+        builders['top_roles_by_salary'] = lambda: salary_frame(role_salary_metrics, 'Role', 3)
+    if skill_salary_metrics is not None and not skill_salary_metrics.empty:
+        builders['top_skills_by_salary'] = lambda: salary_frame(skill_salary_metrics, 'Skill', 5)
+    if role_salary_metrics is not None and not role_salary_metrics.empty:
+        builders['salary_distribution'] = lambda: pd.DataFrame(
+            {'Median Salary': role_salary_metrics['median'].to_numpy()})
+
+    frames = {}
+    for name, build in builders.items():
+        try:
+            frames[name] = build()
+        except Exception as e:
+            print(f"Error creating {CHARTS[name][0]} visualization: {e}")
+    # The distribution chart is skipped when there are no salaries at all
+    if 'salary_distribution' in frames and frames['salary_distribution'].empty:
+        del frames['salary_distribution']
+    return frames
+
+
+def _library_versions():
+    versions = []
+    for package in ('matplotlib', 'seaborn'):
+        try:
+            versions.append(metadata.version(package))
+        except metadata.PackageNotFoundError:
+            versions.append(None)
+    return versions
+
+
+def chart_hash(frame, dpi, renderer_version):
+    """Hash of what a chart is drawn from: its frame's columns and values, the resolution and the renderer."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([
+        [str(column) for column in frame.columns], [str(dtype) for dtype in frame.dtypes], dpi, renderer_version
+    ]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def renderer_version():
+    """Version stamp of the chart code and the plotting libraries."""
+    return [file_hash(os.path.abspath(__file__)), *_library_versions()]
+
+
+def _stored_hash(path):
+    try:
+        with open(path + HASH_SUFFIX) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def render_chart(name, frame, path, dpi):
+    """Draw one chart to path. Returns None, or the error message if it failed."""
+    with PROFILER.section(f'chart.{name}', rows=len(frame)):
+        plt, sns = get_plotting()
+        _, figsize, draw = CHARTS[name]
+        try:
+            plt.figure(figsize=figsize)
+            draw(plt, sns, frame)
+            plt.tight_layout()
+            plt.savefig(path, dpi=dpi)
+            return None
+        except Exception as e:
+            return str(e)
+        finally:
+            plt.close('all')
+
+
+def _render_chart_task(name, frame, path, dpi):
+    # Process pool entry point: render_chart's result and the worker's profiled sections
+    return render_chart(name, frame, path, dpi), PROFILER.take()
+
+
+def _init_worker():
+    # Process pool initializer: draw off-screen, whatever the parent's backend,
+    # and profile only this worker's charts
+    import matplotlib
+    matplotlib.use('Agg')
+    PROFILER.reset()
+
+
+def render_charts(frames, viz_dir, dpi=CHART_DPI, workers=None, redraw=False):
+    """
+    Draw the charts of frames (chart name -> frame) to viz_dir/<name>.png,
+    skipping those whose stored hash matches unless redraw. Charts are drawn
+    in a pool of workers processes (all CPUs by default, 1 draws them in
+    this process). Returns the names of the charts drawn.
+    """
+    version = renderer_version()
+    pending = []
+    for name, frame in frames.items():
+        path = os.path.join(viz_dir, f"{name}.png")
+        digest = chart_hash(frame, dpi, version)
+        if not redraw and os.path.exists(path) and _stored_hash(path) == digest:
+            print(f"Unchanged visualization: {name}.png")
+            continue
+        pending.append((name, frame, path, digest))
+    if not pending:
+        return []
+
+    workers = min(len(pending), workers or os.cpu_count() or 1)
+    args = [[name for name, _, _, _ in pending], [frame for _, frame, _, _ in pending],
+            [path for _, _, path, _ in pending], [dpi] * len(pending)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            results = list(executor.map(_render_chart_task, *args))
+        errors = []
+        for error, profile in results:
+            errors.append(error)
+            PROFILER.merge(profile)
+    else:
+        errors = list(map(render_chart, *args))
+
+    drawn = []
+    for (name, _, path, digest), error in zip(pending, errors):
+        if error is not None:
+            print(f"Error creating {CHARTS[name][0]} visualization: {error}")
+            # A partly written chart must not look up to date
+            if os.path.exists(path + HASH_SUFFIX):
+                os.remove(path + HASH_SUFFIX)
+            continue
+        with open(path + HASH_SUFFIX, 'w') as f:
+            f.write(digest + '\n')
+        drawn.append(name)
+        print(f"✅ Created visualization: {name}.png")
+    return drawn
@@ -0,0 +1,251 @@
+"""
+Parquet checkpoints of the stages of the aggregation pipeline.
+
+Each stage of a run (see PIPELINE_STAGES in data_aggregation) saves its
+outputs as Parquet files in its own directory under the checkpoint
+directory, and manifest.json records the key each completed stage was run
+with: a hash of the input files, the code version of the stage and the key
+of the stage before it. A checkpoint is only used while its key matches, so
+changing an input or the code of a stage reruns that stage and the ones
+after it, and a run that fails keeps the checkpoints of the stages before
+the failure.
+
+Frames are stored as they are. MongoDB documents, which mix types within a
+field and nest lists and dicts, are stored one per row as BSON (what
+MongoDB stores them as), appended a row group at a time as they are
+produced and read back in batches.
+
+A run without checkpoints uses MemoryCheckpointStore instead, which hands
+the same outputs from one stage to the next in memory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import datetime
+
+import bson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aggregates import restore_missing
+
+MANIFEST = 'manifest.json'
+
+SKILLS_SCHEMA = pa.schema([('row', pa.int64()), ('skills', pa.list_(pa.string()))])
+DOCUMENTS_SCHEMA = pa.schema([('document', pa.binary())])
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def checkpoint_key(*parts):
+    """Key of a checkpoint from the (JSON-serializable) values its output depends on."""
+    return hashlib.sha256(json.dumps(parts, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+def code_version(version, modules=()):
+    """Version stamp of a stage's code: its version number and the contents of the modules it uses."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return checkpoint_key(version, [file_hash(os.path.join(directory, module)) for module in modules])
+
+
+class TableWriter:
+    """Appends rows to a Parquet file, one row group per write()."""
+
+    def __init__(self, path, schema):
+        self.writer = pq.ParquetWriter(path, schema)
+        self.schema = schema
+        self.rows = 0
+
+    def write_columns(self, columns):
+        """Append rows given as column name -> values."""
+        table = pa.table(columns, schema=self.schema)
+        if table.num_rows:
+            self.writer.write_table(table)
+            self.rows += table.num_rows
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SkillWriter(TableWriter):
+    """Skills extracted per posting: rows of (row index in the source, skills)."""
+
+    def __init__(self, path):
+        super().__init__(path, SKILLS_SCHEMA)
+
+    def __call__(self, rows, skill_lists):
+        self.write_columns({'row': list(rows), 'skills': list(skill_lists)})
+
+
+class DocumentWriter(TableWriter):
+    """MongoDB documents, one BSON-encoded document per row."""
+
+    def __init__(self, path):
+        super().__init__(path, DOCUMENTS_SCHEMA)
+
+    def __call__(self, documents):
+        self.write_columns({'document': [bson.encode(document) for document in documents]})
+
+
+def _decode(data):
+    # Missing values are the np.nan singleton again, as in frames, so they match by identity
+    return {field: restore_missing(value) for field, value in bson.decode(data).items()}
+
+
+class CheckpointStore:
+    """Checkpoints of the pipeline stages in one directory."""
+
+    # Outputs outlive the run, so stages are compared against their keys
+    persistent = True
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, MANIFEST)
+        self.manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+
+    def is_complete(self, stage, key):
+        """Whether the stage has a checkpoint made with this key."""
+        entry = self.manifest.get(stage)
+        return entry is not None and entry['key'] == key
+
+    def completed_at(self, stage):
+        entry = self.manifest.get(stage)
+        return entry['completed'] if entry else None
+
+    def start(self, stage):
+        """Drop the stage's checkpoint before running it, so a failed run never leaves a stale one."""
+        if self.manifest.pop(stage, None) is not None:
+            self._save_manifest()
+        shutil.rmtree(os.path.join(self.path, stage), ignore_errors=True)
+        os.makedirs(os.path.join(self.path, stage))
+
+    def complete(self, stage, key, **details):
+        """Record that the stage's outputs are saved for this key."""
+        self.manifest[stage] = {'key': key, 'completed': datetime.now().isoformat(timespec='seconds'), **details}
+        self._save_manifest()
+
+    def _save_manifest(self):
+        temp_path = os.path.join(self.path, MANIFEST + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(temp_path, os.path.join(self.path, MANIFEST))
+
+    def file_path(self, stage, name):
+        return os.path.join(self.path, stage, f"{name}.parquet")
+
+    def write_frame(self, stage, name, frame):
+        frame.to_parquet(self.file_path(stage, name))
+
+    def read_frame(self, stage, name, columns=None):
+        return pd.read_parquet(self.file_path(stage, name), columns=columns)
+
+    def skill_writer(self, stage, name):
+        return SkillWriter(self.file_path(stage, name))
+
+    def read_skills(self, stage, name):
+        """Row index -> skills list, from a SkillWriter file."""
+        table = pq.read_table(self.file_path(stage, name))
+        return dict(zip(table['row'].to_pylist(), table['skills'].to_pylist()))
+
+    def document_writer(self, stage, name):
+        return DocumentWriter(self.file_path(stage, name))
+
+    def write_documents(self, stage, name, documents):
+        with self.document_writer(stage, name) as writer:
+            writer(documents)
+
+    def iter_documents(self, stage, name, batch_size=None):
+        """The documents of a DocumentWriter file, in lists of at most batch_size (all in one list by default)."""
+        parquet_file = pq.ParquetFile(self.file_path(stage, name))
+        if not batch_size:
+            yield [_decode(data) for data in parquet_file.read()['document'].to_pylist()]
+            return
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            yield [_decode(data) for data in batch.column(0).to_pylist()]
+
+    def read_documents(self, stage, name):
+        return next(self.iter_documents(stage, name))
+
+
+class MemoryCheckpointStore:
+    """
+    The CheckpointStore interface for a run without checkpoints: outputs are
+    kept in memory as they are written, for the stages after them in the same
+    run, and no stage is ever complete.
+    """
+
+    persistent = False
+
+    def __init__(self):
+        self.outputs = {}
+
+    def is_complete(self, stage, key):
+        return False
+
+    def completed_at(self, stage):
+        return None
+
+    def start(self, stage):
+        for output in [output for output in self.outputs if output[0] == stage]:
+            del self.outputs[output]
+
+    def complete(self, stage, key, **details):
+        pass
+
+    def write_frame(self, stage, name, frame):
+        self.outputs[stage, name] = frame
+
+    def read_frame(self, stage, name, columns=None):
+        frame = self.outputs[stage, name]
+        return frame if columns is None else frame[columns]
+
+    @contextmanager
+    def skill_writer(self, stage, name):
+        skills = self.outputs[stage, name] = {}
+
+        def write(rows, skill_lists):
+            skills.update(zip(rows, skill_lists))
+        yield write
+
+    def read_skills(self, stage, name):
+        return self.outputs[stage, name]
+
+    @contextmanager
+    def document_writer(self, stage, name):
+        documents = self.outputs[stage, name] = []
+        yield documents.extend
+
+    def write_documents(self, stage, name, documents):
+        self.outputs[stage, name] = list(documents)
+
+    def iter_documents(self, stage, name, batch_size=None):
+        documents = self.outputs[stage, name]
+        if not batch_size:
+            yield documents
+            return
+        for start in range(0, len(documents), batch_size):
+            yield documents[start:start + batch_size]
+
+    def read_documents(self, stage, name):
+        return next(self.iter_documents(stage, name))
@@ -9,64 +9,127 @@ Now with enhanced salary analysis and visualization capabilities.
 """
 
 import csv
+import hashlib
+import importlib.metadata
+import json
 import re
+import subprocess
+import sys
+import tempfile
+import time
 import pymongo
-from pymongo import MongoClient
+from pymongo import DeleteMany, MongoClient, UpdateMany, UpdateOne
 from datetime import datetime
 import os
 from collections import Counter, defaultdict
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-import spacy
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from itertools import compress, repeat, tee
+from typing import Callable, Optional
 import pandas as pd
 import numpy as np
 from dotenv import load_dotenv
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Download necessary NLTK data
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
-
-# Load spaCy model for better NLP processing
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    print("Downloading spaCy model...")
-    os.system("python -m spacy download en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-
-INVALID_SKILL_TERMS = {
-    "con edison", "con edison of", "coop", "co-op", "internship", "intern", "work study",
-    "summer internship", "research assistant", "graduate assistant", "student", "education",
-    "project", "team", "collaboration", "communication", "resume", "linkedin", "email",
-    "writing", "microsoft", "google", "apple", "amazon", "meta", "problem solving",
-    "school", "university", "volunteer", "training", "learning", "class", "lecture",
-    "campus", "leadership", "presentation", "organization", "detail-oriented", "motivation",
-    "hardworking", "job", "employment", "assistant", "associate"
+
+from aggregates import PREFERRED_SALARY_SOURCE, CompanyAggregate, PartialAggregate, RoleAggregate, SkillAggregate
+from charts import CHART_DPI, PREVIEW_DPI, chart_frames, render_charts
+from checkpoints import CheckpointStore, MemoryCheckpointStore, checkpoint_key, code_version, file_hash
+from dataset_loader import dataset_columns, iter_dataset, read_dataset
+from description_sections import DescriptionSections, split_items
+from instrumentation import PROFILER, reset_worker
+from salary_normalizer import clean_salary, clean_salary_column, filter_salary_outliers, remove_salary_outliers
+from salary_sketch import SalarySketch
+from shared_texts import SharedTexts
+from skill_cache import DEFAULT_MAX_ENTRIES, SkillCache
+from skill_matcher import PhraseIndex, fold_ignorecase, word_bounded_spans
+from skill_matrix import SkillMatrix
+from skill_taxonomy import COMMON_TECH_SKILLS, get_skill_taxonomy
+from title_normalizer import TITLE_NORMALIZER, standardize_title
+from token_store import POSTING_KEY_FIELDS, TokenStore, TokenStoreBuilder
+
+SPACY_MODEL = "en_core_web_sm"
+
+# Set to 1 to never download models; also inherited by worker processes
+OFFLINE_ENV_VAR = "JOB_ANALYSIS_OFFLINE"
+
+# spaCy pipeline, loaded on first use by get_nlp()
+_nlp = None
+
+def set_offline_mode(offline):
+    """Enable or disable offline mode for this process and any it starts."""
+    if offline:
+        os.environ[OFFLINE_ENV_VAR] = "1"
+    else:
+        os.environ.pop(OFFLINE_ENV_VAR, None)
+
+def is_offline():
+    return os.environ.get(OFFLINE_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+def get_nlp():
+    """
+    Return the spaCy pipeline, loading it on first use.
+    Downloads the model if it is missing, unless offline mode is enabled.
+    """
+    global _nlp
+    if _nlp is None:
+        import spacy
+        try:
+            _nlp = spacy.load(SPACY_MODEL)
+        except OSError:
+            if is_offline():
+                raise RuntimeError(
+                    f"spaCy model '{SPACY_MODEL}' is not installed and offline mode is enabled; "
+                    f"install it with: python -m spacy download {SPACY_MODEL}"
+                )
+            print("Downloading spaCy model...")
+            subprocess.run([sys.executable, "-m", "spacy", "download", SPACY_MODEL], check=True)
+            _nlp = spacy.load(SPACY_MODEL)
+    return _nlp
+
+# Bump when a change to extract_skills_from_text changes its output, so
+# results cached by earlier versions are no longer used
+EXTRACTOR_VERSION = 2
+
+# Pipeline components skipped when running spaCy only for named entities
+NER_DISABLED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer"]
+
+# Partitions per worker process in parallel mode, so slow partitions even out
+PARTITIONS_PER_WORKER = 4
+
+# Operations per bulk_write call when updating MongoDB
+DEFAULT_WRITE_BATCH_SIZE = 1000
+
+# Stages of a full run, in order. Each saves its outputs as a checkpoint
+# (see checkpoints.py), so a run can resume after a failure or start again
+# from a later stage:
+#   prepare    standardized titles, cleaned salaries and fingerprints of the rows
+#   extract    skills of each posting (the NLP pass)
+#   aggregate  company, role, skill and job posting documents and salary
+#              metrics (also saves the posting x skill matrix and token store)
+#   write      the MongoDB collections
+#   visualize  charts and CSV exports
+PIPELINE_STAGES = ['prepare', 'extract', 'aggregate', 'write', 'visualize']
+
+# Bump a stage's version when a change to its code in this file changes its
+# output, so its checkpoints are no longer used; changes to the modules in
+# STAGE_MODULES (and, for extract, to get_extractor_version, which covers the
+# skill taxonomy and matcher but not the script catalogs) are picked up
+# automatically
+STAGE_VERSIONS = {'prepare': 3, 'extract': 1, 'aggregate': 1, 'write': 1, 'visualize': 1}
+STAGE_MODULES = {
+    'prepare': ['title_normalizer.py', 'salary_normalizer.py'],
+    'extract': ['description_sections.py', 'shared_texts.py'],
+    'aggregate': ['aggregates.py', 'salary_sketch.py', 'skill_matrix.py', 'token_store.py', 'checkpoints.py'],
+    'write': [],
+    'visualize': ['charts.py']
 }
 
-# Common tech skills for initial extraction (can be expanded)
-COMMON_TECH_SKILLS = [
-    "python", "java", "javascript", "js", "typescript", "ts", "c++", "c#", "ruby", "php", "swift", 
-    "kotlin", "go", "rust", "scala", "dart", "perl", "r", "matlab", "sql", "nosql", "mongodb", 
-    "postgresql", "mysql", "oracle", "sql server", "cassandra", "redis", "elasticsearch", 
-    "dynamodb", "firebase", "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "k8s",
-    "jenkins", "gitlab", "github", "bitbucket", "terraform", "ansible", "puppet", "chef",
-    "react", "angular", "vue", "nextjs", "nodejs", "express", "django", "flask", "spring", 
-    "laravel", "rails", "asp.net", "html", "css", "sass", "less", "bootstrap", "tailwind",
-    "jquery", "redux", "graphql", "rest", "soap", "oauth", "jwt", "machine learning", "ml",
-    "artificial intelligence", "ai", "deep learning", "dl", "natural language processing", "nlp",
-    "computer vision", "cv", "data science", "big data", "hadoop", "spark", "kafka", "tableau",
-    "power bi", "looker", "qlik", "excel", "vba", "linux", "unix", "windows", "macos", "ios", 
-    "android", "flutter", "react native", "xamarin", "cordova", "unity", "unreal", "blender",
-    "maya", "photoshop", "illustrator", "figma", "sketch", "adobe xd", "ui", "ux", "agile", 
-    "scrum", "kanban", "jira", "confluence", "trello", "slack", "teams", "zoom", "git", "svn", 
-    "mercurial", "cicd", "devops", "sre", "security", "penetration testing", "pen testing", 
-    "ethical hacking", "cybersecurity", "blockchain", "ethereum", "solidity", "smart contracts",
-    "crypto", "cryptocurrency", "nft", "web3", "serverless", "microservices", "soa", "apigateway"
-]
+# Columns of the salary metrics frames (see sketch_salary_metrics), and their CSV export headers
+SALARY_METRICS = ['count', 'min', 'max', 'mean', 'median', 'p25', 'p75']
+SALARY_CSV_COLUMNS = {
+    'count': 'Count', 'min': 'Min Salary', 'max': 'Max Salary', 'mean': 'Mean Salary',
+    'median': 'Median Salary', 'p25': 'P25 Salary', 'p75': 'P75 Salary'
+}
 
 # Common tech roles
 COMMON_TECH_ROLES = [
@@ -86,201 +149,24 @@ COMMON_TECH_ROLES = [
     "firmware engineer", "hardware engineer", "technical writer", "technical support", "help desk"
 ]
 
-# Function to standardize job titles (from paste-2.txt)
-def standardize_title(title):
-    if not isinstance(title, str):
-        return "Unknown Role"
-        
-    # Convert to lowercase initially for better matching
-    title = title.lower()
-    
-    # Remove remote/location designations
-    title = re.sub(r'\s*-\s*.*remote.*', '', title, flags=re.IGNORECASE)
-    title = re.sub(r'\s*\(.*remote.*\)', '', title, flags=re.IGNORECASE)
-    title = re.sub(r'\s*remote\s*', '', title, flags=re.IGNORECASE)
-    
-    # Standardize common variations
-    title = title.replace("front-end", "frontend")
-    title = title.replace("front end", "frontend")
-    title = title.replace("back-end", "backend")
-    title = title.replace("back end", "backend")
-    title = title.replace("full-stack", "full stack")
-    title = title.replace("fullstack", "full stack")
-    
-    # Create standard categories
-    if "software engineer" in title:
-        # Handle levels for Software Engineer: collapse level I to default
-        if re.search(r'\bii+\b', title):  # Roman numeral II
-            title = "software engineer ii"
-        elif re.search(r'\biii+\b', title):  # Roman numeral III
-            title = "software engineer iii"
-        elif "senior" in title or "sr" in title:
-            title = "senior software engineer"
-        elif "junior" in title or "jr" in title:
-            title = "junior software engineer"
-        elif "staff" in title or "principal" in title:
-            title = "staff software engineer"
-        elif "associate" in title:
-            title = "associate software engineer"
-        else:
-            # This covers Software Engineer I and the default case
-            title = "software engineer"
-    
-    elif "data scientist" in title:
-        # Handle levels for Data Scientist: collapse level I to default
-        if re.search(r'\bii+\b', title):
-            title = "data scientist ii"
-        elif re.search(r'\biii+\b', title):
-            title = "data scientist iii"
-        elif "senior" in title or "sr" in title:
-            title = "senior data scientist"
-        elif "junior" in title or "jr" in title:
-            title = "junior data scientist"
-        elif "staff" in title or "principal" in title:
-            title = "staff data scientist"
-        elif "associate" in title:
-            title = "associate data scientist"
-        else:
-            title = "data scientist"
-            
-    elif "data engineer" in title:
-        if re.search(r'\bi+\b', title):
-            title = "data engineer"
-        elif re.search(r'\bii+\b', title):
-            title = "data engineer ii"
-        elif re.search(r'\biii+\b', title):
-            title = "data engineer iii"
-        elif "senior" in title or "sr" in title:
-            title = "senior data engineer"
-        elif "junior" in title or "jr" in title:
-            title = "junior data engineer"
-        elif "staff" in title or "principal" in title:
-            title = "staff data engineer"
-        elif "associate" in title:
-            title = "associate data engineer"
-        else:
-            title = "data engineer"
-    
-    elif "web developer" in title:
-        if "frontend" in title or "front" in title:
-            title = "frontend web developer"
-        elif "backend" in title or "back" in title:
-            title = "backend web developer"
-        elif "full stack" in title:
-            title = "full stack web developer"
-        elif "senior" in title or "sr" in title:
-            title = "senior web developer"
-        elif "junior" in title or "jr" in title:
-            title = "junior web developer"
-        else:
-            title = "web developer"
-    
-    elif "machine learning" in title:
-        if "senior" in title or "sr" in title:
-            title = "senior machine learning engineer"
-        elif "junior" in title or "jr" in title:
-            title = "junior machine learning engineer"
-        elif "scientist" in title:
-            title = "machine learning scientist"
-        else:
-            title = "machine learning engineer"
-    
-    # Remove trailing commas and what follows
-    if "," in title:
-        title = title.split(",")[0]
-    
-    # Remove parenthetical additions except for certain departments
-    departments_to_keep = ["orion", "starlink", "components"]
-    match = re.search(r'\s*\((.*?)\)', title)
-    if match and match.group(1).lower() not in departments_to_keep:
-        title = re.sub(r'\s*\(.*?\)', '', title)
-    
-    # Properly capitalize
-    title = ' '.join(word.capitalize() if word not in ['and', 'or', 'the', 'in', 'on', 'at', 'for'] 
-                     else word for word in title.split())
-    
-    return title.strip()
-
-# Salary cleaning function from paste-2.txt
-def clean_salary(salary):
-    """Extract and clean salary information from text"""
-    if not isinstance(salary, str) or pd.isna(salary) or salary == 'NA':
-        return None
-    
+def get_spacy_model_version():
+    """Installed version of the spaCy model package (None if not installed), without loading it."""
     try:
-        # Convert to lowercase for consistent detection
-        salary_lower = salary.lower()
-        
-        # Skip nonsensical values
-        if any(term in salary_lower for term in ['call', 'contact', 'competitive', 'negotiable']):
-            return None
-        
-        # Determine if hourly or annual
-        is_hourly = 'per hour' in salary_lower or 'hourly' in salary_lower
-        
-        # Extract all numbers from the string
-        numbers = re.findall(r'[\d,]+\.?\d*', salary)
-        if not numbers:
-            return None
-            
-        # Clean the extracted numbers
-        cleaned_numbers = []
-        for num in numbers:
-            try:
-                cleaned_numbers.append(float(num.replace(',', '')))
-            except ValueError:
-                continue
-        
-        if not cleaned_numbers:
-            return None
-            
-        # Handle salary ranges
-        if len(cleaned_numbers) >= 2:
-            # Take the average of the first two numbers (likely a range)
-            min_val, max_val = cleaned_numbers[0], cleaned_numbers[1]
-            # Ensure min <= max
-            if min_val > max_val:
-                min_val, max_val = max_val, min_val
-            avg_salary = (min_val + max_val) / 2
-        else:
-            # Just one number found
-            avg_salary = cleaned_numbers[0]
-        
-        # Sanity check for very low values that are likely hourly rates without explicit "per hour"
-        if not is_hourly and avg_salary < 1000:
-            is_hourly = True
-            
-        # Convert hourly to annual (standard 2080 hours per year)
-        if is_hourly:
-            annual_salary = avg_salary * 2080
-        else:
-            annual_salary = avg_salary
-            
-        # Sanity check for reasonable salary range (exclude extreme outliers)
-        if annual_salary < 10000 or annual_salary > 1000000:
-            return None
-            
-        return annual_salary
-            
-    except Exception as e:
+        return importlib.metadata.version(SPACY_MODEL)
+    except importlib.metadata.PackageNotFoundError:
         return None
 
-def remove_salary_outliers(salary_series):
-    """Remove outliers from a series of salary values"""
-    if len(salary_series) <= 2:
-        return salary_series
-    
-    # Calculate Q1, Q3 and IQR
-    Q1 = salary_series.quantile(0.25)
-    Q3 = salary_series.quantile(0.75)
-    IQR = Q3 - Q1
-    
-    # Define outlier bounds (more conservative than typical 1.5*IQR)
-    lower_bound = max(25000, Q1 - 1.5 * IQR)  # Minimum reasonable salary
-    upper_bound = min(400000, Q3 + 1.5 * IQR)  # Maximum reasonable salary
-    
-    # Filter out outliers
-    return salary_series[(salary_series >= lower_bound) & (salary_series <= upper_bound)]
+def get_extractor_version():
+    """
+    Version stamp for cached extraction results. Changes whenever the extractor
+    version, the skill taxonomy or the spaCy model change. Reads the model's
+    package metadata rather than loading it, so checking checkpoints does not
+    load spaCy.
+    """
+    stamp = json.dumps([
+        EXTRACTOR_VERSION, get_skill_taxonomy().version, SPACY_MODEL, get_spacy_model_version()
+    ])
+    return hashlib.sha256(stamp.encode('utf-8')).hexdigest()[:16]
 
 def get_config():
     """Set up configuration for data processing."""
@@ -293,7 +179,32 @@ def get_config():
         'mongo_uri': MONGO_URL,
         'db_name': 'Test',
         'industry': 'Tech',
-        'output_dir': 'job_market_analysis'  # Directory for output files/visualizations
+        'output_dir': 'job_market_analysis',  # Directory for output files/visualizations
+        'nlp_batch_size': None,  # Set to run spaCy through nlp.pipe in batches of this size
+        'nlp_n_process': 1,  # Number of spaCy worker processes in batched mode
+        'workers': 1,  # Number of processes used to extract and aggregate postings
+        'skill_cache': True,  # Reuse skills extracted on earlier runs
+        'skill_cache_path': None,  # Defaults to skill_cache.sqlite in the output directory
+        'skill_cache_max_entries': DEFAULT_MAX_ENTRIES,
+        'offline': is_offline(),  # Never download models (also set by JOB_ANALYSIS_OFFLINE=1)
+        'skill_matrix': True,  # Save the posting x skill matrix as skill_matrix.npz in the output directory
+        'token_store': True,  # Save the tokenized descriptions for incremental skill rescans
+        'token_store_path': None,  # Defaults to token_store/ in the output directory
+        'rescan_skills': False,  # Only patch skills added or changed in the taxonomy since the last run
+        'chunksize': None,  # Read and process the CSVs this many rows at a time, writing postings per chunk
+        'write_batch_size': DEFAULT_WRITE_BATCH_SIZE,  # Operations per MongoDB bulk_write call
+        'write_threads': None,  # Collections written concurrently (default: all of them)
+        'incremental': False,  # Add only postings not stored yet, without dropping the collections
+        'checkpoints': True,  # Save the output of each pipeline stage (see PIPELINE_STAGES)
+        'checkpoint_path': None,  # Defaults to checkpoints/ in the output directory
+        'from_stage': None,  # Rerun from this stage, reading the earlier stages' checkpoints
+        'resume': False,  # Only run the stages without a checkpoint for the current inputs and code
+        'chart_workers': None,  # Processes drawing the charts that changed (default: one per CPU)
+        'preview_charts': False,  # Draw charts at low resolution, for a quick look
+        'redraw_charts': False,  # Draw every chart, even those whose data has not changed
+        'profile': False,  # Record time and memory per stage and hot function (see instrumentation.py)
+        'profile_path': None,  # Defaults to profiles/<start time>.json in the output directory
+        'profile_memory': True  # Trace allocations for peak memory when profiling (slows the run down)
     }
     return config
 
@@ -308,8 +219,13 @@ def connect_to_mongodb(mongo_uri, db_name):
         print(f"Error connecting to MongoDB: {e}")
         raise
 
-def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
-    """Enhanced skill extraction with better NLP capabilities."""
+@PROFILER.timed('extract_skills_from_text')
+def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS, doc=None):
+    """
+    Enhanced skill extraction with better NLP capabilities.
+    If a spaCy doc for the lowercased text is passed in (e.g. from nlp.pipe),
+    it is used for entity recognition instead of running the pipeline again.
+    """
     if not text or not isinstance(text, str):
         print("WARNING: Empty or non-string input to extract_skills_from_text")
         return []
@@ -319,55 +235,44 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
     extracted_skills_with_confidence = {}  # Store skills with confidence score
     
     # Process with spaCy for better entity recognition
-
-    doc = nlp(text)
+    if doc is None:
+        doc = get_nlp()(text)
     
-    # Define skill context indicators - words that suggest a term is a skill
-    skill_indicators = [
-        'experience', 'skill', 'knowledge', 'proficiency', 'familiar', 'working with',
-        'expertise', 'proficient', 'competent', 'trained in', 'certified', 'background in',
-        'understanding of', 'ability to use', 'ability to work with', 'hands-on', 'exposure to'
-    ]
-    
-    # Define words to ignore as skills - generic terms
-    generic_terms = [
-        'software', 'programming', 'language', 'framework', 'library', 'platform', 'tool',
-        'environment', 'development', 'engineer', 'engineering', 'solution', 'system', 'quality',
-        'knowledge', 'experience', 'proficiency', 'familiar', 'ability', 'skill', 'expertise',
-        'proficient', 'competent', 'trained', 'certified', 'background', 'understanding', 
-        'hands-on', 'exposure', 'working', 'with', 'using', 'utilize', 'implementation',
-        'developing', 'designing', 'building', 'creating', 'writing', 'coding', 'implementing',
-        'supporting', 'maintaining', 'troubleshooting', 'debugging', 'testing', 'deploying',
-        'managing', 'leading', 'directing', 'coordinating', 'organizing'
-    ]
+    # Precompiled skill set, canonicalization map and matcher for this skill list
+    # (the shared taxonomy is loaded on the first extraction)
+    taxonomy = get_skill_taxonomy()
+    common_skill_set, skill_mapping, matcher = taxonomy.compiled_for(common_skills)
+    generic_terms = taxonomy.generic_terms
     
     # 1. Extract skills from common skills list with confidence scoring
+    # A single automaton pass finds every skill occurrence (and its offset)
+    # for both this step and the direct check in step 5, along with every
+    # skill indicator phrase, so each context check below is a binary search
+    # rather than a substring scan of a 150+ char window
+    occurrences = matcher.scan(text)
+    indicators = PhraseIndex(occurrences, taxonomy.skill_indicators)
+
+    # Skills are matched case-insensitively (like re.IGNORECASE), while the
+    # indicators and the direct check of step 5 are plain substring tests, so
+    # the rare text with a folded character is scanned a second time
+    folded_text = fold_ignorecase(text)
+    skill_occurrences = occurrences if folded_text == text else matcher.scan(folded_text)
 
     for skill in common_skills:
         # Check for exact matches with word boundaries
-        skill_pattern = r'\b' + re.escape(skill) + r'\b'
-        if re.search(skill_pattern, text, re.IGNORECASE):
+        skill_key = skill.lower()
+        matches = word_bounded_spans(text, skill_key, skill_occurrences.get(skill_key, []))
+        if matches:
             # Calculate confidence score based on context and frequency
             confidence = 0
-            matches = list(re.finditer(skill_pattern, text, re.IGNORECASE))
             
             # More mentions = higher confidence (capped at 3)
             confidence += min(len(matches), 3)
             
-            # Check context around each mention
-            has_skill_context = False
-            for match in matches:
-                start, end = match.span()
-                # Get context (up to 75 chars before and after)
-                context_start = max(0, start - 75)
-                context_end = min(len(text), end + 75)
-                context = text[context_start:context_end]
-                
-                # Check if it's used in a skill context
-                if any(indicator in context for indicator in skill_indicators):
-                    has_skill_context = True
-                    confidence += 2
-                    break
+            # Check if any mention is used in a skill context
+            # (an indicator within 75 chars before or after)
+            if any(indicators.any_within(start - 75, end + 75) for start, end in matches):
+                confidence += 2
             
             # Store the skill with its confidence score
             if skill not in extracted_skills_with_confidence or confidence > extracted_skills_with_confidence[skill]:
@@ -387,11 +292,7 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
                 
                 # Check if it's a technology name
                 confidence = 1
-                context_start = max(0, ent.start_char - 75)
-                context_end = min(len(text), ent.end_char + 75)
-                context = text[context_start:context_end]
-                
-                if any(indicator in context for indicator in skill_indicators):
+                if indicators.any_within(ent.start_char - 75, ent.end_char + 75):
                     confidence += 2
                 
                 extracted_skills_with_confidence[candidate] = confidence
@@ -415,73 +316,33 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
                 extracted_skills.add(tech_name)
     
     # 4. Extract specific technical skills from probable skill sections
-    skill_section_patterns = [
-        r'(?:technical skills|skills & expertise|technologies|tech stack)(?:[\s:]+)(.*?)(?:\n\n|\n\w+:|$)',
-        r'(?:experience|expertise) (?:with|in)(?:[\s:]+)(.*?)(?:\.|$)',
-        r'(?:proficiency|proficient) (?:with|in)(?:[\s:]+)(.*?)(?:\.|$)',
-        r'(?:requirements|qualifications)(?:[\s:]*)(.*?)(?:\n\n|\n\w+:|$)'
-    ]
-    
-    for pattern in skill_section_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE | re.DOTALL)
-        for match in matches:
-            skill_section = match.group(1).lower()
-            # Look for comma or bullet separated lists in these sections
-            for skill_phrase in re.split(r',|\n|•|-|;|\|', skill_section):
-                skill_phrase = skill_phrase.strip()
-                if 2 <= len(skill_phrase.split()) <= 3 and skill_phrase and not any(generic == skill_phrase for generic in generic_terms):
-                    # Check if it contains at least one technical indicator
-                    if any(tech_word in skill_phrase for tech_word in ["framework", "language", "stack", "api", "sdk", "library"]):
-                        extracted_skills_with_confidence[skill_phrase] = 2
-                        extracted_skills.add(skill_phrase)
+    # (text after skill headings up to the end of the section, and after
+    # "experience with"-style phrases up to the end of the sentence)
+    for skill_section in DescriptionSections(text).skill_sections():
+        skill_section = skill_section.lower()
+        # Look for comma or bullet separated lists in these sections
+        for skill_phrase in split_items(skill_section):
+            skill_phrase = skill_phrase.strip()
+            if 2 <= len(skill_phrase.split()) <= 3 and skill_phrase and skill_phrase not in generic_terms:
+                # Check if it contains at least one technical indicator
+                if any(tech_word in skill_phrase for tech_word in ["framework", "language", "stack", "api", "sdk", "library"]):
+                    extracted_skills_with_confidence[skill_phrase] = 2
+                    extracted_skills.add(skill_phrase)
     
     # 5. SPECIAL STEP: Direct check for explicitly mentioned skills
     # This step ensures we don't miss important skills due to regex issues
 
-    critical_skills = [
-    "c++", "c#", ".net", "asp.net", "node.js", "vue.js", "react.js", 
-    "typescript", "javascript", "python", "java", "golang", "ruby",
-    "tensorflow", "pytorch", "opencv", "docker", "kubernetes", "aws",
-    "azure", "gcp", "sql", "nosql", "mongodb", "postgresql", 
-    "python", "java", "javascript", "js", "typescript", "ts", "c++", "c#", "ruby", "php", "swift", 
-    "kotlin", "go", "rust", "scala", "dart", "perl", "r", "matlab", "sql", "nosql", "mongodb", 
-    "postgresql", "mysql", "oracle", "sql server", "cassandra", "redis", "elasticsearch", 
-    "dynamodb", "firebase", "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "k8s",
-    "jenkins", "gitlab", "github", "bitbucket", "terraform", "ansible", "puppet", "chef",
-    "react", "angular", "vue", "nextjs", "nodejs", "express", "django", "flask", "spring", 
-    "laravel", "rails", "asp.net", "html", "css", "sass", "less", "bootstrap", "tailwind",
-    "jquery", "redux", "graphql", "rest", "soap", "oauth", "jwt", "machine learning", "ml",
-    "artificial intelligence", "ai", "deep learning", "dl", "natural language processing", "nlp",
-    "computer vision", "cv", "data science", "big data", "hadoop", "spark", "kafka", "tableau",
-    "power bi", "looker", "qlik", "excel", "vba", "linux", "unix", "windows", "macos", "ios", 
-    "android", "flutter", "react native", "xamarin", "cordova", "unity", "unreal", "blender",
-    "maya", "photoshop", "illustrator", "figma", "sketch", "adobe xd", "ui", "ux", "agile", 
-    "scrum", "kanban", "jira", "confluence", "trello", "slack", "teams", "zoom", "git", "svn", 
-    "mercurial", "cicd", "devops", "sre", "security", "penetration testing", "pen testing", 
-    "ethical hacking", "cybersecurity", "blockchain", "ethereum", "solidity", "smart contracts",
-    "crypto", "cryptocurrency", "nft", "web3", "serverless", "microservices", "soa", "apigateway"
-    ]
-    
-    # Add variations of skills with special characters
-    variations = {
-        "c++": ["c plus plus", "cplusplus", "c-plus-plus"],
-        "c#": ["c sharp", "csharp", "c-sharp"],
-        "node.js": ["node js", "nodejs"],
-        "vue.js": ["vue js", "vuejs"],
-        "react.js": ["react js", "reactjs"]
-    }
-    
-    for skill in critical_skills:
+    for skill in taxonomy.critical_skills:
         # Check for the skill itself
-        if skill.lower() in text.lower():
+        if skill in occurrences:
             if skill not in extracted_skills:
                 extracted_skills.add(skill)
                 extracted_skills_with_confidence[skill] = 3  # High confidence for explicit mentions
                             
         # Check for variations if they exist
-        if skill in variations:
-            for variant in variations[skill]:
-                if variant.lower() in text.lower():
+        if skill in taxonomy.variations:
+            for variant in taxonomy.variations[skill]:
+                if variant in occurrences:
                     if skill not in extracted_skills:
                         extracted_skills.add(skill)
                         extracted_skills_with_confidence[skill] = 3
@@ -489,51 +350,6 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
     # 6. Skill mapping and normalization
     
     cleaned_skills = []
-    skill_mapping = {
-        "js": "javascript",
-        "ts": "typescript",
-        "k8s": "kubernetes",
-        "ml": "machine learning",
-        "ai": "artificial intelligence",
-        "dl": "deep learning",
-        "nlp": "natural language processing",
-        "cv": "computer vision",
-        "react.js": "react",
-        "reactjs": "react",
-        "vue.js": "vue",
-        "node.js": "nodejs",
-        "golang": "go",
-        "dotnet": ".net",
-        "postgres": "postgresql",
-        "aws cloud": "aws",
-        "amazon web services": "aws",
-        "microsoft azure": "azure",
-        "google cloud platform": "gcp",
-        "tensorflow": "tensorflow",
-        "opencv": "opencv",
-        "c plus plus": "c++",
-        "cplusplus": "c++",
-        "c-plus-plus": "c++",
-        "c sharp": "c#",
-        "csharp": "c#",
-        "c-sharp": "c#",
-        "objective c": "objective-c",
-        "objective-c": "objective-c",
-        "gcp": "google cloud",
-        "rest api development": "api development",
-        "api-development": "api development",
-        "api": "api development"
-    }
-    
-    # Add plural to singular mapping
-    plural_mapping = {}
-    for skill in common_skills:
-        if skill.endswith('s') and skill[:-1] in common_skills:
-            plural_mapping[skill] = skill[:-1]
-        elif not skill.endswith('s'):
-            plural_mapping[f"{skill}s"] = skill
-    
-    skill_mapping.update(plural_mapping)
     
     # Sort skills by confidence score
     sorted_skills = sorted(
@@ -544,7 +360,7 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
     
     # Keep only skills with sufficient confidence or that are in common skills list
     for skill, confidence in sorted_skills:
-        if confidence >= 2 or skill in common_skills:
+        if confidence >= 2 or skill in common_skill_set:
             # Map abbreviations and variants to standard names
             mapped_skill = skill_mapping.get(skill, skill)
             
@@ -553,9 +369,32 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
                 if mapped_skill not in cleaned_skills:
                     cleaned_skills.append(mapped_skill)
 
-    cleaned_skills = [s for s in cleaned_skills if s.lower() not in INVALID_SKILL_TERMS]
+    cleaned_skills = [s for s in cleaned_skills if s.lower() not in taxonomy.invalid_terms]
     return cleaned_skills
 
+def extract_skills_batch(texts, common_skills=COMMON_TECH_SKILLS, batch_size=64, n_process=1):
+    """
+    Extract skills for many descriptions at once.
+    Descriptions are sent through nlp.pipe in batches (optionally across
+    several processes) with the components NER does not need disabled, and
+    each resulting doc is joined back to the rest of the extraction.
+    Returns one skills list per input text, in the same order.
+    """
+    # Texts are streamed: the pipe only reads a batch or so ahead of the loop below
+    texts, pipe_texts = tee(texts)
+    valid_texts = (text.lower() for text in pipe_texts if text and isinstance(text, str))
+    nlp = get_nlp()
+    disabled = [name for name in NER_DISABLED_COMPONENTS if name in nlp.pipe_names]
+    docs = nlp.pipe(valid_texts, batch_size=batch_size, n_process=n_process, disable=disabled)
+
+    results = []
+    for text in texts:
+        if text and isinstance(text, str):
+            results.append(extract_skills_from_text(text, common_skills, doc=next(docs)))
+        else:
+            results.append(extract_skills_from_text(text, common_skills))
+    return results
+
 def extract_role_from_title(title):
     """
     Extract a standardized role from job title using the improved standardize_title function.
@@ -563,318 +402,619 @@ def extract_role_from_title(title):
     if not title or not isinstance(title, str):
         return None
     
-    return standardize_title(title)
+    return TITLE_NORMALIZER(title)
+
+def _column_or_blank(df, col):
+    """A column of df, or blanks if the source has no such column."""
+    return df[col] if col and col in df.columns else pd.Series('', index=df.index)
 
-def process_job_data(file_path, source_name, db, industry_name):
+def _is_truthy(column):
+    """bool() of each value of a column (missing values, i.e. NaN, are true)."""
+    if isinstance(column.dtype, pd.StringDtype):
+        return column.isna() | (column.str.len() > 0)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Dictionary-encoded columns: bool() of each category, broadcast to the rows
+        truthy = np.array([bool(value) for value in column.cat.categories] + [True], dtype=bool)
+        return pd.Series(truthy[column.cat.codes.to_numpy()], index=column.index)
+    return column.map(bool).astype(bool)
+
+def postings_to_process(df, col_map, shared_descriptions=None):
     """
-    Process job data from a CSV file (LinkedIn or Glassdoor) and extract relevant information.
-    This is a unified function that handles both sources with source-specific adaptations.
+    Mask of the rows that have a title, company and description, i.e. the
+    postings that get aggregated. shared_descriptions (SharedTexts of the
+    rows) stands in for the description column if given.
+    """
+    if shared_descriptions is not None:
+        has_description = pd.Series(shared_descriptions.truthy(), index=df.index)
+    else:
+        has_description = _is_truthy(_column_or_blank(df, col_map['description']))
+    return (_is_truthy(_column_or_blank(df, col_map['title'])) &
+            _is_truthy(_column_or_blank(df, col_map['company'])) &
+            has_description)
+
+def _column_values(df, col, default=''):
+    """
+    A column as a list of Python values, or of default if the source has no
+    such column (what row.get(col, default) gives for each row).
+    """
+    if not col or col not in df.columns:
+        return [default] * len(df)
+    return df[col].astype(object).tolist()
+
+def _group_positions(keys):
+    """
+    Group list positions by key. Returns (key, positions) pairs in order of
+    each key's first position, positions ascending.
+    """
+    if not keys:
+        return []
+    codes, uniques = pd.factorize(pd.Series(keys, dtype=object), use_na_sentinel=False)
+    order = np.argsort(codes, kind='stable')
+    groups = np.split(order, np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1])
+    groups.sort(key=lambda positions: positions[0])
+    return [(keys[positions[0]], positions) for positions in groups]
+
+def _is_tech_role(role_name):
+    return bool(role_name) and any(tech_role.lower() in role_name.lower() for tech_role in COMMON_TECH_ROLES)
+
+def _parse_posted_date(date_str, now):
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d') if date_str else now
+    except:
+        return now
+
+def aggregate_job_postings(df, col_map, source_name, industry_name, nlp_batch_size=None, nlp_n_process=1,
+                           cached_skills=None, extracted_skills=None, shared_descriptions=None):
+    """
+    Extract skills from each posting in a prepared DataFrame (standardized titles
+    and cleaned salaries already added) and aggregate companies, roles and skills.
+    Runs on the whole file, or on one partition of it in parallel mode.
+    Only skill extraction runs per posting; industries, the company/role/skill
+    groups and the posting records are built column by column.
+    Returns a PartialAggregate of the postings (CompanyAggregate, RoleAggregate
+    and SkillAggregate maps, job posting records and salary data points).
+    cached_skills maps row index -> skills already known for that row (no NLP is
+    run for those rows). If extracted_skills is given, it is filled with the
+    skills newly extracted for the other rows.
+    If shared_descriptions (SharedTexts of the rows of df) is given, the
+    descriptions are read from it one at a time instead of from df, and the
+    job posting records get None as description, for the caller to fill in.
     """
-    print(f"Processing {source_name} data from: {file_path}")
-    
     companies_data = {}
     roles_data = {}
     skills_data = {}
+    
+    # Only postings with a title, company and description are aggregated
+    keep = postings_to_process(df, col_map, shared_descriptions)
+    rows = df[keep]
+    
+    titles = _column_values(rows, col_map['title'])
+    companies = _column_values(rows, col_map['company'])
+    locations = _column_values(rows, col_map['location'])
+    if shared_descriptions is None:
+        descriptions = _column_values(rows, col_map['description'])
+        record_descriptions = descriptions
+    else:
+        descriptions = shared_descriptions.select(keep.to_numpy())
+        record_descriptions = [None] * len(rows)
+    job_urls = _column_values(rows, col_map['url'])
+    role_names = _column_values(rows, 'standardized_title', None)
+    salary_infos = _column_values(rows, 'cleaned_salary', None)
+    salary_ranges = _column_values(rows, col_map.get('salary'), None)
+    median_salaries = _column_values(rows, col_map.get('median_salary'), None)
+    company_industries = _column_values(rows, col_map.get('company_industry'), None)
+    fingerprints = _column_values(rows, 'posting_fingerprint', None)
+    
+    row_skills = dict(cached_skills) if cached_skills else {}
+    
+    # Extract skills in batches for the rows without known skills
+    if nlp_batch_size:
+        pending = ~rows.index.isin(list(row_skills))
+        if shared_descriptions is None:
+            pending_texts = _column_or_blank(rows, col_map['description'])[pending]
+        else:
+            pending_texts = compress(shared_descriptions.select(keep.to_numpy()), pending)
+        row_skills.update(zip(
+            rows.index[pending],
+            extract_skills_batch(pending_texts, batch_size=nlp_batch_size, n_process=nlp_n_process)
+        ))
+    
+    # Extract skills (unless they came from the cache or the batched pass)
+    skill_lists = []
+    for index, description in zip(rows.index, descriptions):
+        skills = row_skills[index] if index in row_skills else extract_skills_from_text(description)
+        if extracted_skills is not None and not (cached_skills and index in cached_skills):
+            extracted_skills[index] = skills
+        skill_lists.append(skills)
+    
+    # Assign industry: "Tech" for tech roles or postings mentioning a common tech skill
+    tech_roles = {role_name: _is_tech_role(role_name) for role_name in dict.fromkeys(role_names)}
+    common_skill_set = get_skill_taxonomy().common_skill_set
+    is_tech_job = (
+        np.array([tech_roles[role_name] for role_name in role_names], dtype=bool) |
+        np.array([any(skill.lower() in common_skill_set for skill in skills) for skills in skill_lists],
+                 dtype=bool)
+    )
+    other_industries = np.array([industry or industry_name for industry in company_industries], dtype=object)
+    final_industries = np.where(is_tech_job, "Tech", other_industries).tolist() if len(rows) else []
+    
+    # Companies, in order of first posting
+    company_fields = [
+        ('revenue', 'company_revenue'), ('size', 'company_size'), ('type', 'company_type'),
+        ('rating', 'company_rating'), ('website', 'company_website')
+    ]
+    company_fields = [
+        (field, _column_values(rows, col_map[key])) for field, key in company_fields
+        if source_name.lower() == 'glassdoor' and key in col_map and col_map[key] in df.columns
+    ]
+    for company, positions in _group_positions(companies):
+        first = positions[0]
+        company_aggregate = CompanyAggregate(company, final_industries[first],
+                                             {field: values[first] for field, values in company_fields})
+        for i in positions:
+            company_aggregate.add_posting(role_names[i], locations[i])
+        companies_data[company] = company_aggregate
+    
+    # Skills, in order of first mention; one posting per (posting, skill) pair
+    mention_rows = np.repeat(np.arange(len(skill_lists)), [len(skills) for skills in skill_lists])
+    mentions = [skill for skills in skill_lists for skill in skills]
+    for skill, positions in _group_positions(mentions):
+        skill_aggregate = SkillAggregate(skill)
+        for i in mention_rows[positions]:
+            skill_aggregate.add_posting(final_industries[i], role_names[i], salary_infos[i])
+        skills_data[skill] = skill_aggregate
+    
+    # Roles, in order of first posting
+    role_positions = [i for i, role_name in enumerate(role_names) if role_name]
+    for role_name, positions in _group_positions([role_names[i] for i in role_positions]):
+        role_aggregate = RoleAggregate(role_name, source_name)
+        for i in positions:
+            i = role_positions[i]
+            role_aggregate.add_posting(final_industries[i], companies[i], skill_lists[i], salary_infos[i],
+                                       salary_ranges[i], median_salaries[i])
+        roles_data[role_name] = role_aggregate
+    
+    # Job posting records
+    if col_map['date'] and col_map['date'] in df.columns:
+        now = datetime.now()
+        parsed_dates = {}
+        posted_dates = []
+        for date_str in _column_values(rows, col_map['date']):
+            if date_str not in parsed_dates:
+                parsed_dates[date_str] = _parse_posted_date(date_str, now)
+            posted_dates.append(parsed_dates[date_str])
+    else:
+        posted_dates = [datetime.now()] * len(rows)
+    
     job_postings = []
-    salary_data = []
+    for i, skills in enumerate(skill_lists):
+        job_posting = {
+            'title': titles[i],
+            'standardized_title': role_names[i],
+            'company': companies[i],
+            'role': role_names[i],
+            'location': locations[i],
+            'description': record_descriptions[i],
+            'skills_required': skills,
+            'url': job_urls[i],
+            'posted_date': posted_dates[i],
+            'source': source_name,
+            'industry': final_industries[i],
+            'fingerprint': fingerprints[i]
+        }
+        
+        if salary_ranges[i]:
+            job_posting['salary_range'] = salary_ranges[i]
+        if median_salaries[i]:
+            job_posting['median_salary'] = median_salaries[i]
+        if salary_infos[i]:
+            job_posting['calculated_salary'] = salary_infos[i]
+            
+        job_postings.append(job_posting)
+    
+    return PartialAggregate(companies_data, roles_data, skills_data, job_postings)
+
+def aggregate_job_partition(df, col_map, source_name, industry_name, nlp_batch_size=None, cached_skills=None,
+                            shared_descriptions=None):
+    """
+    Process pool entry point: aggregate one partition of a DataFrame.
+    Also returns the skills newly extracted per row (rows without cached skills)
+    and the worker's profiled sections (see instrumentation.py).
+    The partition results are merged in partition order with PartialAggregate.merge.
+    shared_descriptions: see aggregate_job_postings.
+    """
+    extracted_skills = {}
+    result = aggregate_job_postings(df, col_map, source_name, industry_name, nlp_batch_size,
+                                    cached_skills=cached_skills, extracted_skills=extracted_skills,
+                                    shared_descriptions=shared_descriptions)
+    return result, extracted_skills, PROFILER.take()
+
+def share_descriptions(df, col_map, directory):
+    """
+    The description column of df as SharedTexts in a file in directory, or
+    None if df has no description column or it holds values other than text.
+    """
+    description_col = col_map['description']
+    if not description_col or description_col not in df.columns:
+        return None
+    try:
+        return SharedTexts.create(df[description_col], os.path.join(directory, 'descriptions.arrow'))
+    except TypeError:
+        return None
+
+# Fields of get_column_map that hold numbers rather than text
+NUMERIC_FIELDS = ('median_salary', 'company_rating')
+
+# Columns read_job_data adds to the rows, and the fields they are computed from
+PREPARED_COLUMNS = ['standardized_title', 'cleaned_salary', 'posting_fingerprint']
+PREPARED_FIELDS = ('title', 'company', 'url', 'description', 'salary')
+
+def get_column_map(source_name):
+    """Column names of the fields of a posting in a LinkedIn or Glassdoor CSV."""
+    if source_name.lower() == 'linkedin':
+        return {
+            'title': 'title',
+            'company': 'company',
+            'location': 'location',
+            'description': 'job_description',
+            'url': 'job_url',
+            'date': 'date_loaded',
+            'salary': 'salary'
+        }
+    # Glassdoor
+    return {
+        'title': 'job_title',
+        'company': 'company_name',
+        'location': 'job_location',
+        'description': 'job_overview',
+        'url': 'job_application_link',
+        'date': None,
+        'salary': 'pay_range_glassdoor_est',
+        'median_salary': 'pay_median_glassdoor',
+        'company_industry': 'company_industry',
+        'company_revenue': 'company_revenue',
+        'company_size': 'company_size',
+        'company_type': 'company_type',
+        'company_rating': 'company_rating',
+        'company_website': 'company_website'
+    }
+
+def filter_salaries(standardized_titles, salaries):
+    """Cleaned salaries, with outliers removed per role for roles with more than 10 postings."""
+    return filter_salary_outliers(standardized_titles, clean_salary_column(salaries))
+
+def _normalize_key_text(value):
+    """Casefolded, with whitespace runs collapsed and the ends stripped; None if missing."""
+    return ' '.join(value.casefold().split()) if isinstance(value, str) else None
+
+def posting_fingerprints(df, col_map):
+    """
+    Fingerprint of each row: a hash of the fields its JobPostings document is
+    upserted on (title, company and URL), normalized by _normalize_key_text,
+    the URL also without a trailing slash. Identifies postings across runs,
+    so a posting whose description was edited, or that is listed again with
+    different case or spacing, is still the stored one.
+    """
+    fingerprints = []
+    for title, company, url in zip(_column_values(df, col_map['title'], None),
+                                   _column_values(df, col_map['company'], None),
+                                   _column_values(df, col_map['url'], None)):
+        url = _normalize_key_text(url)
+        key = json.dumps([_normalize_key_text(title), _normalize_key_text(company),
+                          url.rstrip('/') if url is not None else None])
+        fingerprints.append(hashlib.sha1(key.encode('utf-8')).hexdigest())
+    return fingerprints
+
+def _add_prepared_columns(df, prepared):
+    for column in prepared.columns:
+        df[column] = prepared[column].loc[df.index]
+
+def standardize_titles(titles):
+    """TITLE_NORMALIZER.standardize_column, profiled as standardize_title."""
+    with PROFILER.section('standardize_title', rows=len(titles)):
+        return TITLE_NORMALIZER.standardize_column(titles)
+
+def read_job_data(file_path, col_map, chunksize=None, prepared=None, usecols=None):
+    """
+    Yield the rows of a CSV (read from its Parquet copy when that is up to
+    date, see dataset_loader) with standardized titles, cleaned salaries and
+    posting fingerprints added, as one DataFrame or, with chunksize, chunksize rows at a time. Salary
+    outliers are filtered per role over the whole file, so in chunked mode the
+    title and salary columns are read in a first pass; the other columns are
+    only ever held for one chunk.
+    If prepared is given (the frame prepare_job_data returned for the file),
+    its columns are added instead of being computed again. With usecols, only
+    those columns are read.
+    """
+    salary_col = col_map.get('salary')
+    if not chunksize:
+        with PROFILER.section('load_dataset') as section:
+            df = read_dataset(file_path, columns=usecols)
+            section.rows = len(df)
+        if prepared is not None:
+            _add_prepared_columns(df, prepared)
+            yield df
+            return
+        df['standardized_title'] = standardize_titles(df[col_map['title']])
+        if salary_col and salary_col in df.columns:
+            df['cleaned_salary'] = filter_salaries(df['standardized_title'], df[salary_col])
+        df['posting_fingerprint'] = posting_fingerprints(df, col_map)
+        yield df
+        return
+    
+    # Types are inferred per chunk, so a chunk where a text column is empty
+    # would read it as float; read the mapped text columns as strings
+    columns = dataset_columns(file_path)
+    text_dtypes = {
+        col: str for field, col in col_map.items()
+        if col in columns and field not in NUMERIC_FIELDS and (usecols is None or col in usecols)
+    }
+    
+    cleaned_salaries = None
+    if prepared is None and salary_col and salary_col in columns:
+        titles = []
+        salaries = []
+        title_chunks = iter_dataset(file_path, chunksize, columns=[col_map['title'], salary_col], dtype=text_dtypes)
+        for chunk in PROFILER.iterate('load_dataset', title_chunks):
+            titles.append(standardize_titles(chunk[col_map['title']]))
+            salaries.append(chunk[salary_col].astype(object))
+        if titles:
+            cleaned_salaries = filter_salaries(pd.concat(titles), pd.concat(salaries))
+    
+    for df in PROFILER.iterate('load_dataset', iter_dataset(file_path, chunksize, columns=usecols, dtype=text_dtypes)):
+        if prepared is not None:
+            _add_prepared_columns(df, prepared)
+            yield df
+            continue
+        df['standardized_title'] = standardize_titles(df[col_map['title']])
+        if cleaned_salaries is not None:
+            df['cleaned_salary'] = cleaned_salaries.loc[df.index]
+        df['posting_fingerprint'] = posting_fingerprints(df, col_map)
+        yield df
+
+def mapped_columns(file_path, col_map):
+    """The columns of a source that col_map maps fields to, the only ones processing uses."""
+    columns = dataset_columns(file_path)
+    return [col for col in dict.fromkeys(col_map.values()) if col and col in columns]
+
+def prepare_job_data(file_path, col_map, chunksize=None):
+    """
+    The columns read_job_data adds to the rows of a CSV (PREPARED_COLUMNS that
+    apply to the source), as one DataFrame indexed like the rows. Only the
+    CSV columns they are computed from are read.
+    """
+    columns = dataset_columns(file_path)
+    usecols = [col for field, col in col_map.items() if field in PREPARED_FIELDS and col in columns]
+    frames = [
+        df[[column for column in PREPARED_COLUMNS if column in df.columns]]
+        for df in read_job_data(file_path, col_map, chunksize, usecols=usecols)
+    ]
+    return pd.concat(frames) if frames else pd.DataFrame(columns=PREPARED_COLUMNS)
+
+@dataclass
+class ProcessingOptions:
+    """
+    Settings of process_job_data that are the same for every source of a run.
+    If nlp_batch_size is set, skills are extracted up front with extract_skills_batch.
+    With workers > 1, the rows are split into partitions that are extracted and
+    aggregated in a process pool, then merged back in order.
+    If a SkillCache is given, postings whose description was already extracted
+    (with the same extractor version) skip NLP, and new results are stored.
+    With chunksize, the CSV is read and processed chunksize rows at a time. If
+    posting_sink is also given, each chunk's job postings are passed to it
+    once the chunk is merged, instead of being kept in the result.
+    If skill_matrix_rows is given, a (role, salary, skills) tuple is appended
+    to it for every job posting returned, in the same order.
+    If incremental, rows whose fingerprint is already in the JobPostings
+    collection of db (postings stored under the same normalized title, company
+    and URL, even if their description changed since) are dropped before any
+    extraction.
+    Errors are printed and the rows read so far kept, unless strict.
+    """
+    nlp_batch_size: Optional[int] = None
+    nlp_n_process: int = 1
+    workers: int = 1
+    skill_cache: Optional[SkillCache] = None
+    chunksize: Optional[int] = None
+    posting_sink: Optional[Callable] = None
+    skill_matrix_rows: Optional[list] = None
+    incremental: bool = False
+    strict: bool = False
+
+    @classmethod
+    def from_config(cls, config):
+        """The options set in a run's config; the caches and outputs of the run are added by the caller."""
+        return cls(nlp_batch_size=config.get('nlp_batch_size'), nlp_n_process=config.get('nlp_n_process', 1),
+                   workers=config.get('workers', 1), chunksize=config.get('chunksize'))
+
+def process_job_data(file_path, source_name, db, industry_name, options=None, aggregate=None, prepared=None,
+                     known_skills=None, skill_sink=None):
+    """
+    Process job data from a CSV file (LinkedIn or Glassdoor) and extract relevant information.
+    This is a unified function that handles both sources with source-specific adaptations.
+    Returns a PartialAggregate; if aggregate is given, the file's postings are
+    merged into it (following the postings already there) and it is returned.
+    options are the ProcessingOptions of the run (default: all defaults).
+    prepared is the file's prepare_job_data frame, if already computed.
+    known_skills (row index -> skills) gives the skills of every posting, so
+    no extraction is run; skill_sink, if given, is called with the row
+    indexes and skills of each frame's postings.
+    """
+    print(f"Processing {source_name} data from: {file_path}")
+    
+    if options is None:
+        options = ProcessingOptions()
+    if aggregate is None:
+        aggregate = PartialAggregate()
     
     try:
-        # Load the data
-        df = pd.read_csv(file_path)
-        print(f"{source_name} data loaded with {len(df)} rows")
-        
         # Map column names based on source
-        if source_name.lower() == 'linkedin':
-            col_map = {
-                'title': 'title',
-                'company': 'company',
-                'location': 'location',
-                'description': 'job_description',
-                'url': 'job_url',
-                'date': 'date_loaded',
-                'salary': 'salary'
-            }
-        else:  # Glassdoor
-            col_map = {
-                'title': 'job_title',
-                'company': 'company_name',
-                'location': 'job_location',
-                'description': 'job_overview',
-                'url': 'job_application_link',
-                'date': None,
-                'salary': 'pay_range_glassdoor_est',
-                'median_salary': 'pay_median_glassdoor',
-                'company_industry': 'company_industry',
-                'company_revenue': 'company_revenue',
-                'company_size': 'company_size',
-                'company_type': 'company_type',
-                'company_rating': 'company_rating',
-                'company_website': 'company_website'
-            }
-        
-        # Standardize job titles
-        df['standardized_title'] = df[col_map['title']].apply(standardize_title)
+        col_map = get_column_map(source_name)
         
-        # Process salary information if available
-        salary_col = col_map.get('salary')
-        median_salary_col = col_map.get('median_salary')
+        # Load the data (whole, or one chunk at a time)
+        row_count = 0
+        stored_count = 0
+        for df in read_job_data(file_path, col_map, options.chunksize, prepared, mapped_columns(file_path, col_map)):
+            row_count += len(df)
+            if options.incremental:
+                stored = df['posting_fingerprint'].isin(stored_fingerprints(db, df['posting_fingerprint']))
+                stored_count += int(stored.sum())
+                df = df[~stored]
+            aggregate.merge(process_job_frame(df, col_map, source_name, industry_name, options, known_skills,
+                                              skill_sink))
+            if options.chunksize and options.posting_sink is not None:
+                options.posting_sink(aggregate.take_job_postings())
+        print(f"{source_name} data loaded with {row_count} rows")
+        if options.incremental:
+            print(f"Skipped {stored_count} {source_name} postings already stored")
+            
+    except Exception as e:
+        if options.strict:
+            raise
+        print(f"Error processing {source_name} data: {e}")
+    
+    return aggregate
+
+def stored_fingerprints(db, fingerprints, batch_size=DEFAULT_WRITE_BATCH_SIZE):
+    """The fingerprints (see posting_fingerprints) of postings already in the JobPostings collection."""
+    fingerprints = list(dict.fromkeys(fingerprints))
+    stored = set()
+    for offset in range(0, len(fingerprints), batch_size):
+        cursor = db.JobPostings.find({"fingerprint": {"$in": fingerprints[offset:offset + batch_size]}},
+                                     {"fingerprint": 1, "_id": 0})
+        stored.update(document['fingerprint'] for document in cursor)
+    return stored
+
+def process_job_frame(df, col_map, source_name, industry_name, options, known_skills=None, skill_sink=None):
+    """
+    Extract and aggregate the postings of a DataFrame from read_job_data (a
+    whole CSV or one chunk of it) into a PartialAggregate. See process_job_data.
+    """
+    nlp_batch_size = options.nlp_batch_size
+    workers = options.workers
+    skill_cache = options.skill_cache
+    skill_matrix_rows = options.skill_matrix_rows
+    
+    # Look up skills extracted for the same descriptions on earlier runs
+    cached_skills = None
+    extracted_skills = None
+    if known_skills is not None:
+        # Skills of every posting are known, so the postings are only aggregated
+        cached_skills = {index: known_skills[index] for index in df.index[postings_to_process(df, col_map)]}
+        skill_cache = None
+        nlp_batch_size = None
+        workers = 1
+    elif skill_cache is not None:
+        descriptions = _column_or_blank(df, col_map['description'])[postings_to_process(df, col_map)]
+        descriptions = descriptions[descriptions.map(lambda d: isinstance(d, str))]
+        cached_skills = {
+            index: skills
+            for index, skills in zip(descriptions.index, skill_cache.get_many(descriptions))
+            if skills is not None
+        }
+    if skill_cache is not None or skill_matrix_rows is not None or skill_sink is not None:
+        extracted_skills = {}
+    
+    if skill_matrix_rows is not None or skill_sink is not None:
+        row_skills = dict(cached_skills or {})
+    
+    if workers > 1:
+        # Salary outliers are filtered per role over the whole file in
+        # read_job_data, so only extraction and aggregation are split across partitions
+        partition_count = min(len(df), workers * PARTITIONS_PER_WORKER)
+        bounds = np.linspace(0, len(df), partition_count + 1, dtype=int)
+        partitions = [df.iloc[bounds[i]:bounds[i + 1]] for i in range(partition_count)]
+        print(f"Processing {len(partitions)} partitions with {workers} workers")
         
-        if salary_col and salary_col in df.columns:
-            df['cleaned_salary'] = df[salary_col].apply(clean_salary)
-            df['cleaned_salary_filtered'] = df.groupby('standardized_title')['cleaned_salary'].transform(
-                lambda x: x if len(x) <= 10 else remove_salary_outliers(x)
-            )
-            df['cleaned_salary'] = df['cleaned_salary_filtered']
+        if cached_skills is not None:
+            partition_cached_skills = [
+                {index: cached_skills[index] for index in partition.index if index in cached_skills}
+                for partition in partitions
+            ]
+        else:
+            partition_cached_skills = repeat(None)
         
-        # Process each job posting
-        for _, row in df.iterrows():
-            title = row.get(col_map['title'], '')
-            company = row.get(col_map['company'], '')
-            location = row.get(col_map['location'], '')
-            description = row.get(col_map['description'], '')
-            job_url = row.get(col_map['url'], '')
-            
-            if not title or not company or not description:
-                continue
-            
-            role_name = row.get('standardized_title')
-            
-            # Extract skills
-            skills = extract_skills_from_text(description)
-            
-            # Get salary information
-            salary_info = None
-            salary_range = None
-            median_salary = None
-            
-            if 'cleaned_salary' in df.columns:
-                salary_info = row.get('cleaned_salary')
-            
-            if salary_col and salary_col in df.columns:
-                salary_range = row.get(salary_col)
-            
-            if median_salary_col and median_salary_col in df.columns:
-                median_salary = row.get(median_salary_col)
-            
-            # Get company industry (Glassdoor specific)
-            company_industry = None
-            if 'company_industry' in col_map and col_map['company_industry'] in df.columns:
-                company_industry = row.get(col_map['company_industry'])
-            
-            # Determine if the job is tech-related
-            is_tech_job = False
-            if role_name and any(tech_role.lower() in role_name.lower() for tech_role in COMMON_TECH_ROLES):
-                is_tech_job = True
-            elif skills and any(skill.lower() in [s.lower() for s in COMMON_TECH_SKILLS] for skill in skills):
-                is_tech_job = True
-            
-            # Assign industry: prioritize "Tech" for tech-related jobs
-            if is_tech_job:
-                final_industry = "Tech"
+        with tempfile.TemporaryDirectory() as shared_dir:
+            # Descriptions are written once to a memory-mapped file the workers
+            # read their ranges from, rather than pickled with the partitions
+            shared_descriptions = share_descriptions(df, col_map, shared_dir)
+            if shared_descriptions is not None:
+                partition_frames = [partition.drop(columns=col_map['description']) for partition in partitions]
+                partition_descriptions = [shared_descriptions[bounds[i]:bounds[i + 1]]
+                                          for i in range(partition_count)]
             else:
-                final_industry = company_industry or industry_name
-            
-            # For salary analysis
-            if salary_info:
-                salary_data.append({
-                    'role': role_name,
-                    'company': company,
-                    'skills': skills,
-                    'salary': salary_info
-                })
+                partition_frames = partitions
+                partition_descriptions = repeat(None)
             
-            # Update companies data
-            if company not in companies_data:
-                company_entry = {
-                    'name': company,
-                    'industry': final_industry,
-                    'job_postings': 1,
-                    'roles': [role_name] if role_name else [],
-                    'locations': [location] if location else []
-                }
-                
-                if source_name.lower() == 'glassdoor':
-                    if 'company_revenue' in col_map and col_map['company_revenue'] in df.columns:
-                        company_entry['revenue'] = row.get(col_map['company_revenue'])
-                    if 'company_size' in col_map and col_map['company_size'] in df.columns:
-                        company_entry['size'] = row.get(col_map['company_size'])
-                    if 'company_type' in col_map and col_map['company_type'] in df.columns:
-                        company_entry['type'] = row.get(col_map['company_type'])
-                    if 'company_rating' in col_map and col_map['company_rating'] in df.columns:
-                        company_entry['rating'] = row.get(col_map['company_rating'])
-                    if 'company_website' in col_map and col_map['company_website'] in df.columns:
-                        company_entry['website'] = row.get(col_map['company_website'])
-                
-                companies_data[company] = company_entry
-            else:
-                companies_data[company]['job_postings'] += 1
-                if role_name and role_name not in companies_data[company]['roles']:
-                    companies_data[company]['roles'].append(role_name)
-                if location and location not in companies_data[company]['locations']:
-                    companies_data[company]['locations'].append(location)
-            
-            # Update roles data
-            if role_name:
-                if role_name not in roles_data:
-                    role_entry = {
-                        'role_name': role_name,
-                        'industries': [final_industry],
-                        'open_positions_count': 1,
-                        'top_hiring_companies': [company] if company else [],
-                        'required_skills': skills,
-                        'description': f"{role_name}s are responsible for {', '.join(skills[:3]) if skills else 'technical tasks'} and other technical tasks."
-                    }
-                    
-                    if salary_range:
-                        role_entry['salary_range'] = salary_range
-                    if median_salary:
-                        role_entry['median_salary'] = median_salary
-                    if salary_info:
-                        role_entry['calculated_salary'] = salary_info
-                    
-                    roles_data[role_name] = role_entry
-                else:
-                    roles_data[role_name]['open_positions_count'] += 1
-                    if company and company not in roles_data[role_name]['top_hiring_companies']:
-                        roles_data[role_name]['top_hiring_companies'].append(company)
-                    if final_industry and final_industry not in roles_data[role_name]['industries']:
-                        roles_data[role_name]['industries'].append(final_industry)
-                    for skill in skills:
-                        if skill not in roles_data[role_name]['required_skills']:
-                            roles_data[role_name]['required_skills'].append(skill)
-                    
-                    if salary_info and 'salary_data' not in roles_data[role_name]:
-                        roles_data[role_name]['salary_data'] = [salary_info]
-                    elif salary_info and 'salary_data' in roles_data[role_name]:
-                        roles_data[role_name]['salary_data'].append(salary_info)
-            
-            # Update skills data
-            for skill in skills:
-                if skill not in skills_data:
-                    skill_entry = {
-                        'skill_name': skill,
-                        'industries': [final_industry],
-                        'job_postings_count': 1,
-                        'related_roles': [role_name] if role_name else [],
-                        'description': f"{skill.title()} is a technical skill used in {final_industry}.",
-                        'learning_resources': []
-                    }
-                    
-                    if salary_info:
-                        skill_entry['salary_data'] = [salary_info]
-                    
-                    skills_data[skill] = skill_entry
-                else:
-                    skills_data[skill]['job_postings_count'] += 1
-                    if role_name and role_name not in skills_data[skill]['related_roles']:
-                        skills_data[skill]['related_roles'].append(role_name)
-                    if final_industry and final_industry not in skills_data[skill]['industries']:
-                        skills_data[skill]['industries'].append(final_industry)
-                    
-                    if salary_info:
-                        if 'salary_data' not in skills_data[skill]:
-                            skills_data[skill]['salary_data'] = [salary_info]
-                        else:
-                            skills_data[skill]['salary_data'].append(salary_info)
-            
-            # Create job posting entry
-            try:
-                if col_map['date'] and col_map['date'] in df.columns:
-                    date_str = row.get(col_map['date'], '')
-                    posted_date = datetime.strptime(date_str, '%Y-%m-%d') if date_str else datetime.now()
-                else:
-                    posted_date = datetime.now()
-            except:
-                posted_date = datetime.now()
-                
-            job_posting = {
-                'title': title,
-                'standardized_title': role_name,
-                'company': company,
-                'role': role_name,
-                'location': location,
-                'description': description,
-                'skills_required': skills,
-                'url': job_url,
-                'posted_date': posted_date,
-                'source': source_name,
-                'industry': final_industry
-            }
-            
-            if salary_range:
-                job_posting['salary_range'] = salary_range
-            if median_salary:
-                job_posting['median_salary'] = median_salary
-            if salary_info:
-                job_posting['calculated_salary'] = salary_info
-                
-            job_postings.append(job_posting)
-            
-    except Exception as e:
-        print(f"Error processing {source_name} data: {e}")
+            with ProcessPoolExecutor(max_workers=workers, initializer=reset_worker) as executor:
+                # spaCy runs in-process inside each worker
+                partial_results = list(executor.map(
+                    aggregate_job_partition, partition_frames, repeat(col_map), repeat(source_name),
+                    repeat(industry_name), repeat(nlp_batch_size), partition_cached_skills, partition_descriptions
+                ))
+        
+        result = PartialAggregate()
+        for partition_result, partition_extracted_skills, partition_profile in partial_results:
+            result.merge(partition_result)
+            PROFILER.merge(partition_profile)
+            if extracted_skills is not None:
+                extracted_skills.update(partition_extracted_skills)
+        if shared_descriptions is not None:
+            # The job posting records came back without their descriptions
+            posting_descriptions = _column_values(df[postings_to_process(df, col_map)], col_map['description'])
+            for job_posting, description in zip(result.job_postings, posting_descriptions):
+                job_posting['description'] = description
+    else:
+        result = aggregate_job_postings(
+            df, col_map, source_name, industry_name, nlp_batch_size, options.nlp_n_process,
+            cached_skills=cached_skills, extracted_skills=extracted_skills
+        )
     
-    return companies_data, roles_data, skills_data, job_postings, salary_data
+    if skill_matrix_rows is not None or skill_sink is not None:
+        row_skills.update(extracted_skills)
+        processed = df[postings_to_process(df, col_map)]
+        if skill_sink is not None:
+            skill_sink(processed.index, [row_skills[index] for index in processed.index])
+        if skill_matrix_rows is not None:
+            salaries = processed['cleaned_salary'] if 'cleaned_salary' in processed.columns else repeat(None)
+            for index, role, salary in zip(processed.index, processed['standardized_title'], salaries):
+                skill_matrix_rows.append((role, salary, row_skills[index]))
+    
+    if skill_cache is not None:
+        skill_cache.put_many(
+            (descriptions[index], skills)
+            for index, skills in extracted_skills.items()
+            if index in descriptions.index
+        )
+    
+    return result
 
-def process_linkedin_data(file_path, db, industry_name):
+def process_linkedin_data(file_path, db, industry_name, **kwargs):
     """
     Process LinkedIn CSV data and update MongoDB collections.
     Now using the unified processing function.
     """
-    return process_job_data(file_path, 'LinkedIn', db, industry_name)
+    return process_job_data(file_path, 'LinkedIn', db, industry_name, **kwargs)
 
-def process_glassdoor_data(file_path, db, industry_name):
+def process_glassdoor_data(file_path, db, industry_name, **kwargs):
     """
     Process Glassdoor CSV data and update MongoDB collections.
     Now using the unified processing function.
     """
-    return process_job_data(file_path, 'Glassdoor', db, industry_name)
-
-def calculate_salary_metrics(salary_data):
-    """
-    Calculate salary metrics from collected salary data.
-    Returns dictionaries for role_salary_metrics and skill_salary_metrics.
-    """
-    # Create DataFrame from collected salary data
-    salary_df = pd.DataFrame(salary_data)
-    
-    # Initialize result dictionaries
-    role_salary_metrics = {}
-    skill_salary_metrics = {}
-    
-    # Calculate metrics by role
-    for role, group in salary_df.groupby('role'):
-        salaries = group['salary'].dropna()
-        if len(salaries) >= 3:  # Only calculate metrics if we have enough data points
-            role_salary_metrics[role] = {
-                'count': len(salaries),
-                'min': salaries.min(),
-                'max': salaries.max(),
-                'mean': salaries.mean(),
-                'median': salaries.median(),
-                'p25': salaries.quantile(0.25),
-                'p75': salaries.quantile(0.75)
-            }
-    
-    # Calculate metrics by skill
-    # Explode the skills column to get one row per skill per job
-    exploded_df = salary_df.explode('skills')
-    exploded_df = exploded_df[exploded_df['skills'].notna()]  # Remove rows with NA skills
-    
-    for skill, group in exploded_df.groupby('skills'):
-        salaries = group['salary'].dropna()
-        if len(salaries) >= 3:  # Only calculate if we have enough data points
-            skill_salary_metrics[skill] = {
-                'count': len(salaries),
-                'min': salaries.min(),
-                'max': salaries.max(),
-                'mean': salaries.mean(),
-                'median': salaries.median(),
-                'p25': salaries.quantile(0.25),
-                'p75': salaries.quantile(0.75)
-            }
-    
-    return role_salary_metrics, skill_salary_metrics
+    return process_job_data(file_path, 'Glassdoor', db, industry_name, **kwargs)
+
+@PROFILER.timed('sketch_salary_metrics', rows=len)
+def sketch_salary_metrics(aggregates):
+    """
+    Salary metrics from the salary sketches of role or skill aggregates
+    (name -> aggregate): one row per role or skill with at least 3 salaries,
+    indexed by name, with the SALARY_METRICS columns.
+    """
+    names = [name for name in sorted(aggregates) if aggregates[name].salary_sketch.count >= 3]
+    return pd.DataFrame([aggregates[name].salary_sketch.metrics() for name in names],
+                        index=names, columns=SALARY_METRICS)
 
+@PROFILER.timed('write.Industries')
 def update_industry_collection(db, industry_name, roles_data, skills_data, role_salary_metrics=None):
     """
     Update the Industries collection with aggregated data.
@@ -906,13 +1046,40 @@ def update_industry_collection(db, industry_name, roles_data, skills_data, role_
     roles_count = {role: data['open_positions_count'] for role, data in roles_data.items()}
     popular_roles = sorted(roles_count.items(), key=lambda x: x[1], reverse=True)[:20]
     
+    # Update industry document
+    industry["Roles"] = industry_roles
+    industry["Skills"] = industry_skills
+    industry["Popular_skills"] = [skill for skill, count in popular_skills]
+    industry["Popular_roles"] = [role for role, count in popular_roles]
+    industry.update(industry_salary_fields(roles_data, role_salary_metrics))
+    
+    # Upsert industry document
+    db.Industries.update_one(
+        {"Industry": industry_name},
+        {"$set": industry},
+        upsert=True
+    )
+    print(f"Updated industry: {industry_name}")
+
+def industry_salary_fields(roles_data, role_salary_metrics=None):
+    """
+    The salary fields of an industry document (median_salary, average_salary,
+    salary_ranges, top_paying_roles; those there is data for), from the role
+    documents of the industry (role name -> document) and their salary metrics.
+    """
+    industry = {}
+    industry_roles = list(roles_data)
+    
     # Calculate median salary for the industry
     median_salaries = []
     salary_ranges = []
+    salary_sketch = SalarySketch()
     
     # 1. Traditional approach from original script
     for role, data in roles_data.items():
-        if 'median_salary' in data and data['median_salary']:
+        # Fields filled in from the role's salary metrics are not the postings' (see metric_salary_fields)
+        from_metrics = data.get('metric_salary_fields') or ()
+        if 'median_salary' in data and data['median_salary'] and 'median_salary' not in from_metrics:
             try:
                 # Extract numeric value from median salary string
                 salary_str = str(data['median_salary'])
@@ -925,35 +1092,24 @@ def update_industry_collection(db, industry_name, roles_data, skills_data, role_
                 pass
         
         # Also include calculated salary values if available
-        if 'salary_data' in data and data['salary_data']:
-            for salary in data['salary_data']:
-                if salary and isinstance(salary, (int, float)):
-                    median_salaries.append(salary)
+        if data.get('salary_sketch'):
+            salary_sketch.merge(SalarySketch.from_document(data['salary_sketch']))
             
-        if 'salary_range' in data and data['salary_range']:
+        if 'salary_range' in data and data['salary_range'] and 'salary_range' not in from_metrics:
             salary_ranges.append(data['salary_range'])
     
-    if role_salary_metrics:
-        for role, metrics in role_salary_metrics.items():
-            if metrics.get('median'):
-                median_salaries.append(metrics['median'])
+    if role_salary_metrics is not None:
+        role_medians = role_salary_metrics['median']
+        median_salaries.extend(role_medians[role_medians != 0])
             
     industry_median_salary = None
     industry_avg_salary = None
-    if median_salaries:
-        # Filter out any NaN values before calculating median and mean
-        filtered_salaries = [s for s in median_salaries if not (isinstance(s, float) and np.isnan(s))]
-        
-        if filtered_salaries:  # Only calculate if we have valid values after filtering
-            # Calculate the median and round to nearest whole dollar
-            industry_median_salary = round(np.median(filtered_salaries))
-            industry_avg_salary = round(np.mean(filtered_salaries))
-        
-    # Update industry document
-    industry["Roles"] = industry_roles
-    industry["Skills"] = industry_skills
-    industry["Popular_skills"] = [skill for skill, count in popular_skills]
-    industry["Popular_roles"] = [role for role, count in popular_roles]
+    # The sketch ignores NaN values
+    salary_sketch.update(median_salaries)
+    if salary_sketch.count:
+        # Calculate the median and round to nearest whole dollar
+        industry_median_salary = round(salary_sketch.quantile(0.5))
+        industry_avg_salary = round(salary_sketch.mean)
 
     # Add salary information
     if industry_median_salary:
@@ -964,40 +1120,92 @@ def update_industry_collection(db, industry_name, roles_data, skills_data, role_
         industry["salary_ranges"] = salary_ranges[:5]  # Store up to 5 representative ranges
     
     # Add popular skills with salary information
-    if role_salary_metrics:
-        top_paying_roles = sorted(
-            [r for r in role_salary_metrics.keys() if r in industry_roles],
-            key=lambda r: role_salary_metrics[r]['median'],
-            reverse=True
-        )[:5]
+    if role_salary_metrics is not None and not role_salary_metrics.empty:
+        top_paying_roles = role_salary_metrics[role_salary_metrics.index.isin(industry_roles)].nlargest(5, 'median')
         
         industry["top_paying_roles"] = [{
             "role": role,
-            "median_salary": role_salary_metrics[role]['median'],
-            "average_salary": role_salary_metrics[role]['mean']
-        } for role in top_paying_roles]
-    
-    # Upsert industry document
-    db.Industries.update_one(
-        {"Industry": industry_name},
-        {"$set": industry},
-        upsert=True
-    )
-    print(f"Updated industry: {industry_name}")
+            "median_salary": median,
+            "average_salary": mean
+        } for role, median, mean in zip(top_paying_roles.index, top_paying_roles['median'].tolist(),
+                                        top_paying_roles['mean'].tolist())]
+    return industry
+
+def bulk_write_batches(collection, operations, batch_size=DEFAULT_WRITE_BATCH_SIZE):
+    """
+    Run write operations (UpdateOne, UpdateMany, ...) as unordered bulk_write
+    calls of at most batch_size operations each.
+    Returns (upserted _id by operation index, seconds taken). Profiled as
+    write.<collection name>.
+    """
+    start = time.perf_counter()
+    upserted_ids = {}
+    with PROFILER.section(f'write.{collection.name}', rows=len(operations)):
+        for offset in range(0, len(operations), batch_size):
+            result = collection.bulk_write(operations[offset:offset + batch_size], ordered=False)
+            upserted_ids.update((offset + index, _id) for index, _id in result.upserted_ids.items())
+    return upserted_ids, time.perf_counter() - start
+
+def write_collections(db, operations, batch_size=DEFAULT_WRITE_BATCH_SIZE, threads=None):
+    """
+    bulk_write_batches for each collection name -> operations, writing the
+    collections concurrently (one thread per collection unless threads is set).
+    Returns collection name -> (upserted _id by operation index, seconds taken).
+    """
+    operations = {name: collection_operations for name, collection_operations in operations.items()
+                  if collection_operations}
+    if not operations:
+        return {}
+    with ThreadPoolExecutor(max_workers=threads or len(operations)) as executor:
+        futures = {
+            name: executor.submit(bulk_write_batches, db[name], collection_operations, batch_size)
+            for name, collection_operations in operations.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+def _print_write_rate(description, count, seconds):
+    rate = f"{count / seconds:,.0f}/s" if seconds else "n/a"
+    print(f"{description} in {seconds:.2f}s ({rate})")
+
+def metric_salary_fields(role_data, metrics):
+    """
+    The median_salary and salary_range of a role document taken from its
+    salary metrics: those its postings did not give, and those taken from
+    earlier metrics (listed in its metric_salary_fields, which is set to the
+    fields returned, so later runs know to update them).
+    """
+    earlier = role_data.get('metric_salary_fields') or ()
+    fields = {}
+    if 'median' in metrics and (not role_data.get('median_salary') or 'median_salary' in earlier):
+        fields['median_salary'] = metrics['median']
+    if 'min' in metrics and 'max' in metrics and (not role_data.get('salary_range') or 'salary_range' in earlier):
+        fields['salary_range'] = f"${metrics['min']:,.0f} - ${metrics['max']:,.0f}"
+    if fields:
+        fields['metric_salary_fields'] = list(fields)
+    return fields
 
-def update_collections(db, companies_data, roles_data, skills_data, job_postings, role_salary_metrics=None, skill_salary_metrics=None):
+def _salary_metrics_records(metrics):
+    """name -> salary_metrics field of a role or skill, from a salary metrics frame (or None)."""
+    return {} if metrics is None else metrics.to_dict('index')
+
+def update_collections(db, companies_data, roles_data, skills_data, job_postings, role_salary_metrics=None, skill_salary_metrics=None,
+                       write_batch_size=DEFAULT_WRITE_BATCH_SIZE, write_threads=None):
     """
     Update all MongoDB collections with processed data.
-    Now includes additional salary metrics.
+    Now includes additional salary metrics, from the role and skill salary
+    metrics frames (see sketch_salary_metrics).
+    The upserts are sent with unordered bulk_write calls of write_batch_size
+    operations, each collection from its own thread (at most write_threads).
     """
+    operations = {}
+    role_metrics = _salary_metrics_records(role_salary_metrics)
+    skill_metrics = _salary_metrics_records(skill_salary_metrics)
+    
     # Update Companies collection
-    for company_name, company_data in companies_data.items():
-        db.Companies.update_one(
-            {"name": company_name},
-            {"$set": company_data},
-            upsert=True
-        )
-    print(f"Updated {len(companies_data)} companies")
+    operations['Companies'] = [
+        UpdateOne({"name": company_name}, {"$set": company_data}, upsert=True)
+        for company_name, company_data in companies_data.items()
+    ]
     
     # Update Roles collection
     for role_name, role_data in roles_data.items():
@@ -1005,50 +1213,20 @@ def update_collections(db, companies_data, roles_data, skills_data, job_postings
         if len(role_data['top_hiring_companies']) > 10:
             role_data['top_hiring_companies'] = role_data['top_hiring_companies'][:10]
         
-        # Add additional salary metrics if available
-        if role_salary_metrics and role_name in role_salary_metrics:
-            metrics = role_salary_metrics[role_name]
-            role_data['salary_metrics'] = {
-                'count': metrics['count'],
-                'min': metrics['min'],
-                'max': metrics['max'],
-                'mean': metrics['mean'],
-                'median': metrics['median'],
-                'p25': metrics['p25'],
-                'p75': metrics['p75']
-            }
+        # Add additional salary metrics if available: the SALARY_METRICS fields only.
+        # The raw_data sub-document and salary_data list of earlier versions are
+        # no longer stored; salary_sketch holds the salaries instead
+        if role_name in role_metrics:
+            metrics = role_metrics[role_name]
+            role_data['salary_metrics'] = metrics
             
             # Also update main salary fields if not already set
-            if not role_data.get('median_salary') and 'median' in metrics:
-                role_data['median_salary'] = metrics['median']
-            if not role_data.get('salary_range') and 'min' in metrics and 'max' in metrics:
-                role_data['salary_range'] = f"${metrics['min']:,.0f} - ${metrics['max']:,.0f}"
-        
-        # Calculate salary statistics from raw data if available
-        if 'salary_data' in role_data and role_data['salary_data']:
-            salaries = [s for s in role_data['salary_data'] if s is not None]
-            if len(salaries) >= 3:
-                if 'salary_metrics' not in role_data:
-                    role_data['salary_metrics'] = {}
-                
-                role_data['salary_metrics']['raw_data'] = {
-                    'count': len(salaries),
-                    'min': min(salaries),
-                    'max': max(salaries),
-                    'mean': sum(salaries) / len(salaries),
-                    'median': sorted(salaries)[len(salaries) // 2]
-                }
-                
-                # Remove raw salary data after calculations to save space
-                role_data.pop('salary_data', None)
+            role_data.update(metric_salary_fields(role_data, metrics))
         
         # Add ObjectIds for references if needed
-        db.Roles.update_one(
-            {"role_name": role_name},
-            {"$set": role_data},
-            upsert=True
+        operations.setdefault('Roles', []).append(
+            UpdateOne({"role_name": role_name}, {"$set": role_data}, upsert=True)
         )
-    print(f"Updated {len(roles_data)} roles")
     
     # Update Skills collection
     for skill_name, skill_data in skills_data.items():
@@ -1057,104 +1235,356 @@ def update_collections(db, companies_data, roles_data, skills_data, job_postings
             skill_data['related_roles'] = skill_data['related_roles'][:10]
         
         # Add salary metrics if available
-        if skill_salary_metrics and skill_name in skill_salary_metrics:
-            metrics = skill_salary_metrics[skill_name]
-            skill_data['salary_metrics'] = {
-                'count': metrics['count'],
-                'min': metrics['min'],
-                'max': metrics['max'],
-                'mean': metrics['mean'],
-                'median': metrics['median'],
-                'p25': metrics['p25'],
-                'p75': metrics['p75']
-            }
-        
-        # Calculate salary statistics from raw data if available
-        if 'salary_data' in skill_data and skill_data['salary_data']:
-            salaries = [s for s in skill_data['salary_data'] if s is not None]
-            if len(salaries) >= 3:
-                if 'salary_metrics' not in skill_data:
-                    skill_data['salary_metrics'] = {}
-                
-                skill_data['salary_metrics']['raw_data'] = {
-                    'count': len(salaries),
-                    'min': min(salaries),
-                    'max': max(salaries),
-                    'mean': sum(salaries) / len(salaries),
-                    'median': sorted(salaries)[len(salaries) // 2]
-                }
-                
-                # Remove raw salary data after calculations to save space
-                skill_data.pop('salary_data', None)
+        if skill_name in skill_metrics:
+            skill_data['salary_metrics'] = skill_metrics[skill_name]
         
-        db.Skills.update_one(
-            {"skill_name": skill_name},
-            {"$set": skill_data},
-            upsert=True
+        operations.setdefault('Skills', []).append(
+            UpdateOne({"skill_name": skill_name}, {"$set": skill_data}, upsert=True)
         )
-    print(f"Updated {len(skills_data)} skills")
     
     # Update JobPostings collection
-    for job_posting in job_postings:
-        db.JobPostings.update_one(
-            {
-                "title": job_posting['title'],
-                "company": job_posting['company'],
-                "url": job_posting['url']
-            },
-            {"$set": job_posting},
-            upsert=True
-        )
-    print(f"Updated {len(job_postings)} job postings")
+    operations['JobPostings'] = job_posting_operations(job_postings)
     
     # Create a new SalaryAnalysis collection for aggregated salary data
-    if role_salary_metrics or skill_salary_metrics:
+    if role_metrics or skill_metrics:
         # Store top paying roles
-        if role_salary_metrics:
-            top_roles = sorted(
-                role_salary_metrics.items(), 
-                key=lambda x: x[1]['median'] if 'median' in x[1] else 0, 
-                reverse=True
-            )[:20]  # Store top 20 highest paying roles
+        if role_metrics:
+            top_roles = role_salary_metrics.nlargest(20, 'median').index  # Store top 20 highest paying roles
             
-            for role, metrics in top_roles:
-                db.SalaryAnalysis.update_one(
+            for role in top_roles:
+                operations.setdefault('SalaryAnalysis', []).append(UpdateOne(
                     {"type": "role", "name": role},
                     {"$set": {
                         "type": "role",
                         "name": role,
-                        "metrics": metrics
+                        "metrics": role_metrics[role]
                     }},
                     upsert=True
-                )
+                ))
         
         # Store top paying skills
-        if skill_salary_metrics:
+        if skill_metrics:
             # Only consider skills with significant data
-            significant_skills = {k: v for k, v in skill_salary_metrics.items() if v.get('count', 0) >= 5}
+            significant_skills = skill_salary_metrics[skill_salary_metrics['count'] >= 5]
+            top_skills = significant_skills.nlargest(20, 'median').index  # Store top 20 highest paying skills
             
-            top_skills = sorted(
-                significant_skills.items(),
-                key=lambda x: x[1]['median'] if 'median' in x[1] else 0,
-                reverse=True
-            )[:20]  # Store top 20 highest paying skills
-            
-            for skill, metrics in top_skills:
-                db.SalaryAnalysis.update_one(
+            for skill in top_skills:
+                operations.setdefault('SalaryAnalysis', []).append(UpdateOne(
                     {"type": "skill", "name": skill},
                     {"$set": {
                         "type": "skill",
                         "name": skill,
-                        "metrics": metrics
+                        "metrics": skill_metrics[skill]
                     }},
                     upsert=True
-                )
+                ))
+    
+    results = write_collections(db, operations, write_batch_size, write_threads)
+    for name, description in (('Companies', 'companies'), ('Roles', 'roles'), ('Skills', 'skills'),
+                              ('JobPostings', 'job postings')):
+        count = len(operations.get(name, []))
+        _print_write_rate(f"Updated {count} {description}", count, results.get(name, ({}, 0.0))[1])
+    if 'SalaryAnalysis' in results:
+        count = len(operations['SalaryAnalysis'])
+        _print_write_rate(f"Created/updated SalaryAnalysis collection with {count} top paying roles and skills",
+                          count, results['SalaryAnalysis'][1])
+
+def ensure_incremental_indexes(db):
+    """Indexes for the lookups and upserts of incremental runs."""
+    db.JobPostings.create_index("fingerprint")
+    db.Companies.create_index("name")
+    db.Roles.create_index("role_name")
+    db.Skills.create_index("skill_name")
+
+def stored_salary_sketches(collection, key, aggregates, batch_size=DEFAULT_WRITE_BATCH_SIZE):
+    """
+    Salary sketches of role or skill aggregates (name -> aggregate), merged
+    into the sketches stored in collection (documents identified by key).
+    """
+    sketches = {name: aggregate.salary_sketch for name, aggregate in aggregates.items()
+                if aggregate.salary_sketch.count}
+    names = list(sketches)
+    for offset in range(0, len(names), batch_size):
+        cursor = collection.find({key: {"$in": names[offset:offset + batch_size]}, "salary_sketch": {"$exists": True}},
+                                 {key: 1, "salary_sketch": 1, "_id": 0})
+        for document in cursor:
+            stored = SalarySketch.from_document(document['salary_sketch'])
+            sketches[document[key]] = stored.merge(sketches[document[key]])
+    return sketches
+
+def stored_salary_metrics(documents):
+    """
+    Salary metrics frame, as sketch_salary_metrics gives it, of the
+    salary_metrics stored in role or skill documents (name -> document).
+    """
+    names = sorted(name for name, document in documents.items() if document.get('salary_metrics'))
+    return pd.DataFrame([documents[name]['salary_metrics'] for name in names], index=names, columns=SALARY_METRICS)
+
+def stored_salary_field_updates(db, role_names, batch_size=DEFAULT_WRITE_BATCH_SIZE):
+    """Updates of the stored roles' metric_salary_fields from their stored salary metrics."""
+    operations = []
+    for offset in range(0, len(role_names), batch_size):
+        cursor = db.Roles.find(
+            {"role_name": {"$in": role_names[offset:offset + batch_size]}, "salary_metrics": {"$exists": True}},
+            {"_id": 0, "role_name": 1, "median_salary": 1, "salary_range": 1, "metric_salary_fields": 1,
+             "salary_metrics": 1})
+        for document in cursor:
+            fields = metric_salary_fields(document, document['salary_metrics'])
+            if fields:
+                operations.append(UpdateOne({"role_name": document['role_name']}, {"$set": fields}))
+    return operations
+
+def apply_increments(db, industry_name, aggregate, write_batch_size=DEFAULT_WRITE_BATCH_SIZE, write_threads=None):
+    """
+    Incremental counterpart of update_industry_collection and update_collections:
+    add the postings of a PartialAggregate (postings not stored yet) to the
+    stored documents with $inc/$addToSet updates, inserting the companies,
+    roles and skills seen for the first time. The salary sketches of the
+    roles and skills are merged into the stored ones and their salary
+    metrics recomputed, and so are the industry's salary fields.
+    """
+    operations = {'Companies': [], 'Roles': [], 'Skills': []}
+    for company_name, company in aggregate.companies.items():
+        operations['Companies'].append(UpdateOne({"name": company_name}, company.to_increment(), upsert=True))
+    for name, key, aggregates in (('Roles', 'role_name', aggregate.roles), ('Skills', 'skill_name', aggregate.skills)):
+        sketches = stored_salary_sketches(db[name], key, aggregates, write_batch_size)
+        for entity, entity_aggregate in aggregates.items():
+            update = entity_aggregate.to_increment()
+            sketch = sketches.get(entity)
+            if sketch is not None:
+                update['$set'] = {'salary_sketch': sketch.to_document()}
+                if sketch.count >= 3:
+                    update['$set']['salary_metrics'] = sketch.metrics()
+            operations[name].append(UpdateOne({key: entity}, update, upsert=True))
+    operations['JobPostings'] = job_posting_operations(aggregate.job_postings)
+    
+    results = write_collections(db, operations, write_batch_size, write_threads)
+    for name, description in (('Companies', 'companies'), ('Roles', 'roles'), ('Skills', 'skills')):
+        count = len(operations[name])
+        _print_write_rate(f"Added postings to {count} {description}", count, results.get(name, ({}, 0.0))[1])
+    count = len(operations['JobPostings'])
+    _print_write_rate(f"Added {count} new job postings", count, results.get('JobPostings', ({}, 0.0))[1])
+    
+    # Salary fields of preferred-source postings replace those of roles stored
+    # from another source, as RoleAggregate.merge does in full runs
+    bulk_write_batches(db.Roles, [
+        UpdateOne({"role_name": role_name, "salary_source": {"$ne": PREFERRED_SALARY_SOURCE}}, update)
+        for role_name, update in ((role_name, role.to_salary_override()) for role_name, role in aggregate.roles.items())
+        if update is not None
+    ], write_batch_size)
+    
+    # Keep the first 10 hiring companies and related roles, and fill in the
+    # salary fields of the roles from their metrics, as full runs do
+    write_collections(db, {
+        'Roles': [UpdateOne({"role_name": role_name}, {"$push": {"top_hiring_companies": {"$each": [], "$slice": 10}}})
+                  for role_name in aggregate.roles] +
+                 stored_salary_field_updates(db, list(aggregate.roles), write_batch_size),
+        'Skills': [UpdateOne({"skill_name": skill_name}, {"$push": {"related_roles": {"$each": [], "$slice": 10}}})
+                   for skill_name in aggregate.skills]
+    }, write_batch_size, write_threads)
+    
+    # Industry: add the new roles and skills, and rank the stored counts
+    db.Industries.update_one(
+        {"Industry": industry_name},
+        {"$addToSet": {"Roles": {"$each": list(aggregate.roles)}, "Skills": {"$each": list(aggregate.skills)}}},
+        upsert=True
+    )
+    popular_roles = db.Roles.find({}, {"role_name": 1}).sort("open_positions_count", pymongo.DESCENDING).limit(20)
+    # Salary fields, from all stored roles as update_industry_collection computes them
+    roles_data = {document['role_name']: document for document in db.Roles.find(
+        {}, {"_id": 0, "role_name": 1, "median_salary": 1, "salary_range": 1, "metric_salary_fields": 1,
+             "salary_sketch": 1, "salary_metrics": 1})}
+    db.Industries.update_one(
+        {"Industry": industry_name},
+        {"$set": {
+            "Popular_skills": stored_popular_skills(db),
+            "Popular_roles": [document['role_name'] for document in popular_roles],
+            **industry_salary_fields(roles_data, stored_salary_metrics(roles_data))
+        }}
+    )
+    print(f"Updated industry: {industry_name}")
+    
+    refresh_salary_analysis(db, ('role', 'skill'), write_batch_size)
+
+def stored_popular_skills(db):
+    """The 20 stored skills with the most job postings."""
+    popular_skills = db.Skills.find({}, {"skill_name": 1}).sort("job_postings_count", pymongo.DESCENDING).limit(20)
+    return [document['skill_name'] for document in popular_skills]
+
+def refresh_salary_analysis(db, entry_types, write_batch_size=DEFAULT_WRITE_BATCH_SIZE):
+    """
+    Rewrite the SalaryAnalysis entries of the given types ('role', 'skill')
+    from the stored metrics: the top 20 highest paying roles, and skills
+    with significant data.
+    """
+    queries = {'role': (db.Roles, 'role_name', {"salary_metrics": {"$exists": True}}),
+               'skill': (db.Skills, 'skill_name', {"salary_metrics.count": {"$gte": 5}})}
+    salary_analysis = []
+    for entry_type in entry_types:
+        collection, key, query = queries[entry_type]
+        top = collection.find(query, {key: 1, "salary_metrics": 1}).sort("salary_metrics.median", pymongo.DESCENDING).limit(20)
+        names = []
+        for document in top:
+            names.append(document[key])
+            salary_analysis.append(UpdateOne(
+                {"type": entry_type, "name": document[key]},
+                {"$set": {"type": entry_type, "name": document[key], "metrics": document['salary_metrics']}},
+                upsert=True
+            ))
+        salary_analysis.append(DeleteMany({"type": entry_type, "name": {"$nin": names}}))
+    bulk_write_batches(db.SalaryAnalysis, salary_analysis, write_batch_size)
+
+def _job_posting_key(job_posting):
+    return {
+        "title": job_posting['title'],
+        "company": job_posting['company'],
+        "url": job_posting['url']
+    }
+
+def job_posting_operations(job_postings):
+    """
+    Upserts of job postings into the JobPostings collection, one per posting
+    key. Unordered bulk writes may apply operations in any order, so postings
+    sharing a key are combined into one $set, as successive upserts would
+    leave the document.
+    """
+    documents = []
+    key_positions = {}
+    for job_posting in job_postings:
+        key = (job_posting['title'], job_posting['company'], job_posting['url'])
+        position = key_positions.get(key)
+        if position is None:
+            key_positions[key] = len(documents)
+            documents.append(job_posting)
+        else:
+            documents[position] = {**documents[position], **job_posting}
+    
+    return [UpdateOne(_job_posting_key(document), {"$set": document}, upsert=True) for document in documents]
+
+def write_job_postings(db, job_postings, batch_size=DEFAULT_WRITE_BATCH_SIZE):
+    """
+    Upsert job postings into the JobPostings collection with bulk writes.
+    Returns the seconds taken.
+    """
+    return bulk_write_batches(db.JobPostings, job_posting_operations(job_postings), batch_size)[1]
+
+class JobPostingWriter:
+    """
+    posting_sink for process_job_data in chunked mode: writes each chunk's job
+    postings to MongoDB (and the token store builder) as they are produced.
+    """
+    
+    def __init__(self, db, token_store_builder=None, batch_size=DEFAULT_WRITE_BATCH_SIZE):
+        self.db = db
+        self.token_store_builder = token_store_builder
+        self.batch_size = batch_size
+        self.count = 0
+        self.seconds = 0.0
+    
+    def __call__(self, job_postings):
+        self.seconds += write_job_postings(self.db, job_postings, self.batch_size)
+        if self.token_store_builder is not None:
+            self.token_store_builder.add(job_postings)
+        self.count += len(job_postings)
+    
+    def finish(self):
+        _print_write_rate(f"Updated {self.count} job postings", self.count, self.seconds)
+
+def _stored_posting_filter(key):
+    """JobPostings filter of a posting key kept in the token store (missing values are None there)."""
+    return {field: value if value is not None else {"$in": [None, np.nan]}
+            for field, value in zip(POSTING_KEY_FIELDS, key)}
+
+def rescan_skill_changes(db, store, skill_terms=None, write_batch_size=DEFAULT_WRITE_BATCH_SIZE):
+    """
+    Patch the database for skills added to, changed in or removed from the
+    taxonomy since the token store was written. Each added or changed skill
+    is looked up in the stored token arrays: its Skills document is rewritten
+    from the matching postings, and it is added to the skills of those
+    postings, of their roles and of their industries. Removed skills are
+    dropped from all of these. The popular skills of the industries and the
+    skill entries of SalaryAnalysis are then ranked again. No NLP is run, so
+    skills only found by entity recognition are not picked up this way.
+    Returns (rescanned skills, removed skills).
+    """
+    if skill_terms is None:
+        skill_terms = get_skill_taxonomy().search_terms()
+    
+    changed = store.changed_skills(skill_terms)
+    removed = store.removed_skills(skill_terms)
+    operations = {'Skills': [], 'Roles': [], 'JobPostings': [], 'Industries': []}
+    posting_skills = defaultdict(list)  # Stored posting -> skills to add to it
+    for skill in changed:
+        rows = store.find_skill(skill_terms[skill])
+        store.skill_terms[skill] = skill_terms[skill]
+        if not len(rows):
+            continue
+        
+        related_roles = [role for role in dict.fromkeys(store.roles[i] for i in rows) if role]
+        industries = [industry for industry in dict.fromkeys(store.industries[i] for i in rows) if industry]
+        skill_data = {
+            'skill_name': skill,
+            'industries': industries,
+            'job_postings_count': len(rows),
+            'related_roles': related_roles[:10],
+            'description': f"{skill.title()} is a technical skill used in {industries[0] if industries else 'Tech'}."
+        }
         
-        print("Created/updated SalaryAnalysis collection with top paying roles and skills")
+        salary_sketch = SalarySketch.from_values(store.salaries[rows])
+        if salary_sketch.count:
+            skill_data['salary_sketch'] = salary_sketch.to_document()
+        if salary_sketch.count >= 3:
+            skill_data['salary_metrics'] = salary_sketch.metrics()
+        
+        operations['Skills'].append(UpdateOne(
+            {"skill_name": skill},
+            {"$set": skill_data, "$setOnInsert": {"learning_resources": []}},
+            upsert=True
+        ))
+        if related_roles:
+            operations['Roles'].append(UpdateMany(
+                {"role_name": {"$in": related_roles}},
+                {"$addToSet": {"required_skills": skill}}
+            ))
+        if industries:
+            operations['Industries'].append(UpdateMany(
+                {"Industry": {"$in": industries}},
+                {"$addToSet": {"Skills": skill}}
+            ))
+        for i in rows.tolist():
+            posting_skills[i].append(skill)
+        print(f"Rescanned skill '{skill}': {len(rows)} postings, {len(related_roles)} roles")
+    
+    if store.keys is not None:
+        operations['JobPostings'] = [
+            UpdateOne(_stored_posting_filter(store.keys[i]), {"$addToSet": {"skills_required": {"$each": skills}}})
+            for i, skills in posting_skills.items()
+        ]
+    elif posting_skills:
+        print("Token store has no posting keys (written by an older version); "
+              "skills of the job postings are not updated")
+    
+    if removed:
+        for skill in removed:
+            del store.skill_terms[skill]
+        print(f"Removing {len(removed)} skills no longer in the taxonomy: {', '.join(removed)}")
+        operations['Skills'].append(DeleteMany({"skill_name": {"$in": removed}}))
+        operations['Roles'].append(UpdateMany({}, {"$pull": {"required_skills": {"$in": removed}}}))
+        operations['JobPostings'].append(UpdateMany({}, {"$pull": {"skills_required": {"$in": removed}}}))
+        operations['Industries'].append(UpdateMany({}, {"$pull": {"Skills": {"$in": removed}}}))
+    
+    write_collections(db, operations, write_batch_size)
+    if changed or removed:
+        db.Industries.update_many({}, {"$set": {"Popular_skills": stored_popular_skills(db)}})
+        refresh_salary_analysis(db, ('skill',), write_batch_size)
+    return changed, removed
 
 def generate_visualizations(config, role_salary_metrics, skill_salary_metrics, all_roles, all_skills):
     """
     Generate and save visualizations based on the processed data.
+    Charts whose data has not changed since they were last drawn are kept
+    (see charts.py); the others are drawn in parallel, at PREVIEW_DPI if
+    config['preview_charts'] is set.
     """
     # Create output directory if it doesn't exist
     output_dir = config.get('output_dir', 'job_market_analysis')
@@ -1163,137 +1593,12 @@ def generate_visualizations(config, role_salary_metrics, skill_salary_metrics, a
     
     print(f"Generating visualizations in {viz_dir}...")
     
-    # Set visualization style
-    sns.set_style("whitegrid")
-    plt.rcParams.update({'font.size': 12})
-    
-    # 1. Top 15 Roles by Job Count
-    try:
-        roles_by_count = {role: data['open_positions_count'] for role, data in all_roles.items()}
-        roles_df = pd.DataFrame(list(roles_by_count.items()), columns=['Role', 'Count'])
-        roles_df = roles_df.sort_values('Count', ascending=False).head(15)
-        
-        plt.figure(figsize=(12, 8))
-        sns.barplot(x='Count', y='Role', data=roles_df, palette='viridis')
-        plt.title('Top 15 Most In-Demand Roles')
-        plt.tight_layout()
-        plt.savefig(os.path.join(viz_dir, 'top_roles_by_demand.png'), dpi=300)
-        plt.close()
-        print(f"✅ Created visualization: top_roles_by_demand.png")
-    except Exception as e:
-        print(f"Error creating top roles visualization: {e}")
-    
-    # 2. Top 15 Skills by Job Count
-    try:
-        skills_by_count = {skill: data['job_postings_count'] for skill, data in all_skills.items()}
-        skills_df = pd.DataFrame(list(skills_by_count.items()), columns=['Skill', 'Count'])
-        skills_df = skills_df.sort_values('Count', ascending=False).head(15)
-        
-        plt.figure(figsize=(12, 8))
-        sns.barplot(x='Count', y='Skill', data=skills_df, palette='magma')
-        plt.title('Top 15 Most In-Demand Skills')
-        plt.tight_layout()
-        plt.savefig(os.path.join(viz_dir, 'top_skills_by_demand.png'), dpi=300)
-        plt.close()
-        print(f"✅ Created visualization: top_skills_by_demand.png")
-    except Exception as e:
-        print(f"Error creating top skills visualization: {e}")
-    
-    # 3. Top 15 Highest Paying Roles
-    if role_salary_metrics:
-        try:
-            # Only include roles with sufficient data
-            significant_roles = {k: v for k, v in role_salary_metrics.items() if v.get('count', 0) >= 3}
-            
-            # Create DataFrame with salary metrics
-            salary_rows = []
-            for role, metrics in significant_roles.items():
-                salary_rows.append({
-                    'Role': role,
-                    'Median Salary': metrics.get('median', 0),
-                    'Count': metrics.get('count', 0)
-                })
-            
-            salary_df = pd.DataFrame(salary_rows)
-            top_salary_df = salary_df.sort_values('Median Salary', ascending=False).head(15)
-            
-            plt.figure(figsize=(12, 8))
-            bars = sns.barplot(x='Median Salary', y='Role', data=top_salary_df, palette='rocket')
-            
-            # Add count annotations to bars
-            for i, (_, row) in enumerate(top_salary_df.iterrows()):
-                bars.text(row['Median Salary'] + 1000, i, f"n={row['Count']}", va='center')
-                
-            plt.title('Top 15 Highest Paying Roles')
-            plt.xlabel('Median Annual Salary ($)')
-            formatter = plt.FuncFormatter(lambda x, p: f'${x:,.0f}')
-            plt.gca().xaxis.set_major_formatter(formatter)
-            plt.tight_layout()
-            plt.savefig(os.path.join(viz_dir, 'top_roles_by_salary.png'), dpi=300)
-            plt.close()
-            print(f"✅ Created visualization: top_roles_by_salary.png")
-        except Exception as e:
-            print(f"Error creating roles by salary visualization: {e}")
-    
-    # 4. Top 15 Highest Paying Skills
-    if skill_salary_metrics:
-        try:
-            # Only include skills with significant data
-            significant_skills = {k: v for k, v in skill_salary_metrics.items() if v.get('count', 0) >= 5}
-            
-            # Create DataFrame with salary metrics
-            skill_rows = []
-            for skill, metrics in significant_skills.items():
-                skill_rows.append({
-                    'Skill': skill,
-                    'Median Salary': metrics.get('median', 0),
-                    'Count': metrics.get('count', 0)
-                })
-            
-            skill_salary_df = pd.DataFrame(skill_rows)
-            top_skill_salary_df = skill_salary_df.sort_values('Median Salary', ascending=False).head(15)
-            
-            plt.figure(figsize=(12, 8))
-            bars = sns.barplot(x='Median Salary', y='Skill', data=top_skill_salary_df, palette='crest')
-            
-            # Add count annotations to bars
-            for i, (_, row) in enumerate(top_skill_salary_df.iterrows()):
-                bars.text(row['Median Salary'] + 1000, i, f"n={row['Count']}", va='center')
-                
-            plt.title('Top 15 Highest Paying Skills (Minimum 5 Data Points)')
-            plt.xlabel('Median Annual Salary ($)')
-            formatter = plt.FuncFormatter(lambda x, p: f'${x:,.0f}')
-            plt.gca().xaxis.set_major_formatter(formatter)
-            plt.tight_layout()
-            plt.savefig(os.path.join(viz_dir, 'top_skills_by_salary.png'), dpi=300)
-            plt.close()
-            print(f"✅ Created visualization: top_skills_by_salary.png")
-        except Exception as e:
-            print(f"Error creating skills by salary visualization: {e}")
-    
-    # 5. Salary Range Distribution
-    if role_salary_metrics:
-        try:
-            # Collect all salary values across roles
-            all_salaries = []
-            for metrics in role_salary_metrics.values():
-                if 'median' in metrics:
-                    all_salaries.append(metrics['median'])
-            
-            if all_salaries:
-                plt.figure(figsize=(10, 6))
-                sns.histplot(all_salaries, bins=20, kde=True)
-                plt.title('Distribution of Median Salaries Across Tech Roles')
-                plt.xlabel('Annual Salary ($)')
-                plt.ylabel('Number of Roles')
-                formatter = plt.FuncFormatter(lambda x, p: f'${x:,.0f}')
-                plt.gca().xaxis.set_major_formatter(formatter)
-                plt.tight_layout()
-                plt.savefig(os.path.join(viz_dir, 'salary_distribution.png'), dpi=300)
-                plt.close()
-                print(f"✅ Created visualization: salary_distribution.png")
-        except Exception as e:
-            print(f"Error creating salary distribution visualization: {e}")
+    # 1-5. Top roles and skills by demand and by salary, and the salary distribution
+    frames = chart_frames(role_salary_metrics, skill_salary_metrics, all_roles, all_skills)
+    render_charts(frames, viz_dir, dpi=PREVIEW_DPI if config.get('preview_charts') else CHART_DPI,
+                  workers=config.get('chart_workers'), redraw=config.get('redraw_charts', False))
+    roles_df = frames.get('top_roles_by_demand')
+    skills_df = frames.get('top_skills_by_demand')
     
     # 6. Export data to CSV for further analysis
     try:
@@ -1302,43 +1607,14 @@ def generate_visualizations(config, role_salary_metrics, skill_salary_metrics, a
         os.makedirs(csv_dir, exist_ok=True)
         
         # Export role salary data
-        if role_salary_metrics:
-            role_salary_rows = []
-            for role, metrics in role_salary_metrics.items():
-                row = {
-                    'Role': role,
-                    'Count': metrics.get('count', 0),
-                    'Min Salary': metrics.get('min', 0),
-                    'Max Salary': metrics.get('max', 0),
-                    'Mean Salary': metrics.get('mean', 0),
-                    'Median Salary': metrics.get('median', 0),
-                    'P25 Salary': metrics.get('p25', 0),
-                    'P75 Salary': metrics.get('p75', 0)
-                }
-                role_salary_rows.append(row)
-            
-            role_salary_df = pd.DataFrame(role_salary_rows)
+        if role_salary_metrics is not None and not role_salary_metrics.empty:
+            role_salary_df = role_salary_metrics.rename(columns=SALARY_CSV_COLUMNS).rename_axis('Role').reset_index()
             role_salary_df.to_csv(os.path.join(csv_dir, 'role_salary_data.csv'), index=False)
             print(f"✅ Exported role salary data to CSV")
         
         # Export skill salary data
-        if skill_salary_metrics:
-            skill_salary_rows = []
-            for skill, metrics in skill_salary_metrics.items():
-                if metrics.get('count', 0) >= 3:  # Only include skills with sufficient data
-                    row = {
-                        'Skill': skill,
-                        'Count': metrics.get('count', 0),
-                        'Min Salary': metrics.get('min', 0),
-                        'Max Salary': metrics.get('max', 0),
-                        'Mean Salary': metrics.get('mean', 0),
-                        'Median Salary': metrics.get('median', 0),
-                        'P25 Salary': metrics.get('p25', 0),
-                        'P75 Salary': metrics.get('p75', 0)
-                    }
-                    skill_salary_rows.append(row)
-            
-            skill_salary_df = pd.DataFrame(skill_salary_rows)
+        if skill_salary_metrics is not None and not skill_salary_metrics.empty:
+            skill_salary_df = skill_salary_metrics.rename(columns=SALARY_CSV_COLUMNS).rename_axis('Skill').reset_index()
             skill_salary_df.to_csv(os.path.join(csv_dir, 'skill_salary_data.csv'), index=False)
             print(f"✅ Exported skill salary data to CSV")
         
@@ -1354,17 +1630,26 @@ def generate_visualizations(config, role_salary_metrics, skill_salary_metrics, a
     
     return viz_dir
 
-def main():
-    """Main function to process data and update MongoDB."""
-    config = get_config()
-    
-    # Create output directory
-    output_dir = config.get('output_dir', 'job_market_analysis')
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Connect to MongoDB
-    db = connect_to_mongodb(config['mongo_uri'], config['db_name'])
+def job_data_sources(config):
+    """(source name, CSV path) of the sources a run processes, in order."""
+    return [(source_name, config[key]) for source_name, key in (('LinkedIn', 'linkedin'), ('Glassdoor', 'glassdoor'))
+            if config[key]]
+
+def open_skill_cache(config, output_dir):
+    """The skill extraction cache, unless disabled in config."""
+    if not config.get('skill_cache', True):
+        return None
+    cache_path = config.get('skill_cache_path') or os.path.join(output_dir, 'skill_cache.sqlite')
+    return SkillCache(cache_path, get_extractor_version(),
+                      config.get('skill_cache_max_entries', DEFAULT_MAX_ENTRIES))
+
+def close_skill_cache(skill_cache):
+    if skill_cache is not None:
+        skill_cache.print_stats()
+        skill_cache.close()
 
+def reset_collections(db):
+    """Drop the collections a full run rebuilds."""
     db.Skills.drop()
     db.JobPostings.drop()
     db.Roles.drop()
@@ -1372,125 +1657,363 @@ def main():
     db.SalaryAnalysis.drop()
     db.Companies.drop()
 
+def pipeline_stage_keys(config, sources):
+    """
+    Checkpoint key of each of PIPELINE_STAGES for a run over the (name, path)
+    sources: each stage's key covers the key of the stage before it (the first
+    one's covers the input files), its code version and the settings its
+    output depends on.
+    """
+    previous = checkpoint_key([(source_name, file_hash(file_path)) for source_name, file_path in sources])
+    keys = {}
+    for stage in PIPELINE_STAGES:
+        parts = [previous, code_version(STAGE_VERSIONS[stage], STAGE_MODULES[stage])]
+        if stage == 'prepare':
+            # Chunked reads take the text columns as strings rather than inferring their types
+            parts.append(bool(config.get('chunksize')))
+        elif stage == 'extract':
+            parts.append(get_extractor_version())
+        elif stage == 'aggregate':
+            parts += [config['industry'], config.get('skill_matrix', True), config.get('token_store', True)]
+        elif stage == 'write':
+            parts += [config.get('mongo_uri'), config['db_name']]
+        previous = keys[stage] = checkpoint_key(*parts)
+    return keys
+
+def select_pipeline_stages(checkpoints, keys, stages, from_stage=None, resume=False):
+    """
+    The stages to run: all of them; from_stage and the ones after it (the
+    ones before must have checkpoints for their current keys); or, with
+    resume, the ones without a checkpoint for their current key.
+    """
+    if from_stage:
+        if from_stage not in stages:
+            raise ValueError(f"Unknown or disabled stage '{from_stage}' (stages: {', '.join(stages)})")
+        start = stages.index(from_stage)
+        for stage in stages[:start]:
+            if not checkpoints.is_complete(stage, keys[stage]):
+                raise RuntimeError(f"No checkpoint of stage '{stage}' for the current inputs and code; "
+                                   f"run it first, or use --resume")
+        selected = stages[start:]
+    elif resume:
+        selected = [stage for stage in stages if not checkpoints.is_complete(stage, keys[stage])]
+    else:
+        selected = list(stages)
     
-    # Initialize data dictionaries
-    all_companies = {}
-    all_roles = {}
-    all_skills = {}
-    all_job_postings = []
-    all_salary_data = []
-    
-    # Process LinkedIn data if provided
-    if config['linkedin']:
-        print(f"Processing LinkedIn data from {config['linkedin']}")
-        companies, roles, skills, job_postings, salary_data = process_linkedin_data(
-            config['linkedin'], db, config['industry']
-        )
-        # Merge data
-        all_companies.update(companies)
-        all_job_postings.extend(job_postings)
-        all_salary_data.extend(salary_data)
-        
-        # Merge roles data
-        for role, data in roles.items():
-            if role in all_roles:
-                all_roles[role]['open_positions_count'] += data['open_positions_count']
-                all_roles[role]['top_hiring_companies'].extend(data['top_hiring_companies'])
-                all_roles[role]['required_skills'].extend(data['required_skills'])
-                all_roles[role]['top_hiring_companies'] = list(set(all_roles[role]['top_hiring_companies']))
-                all_roles[role]['required_skills'] = list(set(all_roles[role]['required_skills']))
-                
-                # Merge salary data if present
-                if 'salary_data' in data:
-                    if 'salary_data' not in all_roles[role]:
-                        all_roles[role]['salary_data'] = []
-                    all_roles[role]['salary_data'].extend(data['salary_data'])
-            else:
-                all_roles[role] = data
+    # Skills are extracted in the same pass that aggregates them
+    if 'extract' in selected and 'aggregate' not in selected:
+        selected.insert(selected.index('extract') + 1, 'aggregate')
+    return selected
+
+def run_extract_aggregate(config, options, checkpoints, keys, sources, extract, output_dir, token_store_path):
+    """
+    The extract and aggregate stages: extract the skills of each source's
+    postings (or, unless extract, take them from the extract checkpoint) and
+    aggregate them with the run's ProcessingOptions. Saves the documents and
+    salary metrics as the aggregate checkpoint, and the posting x skill matrix
+    and token store if enabled.
+    Returns (companies, roles, skills, role_salary_metrics, skill_salary_metrics).
+    """
+    skill_cache = open_skill_cache(config, output_dir) if extract else None
+    if extract:
+        checkpoints.start('extract')
+    checkpoints.start('aggregate')
+    
+    chunksize = options.chunksize
+    # Extracted skills per posting, for the sparse posting x skill matrix
+    skill_matrix_rows = [] if config.get('skill_matrix', True) else None
+    options = replace(options, skill_cache=skill_cache, skill_matrix_rows=skill_matrix_rows, strict=True)
+    
+    # Tokenized descriptions for later taxonomy rescans
+    token_store_builder = TokenStoreBuilder() if config.get('token_store', True) else None
+    
+    # Postings of all sources, merged in order
+    aggregate = PartialAggregate()
+    with checkpoints.document_writer('aggregate', 'job_postings') as document_writer:
+        def save_job_postings(job_postings):
+            document_writer(job_postings)
+            if token_store_builder is not None:
+                token_store_builder.add(job_postings)
         
-        # Merge skills data
-        for skill, data in skills.items():
-            if skill in all_skills:
-                all_skills[skill]['job_postings_count'] += data['job_postings_count']
-                all_skills[skill]['related_roles'].extend(data['related_roles'])
-                all_skills[skill]['related_roles'] = list(set(all_skills[skill]['related_roles']))
-                
-                # Merge salary data if present
-                if 'salary_data' in data:
-                    if 'salary_data' not in all_skills[skill]:
-                        all_skills[skill]['salary_data'] = []
-                    all_skills[skill]['salary_data'].extend(data['salary_data'])
-            else:
-                all_skills[skill] = data
-    
-    # Process Glassdoor data if provided
-    if config['glassdoor']:
-        print(f"Processing Glassdoor data from {config['glassdoor']}")
-        companies, roles, skills, job_postings, salary_data = process_glassdoor_data(
-            config['glassdoor'], db, config['industry']
-        )
-        # Merge data (similar to LinkedIn)
-        all_companies.update(companies)
-        all_job_postings.extend(job_postings)
-        all_salary_data.extend(salary_data)
+        # Chunked mode: job postings are saved as each chunk is processed
+        if chunksize:
+            options = replace(options, posting_sink=save_job_postings)
         
-        # Merge roles data
-        for role, data in roles.items():
-            if role in all_roles:
-                all_roles[role]['open_positions_count'] += data['open_positions_count']
-                all_roles[role]['top_hiring_companies'].extend(data['top_hiring_companies'])
-                all_roles[role]['required_skills'].extend(data['required_skills'])
-                all_roles[role]['top_hiring_companies'] = list(set(all_roles[role]['top_hiring_companies']))
-                all_roles[role]['required_skills'] = list(set(all_roles[role]['required_skills']))
-                
-                # Add salary info if present
-                if 'salary_range' in data and data['salary_range']:
-                    all_roles[role]['salary_range'] = data['salary_range']
-                if 'median_salary' in data and data['median_salary']:
-                    all_roles[role]['median_salary'] = data['median_salary']
-                    
-                # Merge salary data if present
-                if 'salary_data' in data:
-                    if 'salary_data' not in all_roles[role]:
-                        all_roles[role]['salary_data'] = []
-                    all_roles[role]['salary_data'].extend(data['salary_data'])
+        for source_name, file_path in sources:
+            print(f"Processing {source_name} data from {file_path}")
+            prepared = checkpoints.read_frame('prepare', source_name)
+            if extract:
+                with checkpoints.skill_writer('extract', source_name) as skill_writer:
+                    process_job_data(file_path, source_name, None, config['industry'], options,
+                                     aggregate=aggregate, prepared=prepared, skill_sink=skill_writer)
             else:
-                all_roles[role] = data
+                process_job_data(file_path, source_name, None, config['industry'], options,
+                                 aggregate=aggregate, prepared=prepared,
+                                 known_skills=checkpoints.read_skills('extract', source_name))
+        if extract:
+            checkpoints.complete('extract', keys['extract'])
         
-        # Merge skills data
-        for skill, data in skills.items():
-            if skill in all_skills:
-                all_skills[skill]['job_postings_count'] += data['job_postings_count']
-                all_skills[skill]['related_roles'].extend(data['related_roles'])
-                all_skills[skill]['related_roles'] = list(set(all_skills[skill]['related_roles']))
-                
-                # Merge salary data if present
-                if 'salary_data' in data:
-                    if 'salary_data' not in all_skills[skill]:
-                        all_skills[skill]['salary_data'] = []
-                    all_skills[skill]['salary_data'].extend(data['salary_data'])
-            else:
-                all_skills[skill] = data
-    
-    # Calculate salary metrics if we have salary data
-    role_salary_metrics = None
-    skill_salary_metrics = None
-    if all_salary_data:
-        print(f"Calculating salary metrics from {len(all_salary_data)} data points...")
-        role_salary_metrics, skill_salary_metrics = calculate_salary_metrics(all_salary_data)
-        print(f"Generated salary metrics for {len(role_salary_metrics)} roles and {len(skill_salary_metrics)} skills")
+        if not chunksize:
+            save_job_postings(aggregate.take_job_postings())
+    
+    all_companies, all_roles, all_skills, _ = aggregate.to_documents()
+    checkpoints.write_documents('aggregate', 'companies', all_companies.values())
+    checkpoints.write_documents('aggregate', 'roles', all_roles.values())
+    checkpoints.write_documents('aggregate', 'skills', all_skills.values())
+    
+    # Calculate salary metrics from the salary sketches of the roles and skills
+    role_salary_metrics = sketch_salary_metrics(aggregate.roles)
+    skill_salary_metrics = sketch_salary_metrics(aggregate.skills)
+    checkpoints.write_frame('aggregate', 'role_salary_metrics', role_salary_metrics)
+    checkpoints.write_frame('aggregate', 'skill_salary_metrics', skill_salary_metrics)
+    print(f"Generated salary metrics for {len(role_salary_metrics)} roles and {len(skill_salary_metrics)} skills")
+    
+    # Save the posting x skill matrix (rows in the same order as JobPostings)
+    if skill_matrix_rows:
+        roles, salaries, skill_lists = zip(*skill_matrix_rows)
+        skill_matrix = SkillMatrix.from_skill_lists(skill_lists, roles, salaries)
+        matrix_path = os.path.join(output_dir, 'skill_matrix.npz')
+        skill_matrix.save(matrix_path)
+        print(f"Saved {skill_matrix.shape[0]} x {skill_matrix.shape[1]} posting/skill matrix "
+              f"({skill_matrix.matrix.nnz} entries) to {matrix_path}")
+    
+    # Save the tokenized descriptions for later taxonomy rescans
+    if token_store_builder is not None:
+        store = token_store_builder.build(get_skill_taxonomy().search_terms())
+        store.save(token_store_path)
+        print(f"Saved tokenized descriptions of {len(store)} postings to {token_store_path}")
+    
+    close_skill_cache(skill_cache)
+    checkpoints.complete('aggregate', keys['aggregate'])
+    return all_companies, all_roles, all_skills, role_salary_metrics, skill_salary_metrics
+
+def load_aggregate_outputs(checkpoints):
+    """The outputs of run_extract_aggregate, from the aggregate checkpoint."""
+    return (
+        {document['name']: document for document in checkpoints.read_documents('aggregate', 'companies')},
+        {document['role_name']: document for document in checkpoints.read_documents('aggregate', 'roles')},
+        {document['skill_name']: document for document in checkpoints.read_documents('aggregate', 'skills')},
+        checkpoints.read_frame('aggregate', 'role_salary_metrics'),
+        checkpoints.read_frame('aggregate', 'skill_salary_metrics')
+    )
+
+def write_pipeline_outputs(db, config, checkpoints, companies, roles, skills, role_salary_metrics,
+                           skill_salary_metrics):
+    """
+    The write stage: rebuild the collections from the aggregate outputs. Job
+    postings are read from the aggregate checkpoint, chunksize at a time in
+    chunked mode.
+    """
+    write_batch_size = config.get('write_batch_size', DEFAULT_WRITE_BATCH_SIZE)
+    reset_collections(db)
     
     # Update industry collection with salary metrics
-    update_industry_collection(db, config['industry'], all_roles, all_skills, role_salary_metrics)
+    update_industry_collection(db, config['industry'], roles, skills, role_salary_metrics)
+    
+    job_postings = []
+    posting_writer = None
+    if config.get('chunksize'):
+        posting_writer = JobPostingWriter(db, batch_size=write_batch_size)
+        for batch in checkpoints.iter_documents('aggregate', 'job_postings', config['chunksize']):
+            posting_writer(batch)
+    else:
+        job_postings = checkpoints.read_documents('aggregate', 'job_postings')
     
     # Update all collections with merged data
-    update_collections(db, all_companies, all_roles, all_skills, all_job_postings, 
-                      role_salary_metrics, skill_salary_metrics)
+    update_collections(db, companies, roles, skills, job_postings, role_salary_metrics, skill_salary_metrics,
+                       write_batch_size=write_batch_size, write_threads=config.get('write_threads'))
+    
+    if posting_writer is not None:
+        posting_writer.finish()
+
+def run_pipeline(config, options, checkpoints, from_stage=None, resume=False):
+    """
+    A full run as PIPELINE_STAGES with the ProcessingOptions options, skipping
+    the stages select_pipeline_stages leaves out (their outputs are read from
+    checkpoints). Returns the visualization directory, if the visualize stage ran.
+    """
+    output_dir = config.get('output_dir', 'job_market_analysis')
+    token_store_path = config.get('token_store_path') or os.path.join(output_dir, 'token_store')
+    sources = job_data_sources(config)
+    stages = [stage for stage in PIPELINE_STAGES
+              if stage != 'visualize' or config.get('generate_visualizations', True)]
+    # Without persistent checkpoints no key is ever compared, so the input files are not hashed
+    keys = pipeline_stage_keys(config, sources) if checkpoints.persistent else dict.fromkeys(PIPELINE_STAGES)
+    selected = select_pipeline_stages(checkpoints, keys, stages, from_stage, resume)
+    for stage in stages:
+        if stage not in selected:
+            print(f"Skipping stage '{stage}' (checkpoint from {checkpoints.completed_at(stage)})")
+    
+    if 'prepare' in selected:
+        with PROFILER.section('stage.prepare') as section:
+            checkpoints.start('prepare')
+            for source_name, file_path in sources:
+                prepared = prepare_job_data(file_path, get_column_map(source_name), options.chunksize)
+                checkpoints.write_frame('prepare', source_name, prepared)
+                section.rows += len(prepared)
+                print(f"Prepared {len(prepared)} {source_name} rows")
+            checkpoints.complete('prepare', keys['prepare'])
+    
+    outputs = None
+    if 'aggregate' in selected:
+        # Extraction runs interleaved with aggregation, so the two are profiled as one section
+        extract = 'extract' in selected
+        with PROFILER.section('stage.extract+aggregate' if extract else 'stage.aggregate'):
+            outputs = run_extract_aggregate(config, options, checkpoints, keys, sources, extract, output_dir,
+                                            token_store_path)
+    elif 'write' in selected or 'visualize' in selected:
+        with PROFILER.section('load_checkpoint.aggregate'):
+            outputs = load_aggregate_outputs(checkpoints)
+    
+    if 'write' in selected:
+        with PROFILER.section('stage.write'):
+            checkpoints.start('write')
+            db = connect_to_mongodb(config['mongo_uri'], config['db_name'])
+            write_pipeline_outputs(db, config, checkpoints, *outputs)
+            checkpoints.complete('write', keys['write'])
     
-    # Generate visualizations if requested
     viz_dir = None
-    if config.get('generate_visualizations', True):
-        viz_dir = generate_visualizations(config, role_salary_metrics, skill_salary_metrics, all_roles, all_skills)
+    if 'visualize' in selected:
+        with PROFILER.section('stage.visualize'):
+            checkpoints.start('visualize')
+            _, all_roles, all_skills, role_salary_metrics, skill_salary_metrics = outputs
+            viz_dir = generate_visualizations(config, role_salary_metrics, skill_salary_metrics, all_roles,
+                                              all_skills)
+            checkpoints.complete('visualize', keys['visualize'])
+    return viz_dir
+
+def run_incremental(config, options, output_dir, token_store_path):
+    """
+    Incremental mode: only postings not stored yet are processed (with the
+    ProcessingOptions options), and added to the stored documents instead of
+    rebuilding the collections. Runs in a single pass without checkpoints,
+    since which postings are new depends on the database.
+    """
+    skill_cache = open_skill_cache(config, output_dir)
+    options = replace(options, skill_cache=skill_cache, incremental=True)
+    
+    db = connect_to_mongodb(config['mongo_uri'], config['db_name'])
+    ensure_incremental_indexes(db)
+    write_batch_size = config.get('write_batch_size', DEFAULT_WRITE_BATCH_SIZE)
+    
+    # Tokenized descriptions: the stored ones are extended (keeping the skill
+    # terms they were scanned with)
+    token_store_builder = None
+    token_store_skill_terms = get_skill_taxonomy().search_terms()
+    if config.get('token_store', True) and os.path.exists(os.path.join(token_store_path, 'skills.json')):
+        stored = TokenStore.load(token_store_path)
+        token_store_builder = TokenStoreBuilder.from_store(stored)
+        token_store_skill_terms = stored.skill_terms
+    
+    # Chunked mode: job postings are written as each chunk is processed
+    posting_writer = None
+    if options.chunksize:
+        posting_writer = JobPostingWriter(db, token_store_builder, write_batch_size)
+        options = replace(options, posting_sink=posting_writer)
+    
+    # Postings of all sources, merged in order
+    aggregate = PartialAggregate()
+    for source_name, file_path in job_data_sources(config):
+        print(f"Processing {source_name} data from {file_path}")
+        process_job_data(file_path, source_name, db, config['industry'], options, aggregate=aggregate)
+    
+    # Add the new postings to the stored collections
+    apply_increments(db, config['industry'], aggregate,
+                     write_batch_size=write_batch_size, write_threads=config.get('write_threads'))
+    
+    if posting_writer is not None:
+        posting_writer.finish()
+    
+    if token_store_builder is not None:
+        if posting_writer is None:
+            token_store_builder.add(aggregate.job_postings)
+        store = token_store_builder.build(token_store_skill_terms)
+        store.save(token_store_path)
+        print(f"Saved tokenized descriptions of {len(store)} postings to {token_store_path}")
+    
+    close_skill_cache(skill_cache)
+
+@contextmanager
+def profiled_run(config, output_dir):
+    """
+    Profile the run inside (see instrumentation.py) if config['profile'] is
+    set, and write the report to config['profile_path'] (default:
+    profiles/<start time>.json in the output directory), also if the run fails.
+    """
+    if not config.get('profile'):
+        yield
+        return
+    
+    started_at = datetime.now()
+    report_path = config.get('profile_path') or os.path.join(
+        output_dir, 'profiles', f"{started_at:%Y%m%d-%H%M%S}.json")
+    PROFILER.start(memory=config.get('profile_memory', True))
+    error = None
+    try:
+        with PROFILER.section('run'):
+            yield
+    except BaseException as e:
+        error = repr(e)
+        raise
+    finally:
+        PROFILER.stop()
+        # The connection string may hold credentials
+        run_config = {key: value for key, value in config.items() if key != 'mongo_uri'}
+        PROFILER.write_report(report_path, config=run_config, error=error)
+        print("Profile:")
+        PROFILER.print_summary()
+        print(f"Profile report written to {report_path}")
+
+def main(config=None):
+    """Main function to process data and update MongoDB."""
+    if config is None:
+        config = get_config()
+    
+    if config.get('offline'):
+        set_offline_mode(True)
+    
+    # Create output directory
+    output_dir = config.get('output_dir', 'job_market_analysis')
+    os.makedirs(output_dir, exist_ok=True)
+    token_store_path = config.get('token_store_path') or os.path.join(output_dir, 'token_store')
+    
+    options = ProcessingOptions.from_config(config)
+    with profiled_run(config, output_dir):
+        run_job_analysis(config, options, output_dir, token_store_path)
+
+def run_job_analysis(config, options, output_dir, token_store_path):
+    """
+    The run main() starts: a rescan, an incremental run or the pipeline, as
+    config says, processing postings with the ProcessingOptions options.
+    """
+    # Rescan mode: patch only the skills changed since the last full run
+    if config.get('rescan_skills'):
+        with PROFILER.section('stage.rescan'):
+            store = TokenStore.load(token_store_path)
+            db = connect_to_mongodb(config['mongo_uri'], config['db_name'])
+            rescanned, removed = rescan_skill_changes(
+                db, store, write_batch_size=config.get('write_batch_size', DEFAULT_WRITE_BATCH_SIZE))
+            store.save_skill_terms(token_store_path)
+        print(f"Rescanned {len(rescanned)} new or changed skills and removed {len(removed)} "
+              f"over {len(store)} stored postings")
+        return
+    
+    if config.get('incremental', False):
+        with PROFILER.section('stage.incremental'):
+            run_incremental(config, options, output_dir, token_store_path)
+        print("Data processing and MongoDB updates complete!")
+        return
+    
+    from_stage = config.get('from_stage')
+    resume = config.get('resume', False)
+    if config.get('checkpoints', True):
+        checkpoint_path = config.get('checkpoint_path') or os.path.join(output_dir, 'checkpoints')
+        viz_dir = run_pipeline(config, options, CheckpointStore(checkpoint_path), from_stage, resume)
+    else:
+        if from_stage or resume:
+            raise ValueError("Starting from a stage or resuming needs checkpoints")
+        # The stages hand their outputs over in memory
+        viz_dir = run_pipeline(config, options, MemoryCheckpointStore())
     
     print("Data processing and MongoDB updates complete!")
     
@@ -1508,26 +2031,101 @@ if __name__ == "__main__":
     parser.add_argument('--industry', default='Tech', help='Industry name (default: Tech)')
     parser.add_argument('--output', default='job_market_analysis', help='Output directory for visualizations and CSVs')
     parser.add_argument('--no-viz', action='store_true', help='Skip visualization generation')
+    parser.add_argument('--nlp-batch-size', type=int, help='Run spaCy with nlp.pipe in batches of this size')
+    parser.add_argument('--nlp-processes', type=int, default=1, help='Number of spaCy processes in batched mode (default: 1)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes for extraction and aggregation (default: 1)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the skill extraction cache')
+    parser.add_argument('--cache-path', help='Path to the skill extraction cache (default: <output>/skill_cache.sqlite)')
+    parser.add_argument('--no-skill-matrix', action='store_true', help='Do not save the posting x skill matrix')
+    parser.add_argument('--offline', action='store_true', help='Never download models; fail if the spaCy model is not installed')
+    parser.add_argument('--no-token-store', action='store_true', help='Do not save the tokenized descriptions')
+    parser.add_argument('--token-store-path', help='Path to the tokenized description store (default: <output>/token_store)')
+    parser.add_argument('--rescan-skills', action='store_true',
+                        help='Only rescan skills added or changed in the taxonomy since the last run, using the token store')
+    parser.add_argument('--chunksize', type=int,
+                        help='Stream the CSVs this many rows at a time, so memory does not grow with the file size')
+    parser.add_argument('--write-batch-size', type=int,
+                        help=f'Operations per MongoDB bulk write (default: {DEFAULT_WRITE_BATCH_SIZE})')
+    parser.add_argument('--write-threads', type=int, help='Collections written concurrently (default: all)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Keep the stored collections and add only postings not stored yet')
+    parser.add_argument('--no-checkpoints', action='store_true', help='Do not keep the outputs of the pipeline stages')
+    parser.add_argument('--checkpoint-path', help='Directory of the stage checkpoints (default: <output>/checkpoints)')
+    parser.add_argument('--from-stage', choices=PIPELINE_STAGES,
+                        help='Rerun from this stage, using the checkpoints of the stages before it')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip the stages with a checkpoint for the current inputs and code')
+    parser.add_argument('--chart-workers', type=int, help='Processes drawing the charts (default: one per CPU)')
+    parser.add_argument('--preview-charts', action='store_true',
+                        help=f'Draw charts at {PREVIEW_DPI} DPI instead of {CHART_DPI}, for a quick look')
+    parser.add_argument('--redraw-charts', action='store_true', help='Draw every chart, even unchanged ones')
+    parser.add_argument('--profile', action='store_true',
+                        help='Write a JSON report of the time and memory of each stage and hot function')
+    parser.add_argument('--profile-path',
+                        help='Path of the profile report (implies --profile; default: <output>/profiles/<time>.json)')
+    parser.add_argument('--no-profile-memory', action='store_true',
+                        help='Profile times only, without tracing allocations (which slows the run down)')
     
     args = parser.parse_args()
     
     # Override config with command line arguments if provided
-    if args.linkedin or args.glassdoor or args.industry or args.output or args.no_viz:
-        config = get_config()
-        if args.linkedin:
-            config['linkedin'] = args.linkedin
-        if args.glassdoor:
-            config['glassdoor'] = args.glassdoor
-        if args.industry:
-            config['industry'] = args.industry
-        if args.output:
-            config['output_dir'] = args.output
-        if args.no_viz:
-            config['generate_visualizations'] = False
-            
-        # Connect to MongoDB and run the main processing
-        db = connect_to_mongodb(config['mongo_uri'], config['db_name'])
-        main()
-    else:
-        # Run with default configuration
-        main()
\ No newline at end of file
+    config = get_config()
+    if args.linkedin:
+        config['linkedin'] = args.linkedin
+    if args.glassdoor:
+        config['glassdoor'] = args.glassdoor
+    if args.industry:
+        config['industry'] = args.industry
+    if args.output:
+        config['output_dir'] = args.output
+    if args.no_viz:
+        config['generate_visualizations'] = False
+    if args.nlp_batch_size:
+        config['nlp_batch_size'] = args.nlp_batch_size
+        config['nlp_n_process'] = args.nlp_processes
+    if args.workers:
+        config['workers'] = args.workers
+    if args.no_cache:
+        config['skill_cache'] = False
+    if args.cache_path:
+        config['skill_cache_path'] = args.cache_path
+    if args.no_skill_matrix:
+        config['skill_matrix'] = False
+    if args.offline:
+        config['offline'] = True
+    if args.no_token_store:
+        config['token_store'] = False
+    if args.token_store_path:
+        config['token_store_path'] = args.token_store_path
+    if args.rescan_skills:
+        config['rescan_skills'] = True
+    if args.chunksize:
+        config['chunksize'] = args.chunksize
+    if args.write_batch_size:
+        config['write_batch_size'] = args.write_batch_size
+    if args.write_threads:
+        config['write_threads'] = args.write_threads
+    if args.incremental:
+        config['incremental'] = True
+    if args.no_checkpoints:
+        config['checkpoints'] = False
+    if args.checkpoint_path:
+        config['checkpoint_path'] = args.checkpoint_path
+    if args.from_stage:
+        config['from_stage'] = args.from_stage
+    if args.resume:
+        config['resume'] = True
+    if args.chart_workers:
+        config['chart_workers'] = args.chart_workers
+    if args.preview_charts:
+        config['preview_charts'] = True
+    if args.redraw_charts:
+        config['redraw_charts'] = True
+    if args.profile or args.profile_path:
+        config['profile'] = True
+    if args.profile_path:
+        config['profile_path'] = args.profile_path
+    if args.no_profile_memory:
+        config['profile_memory'] = False
+
+    main(config)
\ No newline at end of file
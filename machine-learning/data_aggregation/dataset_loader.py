@@ -0,0 +1,226 @@
+"""
+Columnar copies of the source datasets, and the loader the scripts share.
+
+Every script used to parse the same CSVs with pd.read_csv, and their
+free-text description columns make that slow. convert_dataset() stores a
+CSV once as a Parquet file next to it (same name, .parquet suffix). Text
+columns with few distinct values (company, location, experience_level,
+company_size, ...) are dictionary-encoded: each distinct value is stored
+once, and they load as pandas categoricals instead of one string object
+per row. The Parquet copy records the size and modification time of the
+CSV it was made from.
+
+read_dataset() and iter_dataset() take the path of a CSV and load the
+dataset from its Parquet copy while that copy is up to date with the CSV,
+and from the CSV otherwise (so converting is optional, and a CSV edited
+after its conversion is never shadowed by a stale copy). Either way only
+the requested columns are read, and they come in the order of the file, as
+read_csv's usecols gives them.
+
+Convert the datasets (the four source CSVs by default) with:
+
+    python machine-learning/data_aggregation/dataset_loader.py [CSV ...]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+ML_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# The source datasets the conversion tool converts by default
+DATASET_FILES = [
+    'linkedin_jobs_filtered.csv',
+    'enhanced_jobs_linkedin.csv',
+    'Glassdoor job listings information copy.csv',
+    'DataScience_salaries_2024.csv',
+]
+
+# Text columns that are always dictionary-encoded
+DICTIONARY_COLUMNS = {
+    'company', 'company_name', 'location', 'job_location', 'experience_level', 'employment_type',
+    'company_size', 'company_type', 'company_sector', 'company_industry', 'company_location',
+    'employee_residence', 'salary_currency',
+}
+
+# Other text columns are dictionary-encoded if they have at most this many
+# distinct values per row
+MAX_DICTIONARY_RATIO = 0.5
+
+# Key of the Parquet schema metadata describing the CSV a copy was made from
+SOURCE_METADATA_KEY = b'dataset_source'
+
+PARQUET_COMPRESSION = 'zstd'
+
+
+def parquet_path(csv_path):
+    """Path of the Parquet copy of a CSV."""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def dictionary_columns(df, max_ratio=MAX_DICTIONARY_RATIO):
+    """The text columns of a frame to dictionary-encode (see DICTIONARY_COLUMNS and MAX_DICTIONARY_RATIO)."""
+    columns = []
+    for column in df.columns:
+        if df[column].dtype.kind in 'biufcmM':
+            continue
+        if column in DICTIONARY_COLUMNS or df[column].nunique() <= max_ratio * len(df):
+            columns.append(column)
+    return columns
+
+
+def convert_dataset(csv_path, output_path=None, max_ratio=MAX_DICTIONARY_RATIO):
+    """
+    Write the Parquet copy of a CSV (to parquet_path(csv_path) by default).
+    Returns the output path and the dictionary-encoded columns.
+    """
+    output_path = output_path or parquet_path(csv_path)
+    stamp = _source_stamp(csv_path)
+    df = pd.read_csv(csv_path)
+    encoded = dictionary_columns(df, max_ratio)
+    for column in encoded:
+        df[column] = df[column].astype('category')
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, SOURCE_METADATA_KEY: json.dumps(stamp)})
+
+    # Written under a temporary name, so readers never see a partial copy
+    temp_path = output_path + '.tmp'
+    pq.write_table(table, temp_path, compression=PARQUET_COMPRESSION)
+    os.replace(temp_path, output_path)
+    return output_path, encoded
+
+
+def is_current(csv_path, path):
+    """Whether the Parquet file at path is a copy of the CSV as it is now."""
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    source = metadata.get(SOURCE_METADATA_KEY)
+    return source is not None and json.loads(source) == _source_stamp(csv_path)
+
+
+def dataset_source(path):
+    """
+    The file a dataset is loaded from: path itself if it is a Parquet file
+    or the CSV has no up-to-date Parquet copy, the copy otherwise.
+    """
+    if path.endswith('.parquet'):
+        return path
+    copy_path = parquet_path(path)
+    if os.path.exists(copy_path) and os.path.exists(path) and is_current(path, copy_path):
+        return copy_path
+    return path
+
+
+def dataset_columns(path):
+    """The column names of a dataset."""
+    source = dataset_source(path)
+    if source.endswith('.parquet'):
+        return pd.Index(pq.read_schema(source).names)
+    return pd.read_csv(source, nrows=0).columns
+
+
+def _file_order(names, columns):
+    # The requested columns in the order of the file, as read_csv's usecols gives them
+    if columns is None:
+        return None
+    missing = [column for column in columns if column not in names]
+    if missing:
+        raise ValueError(f"Usecols do not match columns, columns expected but not found: {missing}")
+    requested = set(columns)
+    return [name for name in names if name in requested]
+
+
+def _as_text(table, dtype):
+    # What read_csv's dtype={column: str} gives: columns typed otherwise in
+    # the Parquet file (as numbers, say) are cast to strings
+    if not dtype:
+        return table
+    for column, column_dtype in dtype.items():
+        index = table.schema.get_field_index(column)
+        if column_dtype is not str or index < 0:
+            continue
+        field = table.schema.field(index)
+        if pa.types.is_dictionary(field.type) or pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            continue
+        table = table.set_column(index, column, pc.cast(table.column(index), pa.large_string()))
+    return table
+
+
+def read_dataset(path, columns=None, dtype=None):
+    """
+    A dataset as a DataFrame, from its Parquet copy if it is up to date (see
+    dataset_source) and from the CSV otherwise. Only the given columns are
+    read; dtype maps columns to read as text to str, as in read_csv.
+    """
+    source = dataset_source(path)
+    if not source.endswith('.parquet'):
+        return pd.read_csv(source, usecols=columns, dtype=dtype)
+    columns = _file_order(pq.read_schema(source).names, columns)
+    return _as_text(pq.read_table(source, columns=columns), dtype).to_pandas()
+
+
+def iter_dataset(path, chunksize, columns=None, dtype=None):
+    """
+    Yield a dataset chunksize rows at a time, indexed by row number across
+    chunks as read_csv chunks are. See read_dataset.
+    """
+    source = dataset_source(path)
+    if not source.endswith('.parquet'):
+        yield from pd.read_csv(source, usecols=columns, dtype=dtype, chunksize=chunksize)
+        return
+    parquet_file = pq.ParquetFile(source)
+    columns = _file_order(parquet_file.schema_arrow.names, columns)
+    start = 0
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        df = _as_text(pa.Table.from_batches([batch]), dtype).to_pandas()
+        df.index = pd.RangeIndex(start, start + len(df))
+        start += len(df)
+        yield df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert source dataset CSVs to Parquet')
+    parser.add_argument('csv', nargs='*',
+                        help='CSV files to convert (default: the source datasets in machine-learning/)')
+    parser.add_argument('--max-dictionary-ratio', type=float, default=MAX_DICTIONARY_RATIO,
+                        help='Dictionary-encode text columns with at most this many distinct values per row '
+                             f'(default: {MAX_DICTIONARY_RATIO})')
+    parser.add_argument('--force', action='store_true', help='Convert even if the Parquet copy is up to date')
+    args = parser.parse_args()
+
+    csv_paths = args.csv or [os.path.join(ML_DIR, name) for name in DATASET_FILES]
+    failed = False
+    for csv_path in csv_paths:
+        if not os.path.exists(csv_path):
+            print(f"Not found: {csv_path}")
+            failed = True
+            continue
+        output_path = parquet_path(csv_path)
+        if not args.force and os.path.exists(output_path) and is_current(csv_path, output_path):
+            print(f"Up to date: {output_path}")
+            continue
+        start = time.perf_counter()
+        output_path, encoded = convert_dataset(csv_path, max_ratio=args.max_dictionary_ratio)
+        print(f"Converted {csv_path} -> {output_path} in {time.perf_counter() - start:.2f}s "
+              f"({os.path.getsize(csv_path) / 1e6:.1f} MB -> {os.path.getsize(output_path) / 1e6:.1f} MB)")
+        if encoded:
+            print(f"  Dictionary-encoded: {', '.join(encoded)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Linear-time segmentation of job descriptions into skill sections.
+
+Step 4 of extract_skills_from_text looks for text following headings such as
+"technical skills" or "requirements" (up to the end of the section) and
+phrases such as "experience with" (up to the end of the sentence), then
+splits those segments into list items. DescriptionSections finds every
+section boundary of a description in one pass and answers "where does the
+section/sentence starting here end" with a binary search, so each posting is
+processed in time linear in its length instead of running lazy DOTALL
+regexes over the whole text once per pattern.
+
+The segments are exactly the group(1) spans of these patterns (matched with
+re.IGNORECASE | re.DOTALL on lowercased text):
+    (?:technical skills|skills & expertise|technologies|tech stack)(?:[\\s:]+)(.*?)(?:\\n\\n|\\n\\w+:|$)
+    (?:experience|expertise) (?:with|in)(?:[\\s:]+)(.*?)(?:\\.|$)
+    (?:proficiency|proficient) (?:with|in)(?:[\\s:]+)(.*?)(?:\\.|$)
+    (?:requirements|qualifications)(?:[\\s:]*)(.*?)(?:\\n\\n|\\n\\w+:|$)
+"""
+
+import re
+from bisect import bisect_left
+
+from skill_matcher import fold_ignorecase
+
+SECTION = 'section'
+SENTENCE = 'sentence'
+
+# (lead-in phrases, whether whitespace or ':' must follow, where the segment ends)
+SKILL_SECTION_RULES = [
+    (('technical skills', 'skills & expertise', 'technologies', 'tech stack'), True, SECTION),
+    (('experience with', 'experience in', 'expertise with', 'expertise in'), True, SENTENCE),
+    (('proficiency with', 'proficiency in', 'proficient with', 'proficient in'), True, SENTENCE),
+    (('requirements', 'qualifications'), False, SECTION),
+]
+
+# Separators between list items inside a segment
+ITEM_SEPARATORS = re.compile(r',|\n|•|-|;|\|')
+
+# A section ends at a blank line or at a line starting with a "heading:"
+_SECTION_BREAK = re.compile(r'\n(?=(\n|\w+:))')
+
+
+def _is_separator(ch):
+    return ch == ':' or ch.isspace()
+
+
+class DescriptionSections:
+    """Section boundaries of one (lowercased) description."""
+
+    def __init__(self, text):
+        self.text = text
+        # Folded so plain substring search finds the same lead-in phrases as the regexes
+        self.search_text = fold_ignorecase(text)
+
+        # Start offset of each section break and where the text after it resumes
+        self.break_starts = []
+        self.break_ends = []
+        for match in _SECTION_BREAK.finditer(text):
+            self.break_starts.append(match.start())
+            self.break_ends.append(match.end(1))
+
+        # End of text (before a single trailing newline) also closes a segment
+        self.text_end = len(text) - 1 if text.endswith('\n') else len(text)
+        for end in sorted({self.text_end, len(text)}):
+            self.break_starts.append(end)
+            self.break_ends.append(end)
+
+    def section_end(self, pos):
+        """(end of the section starting at pos, offset after its terminator)."""
+        i = bisect_left(self.break_starts, pos)
+        return self.break_starts[i], self.break_ends[i]
+
+    def sentence_end(self, pos):
+        """(end of the sentence starting at pos, offset after its terminator)."""
+        text_end = self.text_end if pos <= self.text_end else len(self.text)
+        dot = self.text.find('.', pos, text_end)
+        if dot != -1:
+            return dot, dot + 1
+        return text_end, text_end
+
+    def _next_lead_in(self, phrases, pos, require_separator, next_found):
+        """Leftmost valid occurrence of any phrase at or after pos, as (start, phrase)."""
+        best = None
+        for phrase in phrases:
+            start = next_found.get(phrase, -1)
+            if start is not None and start < pos:
+                start = self.search_text.find(phrase, pos)
+                while start != -1 and require_separator:
+                    after = start + len(phrase)
+                    if after < len(self.text) and _is_separator(self.text[after]):
+                        break
+                    start = self.search_text.find(phrase, start + 1)
+                start = None if start == -1 else start
+                next_found[phrase] = start
+            if start is not None and (best is None or start < best[0]):
+                best = (start, phrase)
+        return best
+
+    def segments(self, phrases, require_separator, boundary):
+        """Text following each lead-in phrase up to the end of its section or sentence."""
+        text = self.text
+        end_of = self.section_end if boundary == SECTION else self.sentence_end
+        next_found = {}
+        pos = 0
+        while True:
+            found = self._next_lead_in(phrases, pos, require_separator, next_found)
+            if found is None:
+                return
+            start, phrase = found
+            # Skip the whitespace/':' run after the lead-in
+            segment_start = start + len(phrase)
+            while segment_start < len(text) and _is_separator(text[segment_start]):
+                segment_start += 1
+            segment_end, pos = end_of(segment_start)
+            yield text[segment_start:segment_end]
+
+    def skill_sections(self):
+        """Segments for every rule, in rule order."""
+        for phrases, require_separator, boundary in SKILL_SECTION_RULES:
+            yield from self.segments(phrases, require_separator, boundary)
+
+
+def split_items(segment):
+    """Split a segment into its comma, bullet or line separated items."""
+    return ITEM_SEPARATORS.split(segment)
@@ -0,0 +1,382 @@
+"""
+Timing and memory instrumentation of aggregation runs.
+
+PROFILER records, per named section, the number of calls, wall time, CPU
+time, rows processed and peak traced memory, and writes them as a JSON
+report at the end of a run (data_aggregation --profile). Sections are the
+pipeline stages, the hot functions and each collection write and chart:
+
+    with PROFILER.section('load_dataset') as section:
+        df = read_dataset(path)
+        section.rows = len(df)
+
+    @PROFILER.timed('extract_skills_from_text')
+    def extract_skills_from_text(text, ...):
+
+Until PROFILER.start() is called, sections record nothing and cost an
+attribute check, so the instrumentation stays in place in normal runs.
+
+CPU time is the process's for sections on the main thread, which includes
+threads it waits on, and the thread's own for sections on other threads
+(the concurrent collection writes). Peak memory is the most tracemalloc saw
+allocated above what was allocated when the section started, and is only
+recorded on the main thread, since tracemalloc has one peak per process.
+Worker processes profile into their own PROFILER, reset by reset_worker()
+as the pool initializer, and send their sections back with take(); the
+parent merge()s them, so a section's calls and times add up over processes
+and its peak memory is the largest in any one of them.
+
+Two reports are compared with
+
+    python machine-learning/data_aggregation/instrumentation.py OLD.json NEW.json [--threshold 0.1]
+
+which lists the sections whose time, memory or throughput changed by more
+than the threshold and exits with status 1 if any got worse, e.g. to catch
+regressions between nightly runs.
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+REPORT_VERSION = 1
+
+# Metrics compared between reports; for all but rows_per_second, higher is worse
+DIFF_METRICS = ('wall_seconds', 'cpu_seconds', 'peak_memory_bytes', 'rows_per_second')
+
+DEFAULT_THRESHOLD = 0.1
+# Sections shorter than this in both reports are too noisy to compare times of
+DEFAULT_MIN_SECONDS = 0.05
+# Nor are peaks below this in both reports worth comparing
+MIN_PEAK_BYTES = 1 << 20
+
+
+def _new_stats():
+    return {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows': 0, 'peak_memory_bytes': None}
+
+
+def _max_peak(a, b):
+    return b if a is None else a if b is None else max(a, b)
+
+
+class Section:
+    """One timed run of a named section, as a context manager. Set or add to rows as they are processed."""
+
+    __slots__ = ('profiler', 'name', 'rows', 'recorded', '_clock', '_memory', '_wall_start', '_cpu_start')
+
+    def __init__(self, profiler, name, rows=0):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.recorded = True
+
+    def __enter__(self):
+        main_thread = threading.current_thread() is threading.main_thread()
+        self._clock = time.process_time if main_thread else time.thread_time
+        self._memory = self.profiler._push_memory() if main_thread and tracemalloc.is_tracing() else None
+        self._wall_start = time.perf_counter()
+        self._cpu_start = self._clock()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self._wall_start
+        cpu = self._clock() - self._cpu_start
+        peak = self.profiler._pop_memory(self._memory) if self._memory is not None else None
+        if self.recorded:
+            self.profiler._record(self.name, wall, cpu, self.rows, peak)
+        return False
+
+
+class _NullSection:
+    """What sections are while profiling is off: records nothing."""
+
+    rows = property(lambda self: 0, lambda self, value: None)
+    recorded = property(lambda self: False, lambda self, value: None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class Profiler:
+    """Sections recorded by name (see the module docstring)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.started_at = None
+        self._stats = {}
+        self._lock = threading.Lock()
+        # [allocated at start, peak so far] of the open sections of the main thread, innermost last
+        self._memory_stack = []
+        self._started_tracing = False
+
+    def start(self, memory=True):
+        """Start recording sections, from none; with memory, also trace allocations for peak memory."""
+        self.reset()
+        self.enabled = True
+        self.memory = memory
+        self.started_at = datetime.now()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Stop recording (what was recorded is kept until reset or take)."""
+        self.enabled = False
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def reset(self):
+        """Forget the recorded sections, e.g. those a forked worker inherited from its parent."""
+        with self._lock:
+            self._stats = {}
+        self._memory_stack = []
+
+    def section(self, name, rows=0):
+        """A Section recording under name, or one that records nothing if profiling is off."""
+        return Section(self, name, rows) if self.enabled else _NULL_SECTION
+
+    def timed(self, name, rows=None):
+        """
+        Decorator recording each call of a function as a section. rows is a
+        function of the call's arguments giving the rows it processed (default: 1).
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with Section(self, name) as section:
+                    result = function(*args, **kwargs)
+                    section.rows = rows(*args, **kwargs) if rows is not None else 1
+                return result
+            return wrapper
+        return decorator
+
+    def iterate(self, name, iterable):
+        """Yield the items of iterable (e.g. chunks of rows), recording the production of each as a section."""
+        iterator = iter(iterable)
+        while True:
+            with self.section(name) as section:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    section.recorded = False
+                    return
+                section.rows = len(item)
+            yield item
+
+    def _push_memory(self):
+        current, peak = tracemalloc.get_traced_memory()
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+        # The peak is reset for the new section; the enclosing ones keep the peak up to here
+        tracemalloc.reset_peak()
+        frame = [current, current]
+        self._memory_stack.append(frame)
+        return frame
+
+    def _pop_memory(self, frame):
+        _, peak = tracemalloc.get_traced_memory()
+        frame[1] = max(frame[1], peak)
+        # Normally the innermost section; sections of a generator can close out of order
+        self._memory_stack = [open_frame for open_frame in self._memory_stack if open_frame is not frame]
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], frame[1])
+        return frame[1] - frame[0]
+
+    def _record(self, name, wall, cpu, rows, peak):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = _new_stats()
+            stats['calls'] += 1
+            stats['wall_seconds'] += wall
+            stats['cpu_seconds'] += cpu
+            stats['rows'] += rows
+            stats['peak_memory_bytes'] = _max_peak(stats['peak_memory_bytes'], peak)
+
+    def take(self):
+        """The sections recorded so far (name -> stats), which are then forgotten. For workers to send back."""
+        with self._lock:
+            stats, self._stats = self._stats, {}
+        return stats
+
+    def merge(self, stats):
+        """Add the sections another process recorded (from its take())."""
+        with self._lock:
+            for name, other in stats.items():
+                merged = self._stats.get(name)
+                if merged is None:
+                    merged = self._stats[name] = _new_stats()
+                for key in ('calls', 'wall_seconds', 'cpu_seconds', 'rows'):
+                    merged[key] += other[key]
+                merged['peak_memory_bytes'] = _max_peak(merged['peak_memory_bytes'], other['peak_memory_bytes'])
+
+    def sections(self):
+        """name -> stats of the recorded sections, with rows_per_second, in the order they were first recorded."""
+        with self._lock:
+            stats = {name: dict(section) for name, section in self._stats.items()}
+        for section in stats.values():
+            section['rows_per_second'] = (section['rows'] / section['wall_seconds']
+                                          if section['rows'] and section['wall_seconds'] else None)
+        return stats
+
+    def report(self, **run_info):
+        """The JSON report of the run: when and where it ran, run_info (e.g. its config) and its sections."""
+        return {
+            'version': REPORT_VERSION,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': datetime.now().isoformat(),
+            'argv': sys.argv,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'memory_traced': self.memory,
+            **run_info,
+            'sections': self.sections(),
+        }
+
+    def write_report(self, path, **run_info):
+        """Write report(**run_info) to path as JSON."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.report(**run_info), f, indent=2, default=str)
+
+    def print_summary(self, prefix='stage.'):
+        """Print the sections whose name starts with prefix, one line each."""
+        for name, stats in self.sections().items():
+            if name.startswith(prefix):
+                print(f"  {name[len(prefix):]:<18} {format_section(stats)}")
+
+
+PROFILER = Profiler()
+
+
+def reset_worker():
+    """Process pool initializer: start the worker's profiler with nothing recorded."""
+    PROFILER.reset()
+
+
+def format_value(metric, value):
+    if value is None:
+        return '-'
+    if metric == 'peak_memory_bytes':
+        return f"{value / 1e6:,.1f} MB"
+    if metric == 'rows_per_second':
+        return f"{value:,.0f} rows/s"
+    return f"{value:.3f}s"
+
+
+def format_section(stats):
+    parts = [f"{stats['wall_seconds']:.2f}s wall", f"{stats['cpu_seconds']:.2f}s CPU"]
+    if stats['calls'] > 1:
+        parts.append(f"{stats['calls']:,} calls")
+    if stats.get('rows_per_second'):
+        parts.append(format_value('rows_per_second', stats['rows_per_second']))
+    if stats['peak_memory_bytes'] is not None:
+        parts.append(f"peak {format_value('peak_memory_bytes', stats['peak_memory_bytes'])}")
+    return ', '.join(parts)
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def diff_reports(old, new, threshold=DEFAULT_THRESHOLD, min_seconds=DEFAULT_MIN_SECONDS):
+    """
+    Changes of more than threshold (a fraction) between two reports, as
+    (section, metric, old value, new value, relative change, regression)
+    tuples; regression is whether the change is for the worse. Times and
+    throughput are only compared for sections that took at least
+    min_seconds in one of the reports, and peak memory for sections that
+    reached MIN_PEAK_BYTES in one of them. Sections in only one report are
+    listed with None for the other.
+    """
+    old_sections = old['sections']
+    new_sections = new['sections']
+    changes = []
+    for name in list(old_sections) + [name for name in new_sections if name not in old_sections]:
+        if name not in old_sections or name not in new_sections:
+            stats = old_sections.get(name) or new_sections[name]
+            old_wall = old_sections[name]['wall_seconds'] if name in old_sections else None
+            new_wall = new_sections[name]['wall_seconds'] if name in new_sections else None
+            if stats['wall_seconds'] >= min_seconds:
+                changes.append((name, 'wall_seconds', old_wall, new_wall, None, False))
+            continue
+        old_stats = old_sections[name]
+        new_stats = new_sections[name]
+        timed = max(old_stats['wall_seconds'], new_stats['wall_seconds']) >= min_seconds
+        for metric in DIFF_METRICS:
+            old_value = old_stats.get(metric)
+            new_value = new_stats.get(metric)
+            if not old_value or new_value is None:
+                continue
+            if metric == 'peak_memory_bytes':
+                if max(old_value, new_value) < MIN_PEAK_BYTES:
+                    continue
+            elif not timed:
+                continue
+            change = (new_value - old_value) / old_value
+            if abs(change) <= threshold:
+                continue
+            worse = change < 0 if metric == 'rows_per_second' else change > 0
+            changes.append((name, metric, old_value, new_value, change, worse))
+    return changes
+
+
+def print_changes(changes):
+    for name, metric, old_value, new_value, change, regression in changes:
+        if change is None:
+            status = 'removed' if new_value is None else 'added'
+            print(f"  {name:<36} {status} ({format_value(metric, old_value if new_value is None else new_value)})")
+            continue
+        marker = 'REGRESSION' if regression else 'improved'
+        print(f"  {name:<36} {metric:<18} {format_value(metric, old_value):>16} -> "
+              f"{format_value(metric, new_value):>16} ({change:+.0%}) {marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two aggregation profile reports')
+    parser.add_argument('old', help='Report of the baseline run')
+    parser.add_argument('new', help='Report of the run to check')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Relative change reported, as a fraction (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--min-seconds', type=float, default=DEFAULT_MIN_SECONDS,
+                        help=f'Ignore the times of sections shorter than this (default: {DEFAULT_MIN_SECONDS})')
+    args = parser.parse_args()
+
+    old = load_report(args.old)
+    new = load_report(args.new)
+    print(f"{args.old} ({old.get('started_at')}) -> {args.new} ({new.get('started_at')})")
+    if old.get('memory_traced') != new.get('memory_traced'):
+        print("Note: only one of the runs traced memory, so times are not comparable")
+    changes = diff_reports(old, new, args.threshold, args.min_seconds)
+    if not changes:
+        print(f"No section changed by more than {args.threshold:.0%}")
+        return 0
+    print_changes(changes)
+    regressions = sum(1 for change in changes if change[5])
+    print(f"{regressions} regression(s), {len(changes) - regressions} other change(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
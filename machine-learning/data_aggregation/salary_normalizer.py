@@ -0,0 +1,180 @@
+"""
+Salary normalization: annual salaries from free-text salary fields, and
+per-role outlier filtering.
+
+clean_salary() normalizes one value; clean_salary_column() gives the same
+results for a whole column: each distinct value is cleaned once, the first
+two numbers are pulled out with one str.extract, and ranges, hourly rates
+and the sanity bounds are applied to NumPy arrays. filter_salary_outliers() computes the
+quartiles of each role once with a grouped quantile and broadcasts the
+bounds back to the rows, instead of a Python callback per role.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+SALARY_NUMBER = r'[\d,]+\.?\d*'
+
+# The matches of SALARY_NUMBER that contain a digit (the others, like a lone
+# comma, do not parse). They never overlap a digitless match, so the n-th
+# match of this pattern is the n-th number clean_salary parses.
+SALARY_DIGITS = r'[\d,]*\d[\d,]*\.?\d*|,+\.\d+'
+
+# Text meaning there is no salary figure to extract
+NO_SALARY_TERMS = ['call', 'contact', 'competitive', 'negotiable']
+HOURLY_TERMS = ['per hour', 'hourly']
+
+HOURS_PER_YEAR = 2080  # Standard full-time hours
+
+# Values below this are taken to be hourly rates even without "per hour"
+MIN_ANNUAL_AMOUNT = 1000
+
+# Annual salaries outside this range are dropped
+MIN_SALARY = 10000
+MAX_SALARY = 1000000
+
+# Bounds of the outlier filter (more conservative than typical 1.5*IQR)
+MIN_REASONABLE_SALARY = 25000
+MAX_REASONABLE_SALARY = 400000
+
+# Roles with at most this many postings are not outlier-filtered
+MIN_ROLE_POSTINGS = 10
+
+
+def clean_salary(salary):
+    """Extract and clean salary information from text"""
+    if not isinstance(salary, str) or pd.isna(salary) or salary == 'NA':
+        return None
+
+    try:
+        # Convert to lowercase for consistent detection
+        salary_lower = salary.lower()
+
+        # Skip nonsensical values
+        if any(term in salary_lower for term in NO_SALARY_TERMS):
+            return None
+
+        # Determine if hourly or annual
+        is_hourly = any(term in salary_lower for term in HOURLY_TERMS)
+
+        # Extract all numbers from the string
+        numbers = re.findall(SALARY_NUMBER, salary)
+        if not numbers:
+            return None
+
+        # Clean the extracted numbers
+        cleaned_numbers = []
+        for num in numbers:
+            try:
+                cleaned_numbers.append(float(num.replace(',', '')))
+            except ValueError:
+                continue
+
+        if not cleaned_numbers:
+            return None
+
+        # Handle salary ranges
+        if len(cleaned_numbers) >= 2:
+            # Take the average of the first two numbers (likely a range)
+            min_val, max_val = cleaned_numbers[0], cleaned_numbers[1]
+            # Ensure min <= max
+            if min_val > max_val:
+                min_val, max_val = max_val, min_val
+            avg_salary = (min_val + max_val) / 2
+        else:
+            # Just one number found
+            avg_salary = cleaned_numbers[0]
+
+        # Sanity check for very low values that are likely hourly rates without explicit "per hour"
+        if not is_hourly and avg_salary < MIN_ANNUAL_AMOUNT:
+            is_hourly = True
+
+        # Convert hourly to annual (standard 2080 hours per year)
+        if is_hourly:
+            annual_salary = avg_salary * HOURS_PER_YEAR
+        else:
+            annual_salary = avg_salary
+
+        # Sanity check for reasonable salary range (exclude extreme outliers)
+        if annual_salary < MIN_SALARY or annual_salary > MAX_SALARY:
+            return None
+
+        return annual_salary
+
+    except (ValueError, TypeError):
+        return None
+
+
+def clean_salary_column(salaries):
+    """clean_salary of every value of a Series, as a float Series (NaN where there is no salary)."""
+    # Salary texts repeat a lot across postings, so each distinct value is cleaned once
+    codes, uniques = pd.factorize(np.asarray(salaries, dtype=object))
+    cleaned = np.full(len(uniques) + 1, np.nan)  # The last entry is for missing values (code -1)
+
+    # Text values, indexed by position in uniques
+    is_text = np.fromiter((isinstance(value, str) and value != 'NA' for value in uniques), dtype=bool,
+                          count=len(uniques))
+    positions = np.flatnonzero(is_text)
+    text = pd.Series(uniques[positions], index=positions, dtype=object)
+    lower = text.str.lower()
+    text = text[~lower.str.contains('|'.join(NO_SALARY_TERMS), regex=True)]
+    is_hourly = lower.str.contains('|'.join(HOURLY_TERMS), regex=True)
+
+    # The first two numbers of each value
+    numbers = text.str.extract(f'({SALARY_DIGITS})(?:[\\s\\S]*?({SALARY_DIGITS}))?')
+    numbers = numbers[numbers[0].notna()]
+    first = numbers[0].str.replace(',', '', regex=False).astype(np.float64).to_numpy()
+    second = numbers[1].str.replace(',', '', regex=False).astype(np.float64).to_numpy()
+
+    # Average of the first two numbers (likely a range), or the only one
+    amounts = np.where(np.isnan(second), first, (first + second) / 2)
+    hourly = is_hourly.reindex(numbers.index).to_numpy(dtype=bool) | (amounts < MIN_ANNUAL_AMOUNT)
+    annual = np.where(hourly, amounts * HOURS_PER_YEAR, amounts)
+    valid = (annual >= MIN_SALARY) & (annual <= MAX_SALARY)
+    cleaned[numbers.index.to_numpy(dtype=np.int64)[valid]] = annual[valid]
+    return pd.Series(cleaned[codes], index=salaries.index if isinstance(salaries, pd.Series) else None)
+
+
+def remove_salary_outliers(salary_series):
+    """Remove outliers from a series of salary values"""
+    if len(salary_series) <= 2:
+        return salary_series
+
+    # Calculate Q1, Q3 and IQR
+    Q1 = salary_series.quantile(0.25)
+    Q3 = salary_series.quantile(0.75)
+    IQR = Q3 - Q1
+
+    # Define outlier bounds (more conservative than typical 1.5*IQR)
+    lower_bound = max(MIN_REASONABLE_SALARY, Q1 - 1.5 * IQR)  # Minimum reasonable salary
+    upper_bound = min(MAX_REASONABLE_SALARY, Q3 + 1.5 * IQR)  # Maximum reasonable salary
+
+    # Filter out outliers
+    return salary_series[(salary_series >= lower_bound) & (salary_series <= upper_bound)]
+
+
+def filter_salary_outliers(roles, salaries):
+    """
+    Salaries with outliers (see remove_salary_outliers) set to NaN within
+    each role with more than MIN_ROLE_POSTINGS postings. Salaries of postings
+    without a role are NaN.
+    """
+    df = pd.DataFrame({'role': np.asarray(roles, dtype=object), 'salary': np.asarray(salaries, dtype=np.float64)})
+    grouped = df.groupby('role')['salary']
+    postings = grouped.size()
+
+    # Quartiles of the filtered roles, computed once and broadcast to their rows
+    filtered_roles = postings.index[postings > MIN_ROLE_POSTINGS]
+    quartiles = grouped.quantile([0.25, 0.75]).unstack().reindex(index=filtered_roles, columns=[0.25, 0.75])
+    q1 = df['role'].map(quartiles[0.25]).to_numpy(dtype=np.float64)
+    q3 = df['role'].map(quartiles[0.75]).to_numpy(dtype=np.float64)
+    iqr = q3 - q1
+    lower_bound = np.maximum(MIN_REASONABLE_SALARY, q1 - 1.5 * iqr)
+    upper_bound = np.minimum(MAX_REASONABLE_SALARY, q3 + 1.5 * iqr)
+
+    salary = df['salary'].to_numpy()
+    is_filtered = df['role'].isin(filtered_roles).to_numpy()
+    keep = df['role'].notna().to_numpy() & (~is_filtered | ((salary >= lower_bound) & (salary <= upper_bound)))
+    return pd.Series(np.where(keep, salary, np.nan), index=salaries.index if isinstance(salaries, pd.Series) else None)
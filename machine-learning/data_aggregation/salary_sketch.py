@@ -0,0 +1,237 @@
+"""
+Mergeable summary of the salaries of one role or skill.
+
+A SalarySketch keeps the salaries themselves, in the order they were added,
+while there are at most EXACT_LIMIT of them, so metrics of roles and skills
+with few salaries are exactly those pandas gives. Beyond that it switches to
+log-spaced buckets (as in DDSketch): each salary is counted in the bucket of
+width RELATIVE_ACCURACY around it, and quantiles are read from the bucket
+counts, to within RELATIVE_ACCURACY of the true value, in a few KB however
+many salaries were added. Count, sum, min and max are kept exactly in both
+modes.
+
+Which bucket a salary falls in depends only on the salary, and merging
+adds bucket counts, so a sketch of some data is the same however it was
+split into CSV chunks, worker partitions or incremental runs before being
+merged, and so are the metrics computed from it. to_document() and
+from_document() store a sketch in a MongoDB document.
+"""
+
+import math
+
+import numpy as np
+
+# Salaries kept as they are before switching to buckets, so a stored sketch stays a few KB
+EXACT_LIMIT = 256
+
+# Relative error of quantiles once a sketch has more than EXACT_LIMIT salaries
+RELATIVE_ACCURACY = 0.005
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def bucket_keys(values):
+    """
+    Bucket of each salary: 0 for magnitudes below 1, otherwise +-(i + 1) for
+    magnitudes in (GAMMA ** (i - 1), GAMMA ** i], with the salary's sign.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    magnitudes = np.abs(values)
+    keys = np.ceil(np.log(np.maximum(magnitudes, 1)) / _LOG_GAMMA).astype(np.int64) + 1
+    keys[magnitudes < 1] = 0
+    return np.where(values < 0, -keys, keys)
+
+
+def bucket_values(keys):
+    """The salary each bucket stands for: within RELATIVE_ACCURACY of every salary in it."""
+    keys = np.asarray(keys, dtype=np.int64)
+    magnitudes = 2 * _GAMMA ** (np.abs(keys) - 1) / (_GAMMA + 1)
+    return np.where(keys == 0, 0.0, np.sign(keys) * magnitudes)
+
+
+class SalarySketch:
+    """Salaries, or their bucket counts past EXACT_LIMIT; None and NaN are ignored."""
+
+    __slots__ = ('count', 'total', 'min', 'max', 'values', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        # The salaries while exact; past EXACT_LIMIT, bucket key -> count, and
+        # the salaries added since the buckets were last counted
+        self.values = []
+        self.buckets = None
+
+    @classmethod
+    def from_values(cls, values):
+        sketch = cls()
+        sketch.update(values)
+        return sketch
+
+    @property
+    def exact(self):
+        return self.buckets is None
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value):
+        if _is_missing(value):
+            return
+        value = float(value)
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.values.append(value)
+        if self.exact:
+            if self.count > EXACT_LIMIT:
+                self._to_buckets()
+        elif len(self.values) >= EXACT_LIMIT:
+            # Counted a batch at a time, as counting a single salary costs as much as a few hundred
+            self._count_pending()
+
+    def update(self, values):
+        values = np.asarray([value for value in values if not _is_missing(value)], dtype=np.float64)
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        low, high = float(values.min()), float(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        if self.exact:
+            self.values.extend(values.tolist())
+            if self.count > EXACT_LIMIT:
+                self._to_buckets()
+        else:
+            self._add_to_buckets(values)
+
+    def merge(self, other):
+        """Add the salaries of another sketch (after this sketch's, while exact)."""
+        if not other.count:
+            return self
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        if self.exact and other.exact:
+            self.values.extend(other.values)
+            if self.count > EXACT_LIMIT:
+                self._to_buckets()
+            return self
+        if self.exact:
+            self._to_buckets()
+        self._add_to_buckets(other.values)
+        if not other.exact:
+            for key, count in other.buckets.items():
+                self.buckets[key] = self.buckets.get(key, 0) + count
+        return self
+
+    def _to_buckets(self):
+        self.buckets = {}
+        self._count_pending()
+
+    def _count_pending(self):
+        values, self.values = self.values, []
+        self._add_to_buckets(values)
+
+    def _add_to_buckets(self, values):
+        if not len(values):
+            return
+        keys, counts = np.unique(bucket_keys(values), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def quantiles(self, qs):
+        """
+        Salaries at the given quantiles, interpolated linearly between ranks
+        like pandas' quantile() (exact up to EXACT_LIMIT salaries).
+        """
+        if not self.count:
+            return [None for _ in qs]
+        percentiles = np.asarray(qs, dtype=np.float64) * 100
+        if self.exact:
+            return [float(value) for value in np.percentile(self.values, percentiles)]
+        self._count_pending()
+        keys = np.array(sorted(self.buckets), dtype=np.int64)
+        values = bucket_values(keys)
+        # Every bucket key stands for a higher salary than the keys below it
+        ends = np.cumsum([self.buckets[key] for key in keys.tolist()])
+        ranks = percentiles / 100 * (self.count - 1)
+        below = values[np.searchsorted(ends, np.floor(ranks), side='right')]
+        above = values[np.searchsorted(ends, np.ceil(ranks), side='right')]
+        quantiles = below + (above - below) * (ranks - np.floor(ranks))
+        return [float(value) for value in np.clip(quantiles, self.min, self.max)]
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        if self.exact:
+            # Summed in the order the salaries were added, as pandas sums a column
+            return float(np.asarray(self.values, dtype=np.float64).sum()) / self.count
+        return self.total / self.count
+
+    def metrics(self):
+        """The count, min, max, mean, median, p25 and p75 of the salaries."""
+        p25, median, p75 = self.quantiles([0.25, 0.5, 0.75])
+        return {
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'median': median,
+            'p25': p25,
+            'p75': p75
+        }
+
+    def to_document(self):
+        document = {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min,
+            'max': self.max
+        }
+        if self.exact:
+            document['values'] = self.values
+        else:
+            self._count_pending()
+            keys = sorted(self.buckets)
+            document['relative_accuracy'] = RELATIVE_ACCURACY
+            document['bucket_keys'] = keys
+            document['bucket_counts'] = [self.buckets[key] for key in keys]
+        return document
+
+    @classmethod
+    def from_document(cls, document):
+        sketch = cls()
+        sketch.count = document['count']
+        sketch.total = document['sum']
+        sketch.min = document['min']
+        sketch.max = document['max']
+        if 'values' in document:
+            sketch.values = list(document['values'])
+            if sketch.count > EXACT_LIMIT:
+                # Stored with a higher EXACT_LIMIT
+                sketch._to_buckets()
+            return sketch
+        keys, counts = document['bucket_keys'], document['bucket_counts']
+        if document.get('relative_accuracy') != RELATIVE_ACCURACY:
+            # Buckets of another width: counted again by the salaries they stand for
+            keys = bucket_keys(bucket_values(keys)).tolist()
+        sketch.buckets = {}
+        for key, count in zip(keys, counts):
+            sketch.buckets[key] = sketch.buckets.get(key, 0) + count
+        return sketch
@@ -0,0 +1,89 @@
+"""
+Text columns shared with worker processes without pickling them.
+
+SharedTexts.create() materializes a column of texts once, as an Arrow
+large_string array (a single UTF-8 buffer plus an offsets array) in an IPC
+file. A SharedTexts pickles as just the file path and a range of rows, so
+handing a partition's descriptions to a worker costs a few bytes; the
+worker memory-maps the file and reads the texts of its range from the
+mapped pages as it goes, a block at a time. The pages are the OS page cache,
+shared by all the processes, so a worker's memory does not grow with the
+size of the column.
+"""
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Texts converted to Python strings at a time when iterating
+READ_BLOCK_SIZE = 1024
+
+
+class SharedTexts:
+    """A range of rows of a text column in a memory-mapped Arrow file. Missing values read as None."""
+
+    def __init__(self, path, start=0, stop=None):
+        self.path = path
+        self.start = start
+        self.stop = stop
+        self._array = None
+
+    @classmethod
+    def create(cls, values, path):
+        """
+        Write values (texts and missing values) to an Arrow file at path and
+        return a SharedTexts of all of them. Raises TypeError if a value is
+        neither text nor missing.
+        """
+        try:
+            array = pa.array(np.asarray(values, dtype=object), type=pa.large_string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise TypeError(f"Not a text column: {e}") from e
+        batch = pa.record_batch([array], names=['text'])
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return cls(path, 0, len(array))
+
+    @property
+    def array(self):
+        """The texts of the range, as an Arrow array over the mapped file (nothing is copied)."""
+        if self._array is None:
+            source = pa.memory_map(self.path, 'r')
+            array = pa.ipc.open_file(source).get_batch(0).column(0)
+            stop = len(array) if self.stop is None else self.stop
+            self._array = array.slice(self.start, stop - self.start)
+        return self._array
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("SharedTexts slices must be contiguous")
+            return SharedTexts(self.path, self.start + start, self.start + max(start, stop))
+        return self.array[key].as_py()
+
+    def __iter__(self):
+        array = self.array
+        for offset in range(0, len(array), READ_BLOCK_SIZE):
+            yield from array.slice(offset, READ_BLOCK_SIZE).to_pylist()
+
+    def select(self, mask):
+        """Iterate over the texts where mask (a boolean per row) is true."""
+        return (text for text, keep in zip(self, mask) if keep)
+
+    def truthy(self):
+        """bool() of each text as a NumPy array, computed on the buffer (missing values are true, as NaN is)."""
+        array = self.array
+        has_text = pc.fill_null(pc.greater(pc.binary_length(array), 0), True)
+        return has_text.to_numpy(zero_copy_only=False)
+
+    def __getstate__(self):
+        # Only the file and range travel to other processes, never the mapped array
+        return {'path': self.path, 'start': self.start, 'stop': self.stop}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['start'], state['stop'])
+
@@ -0,0 +1,117 @@
+"""
+Persistent cache for skill extraction results.
+
+Stores the skills list extracted from a job description in a local SQLite
+file, keyed by a hash of the description text and the extractor version, so
+re-runs only have to run NLP on new or changed postings. The cache is bounded
+to a maximum number of entries and evicts the least recently used ones.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_MAX_ENTRIES = 200000
+
+# Max number of keys per SQL "IN (...)" lookup
+LOOKUP_CHUNK_SIZE = 500
+
+
+class SkillCache:
+    """Content-addressed on-disk cache of extract_skills_from_text results."""
+
+    def __init__(self, path, version, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS skills ("
+            "key TEXT PRIMARY KEY, skills TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS skills_last_used ON skills (last_used)")
+        self.conn.commit()
+
+    def key(self, text):
+        """Cache key for a description under the current extractor version."""
+        payload = f"{self.version}\0{text}".encode('utf-8', 'surrogatepass')
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_many(self, texts):
+        """
+        Look up several descriptions at once.
+        Returns a list with the cached skills list (or None on a miss) per text.
+        """
+        keys = [self.key(text) for text in texts]
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for i in range(0, len(unique_keys), LOOKUP_CHUNK_SIZE):
+            chunk = unique_keys[i:i + LOOKUP_CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, skills FROM skills WHERE key IN ({placeholders})", chunk
+            )
+            found.update(rows)
+
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE skills SET last_used = ? WHERE key = ?", [(now, key) for key in found]
+            )
+            self.conn.commit()
+
+        results = []
+        for key in keys:
+            if key in found:
+                self.hits += 1
+                # Decode per text so every posting gets its own list
+                results.append(json.loads(found[key]))
+            else:
+                self.misses += 1
+                results.append(None)
+        return results
+
+    def put_many(self, items):
+        """Store (description, skills) pairs, then evict down to max_entries."""
+        now = time.time()
+        rows = {self.key(text): (json.dumps(skills), now) for text, skills in items}
+        rows = [(key, skills, last_used) for key, (skills, last_used) in rows.items()]
+        if not rows:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO skills (key, skills, last_used) VALUES (?, ?, ?)", rows
+        )
+        self.writes += len(rows)
+        self.evict()
+        self.conn.commit()
+
+    def evict(self):
+        """Drop the least recently used entries beyond max_entries."""
+        count = self.conn.execute("SELECT COUNT(*) FROM skills").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM skills WHERE key IN "
+                "(SELECT key FROM skills ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+
+    def print_stats(self):
+        lookups = self.hits + self.misses
+        hit_rate = (self.hits / lookups * 100) if lookups else 0
+        print(f"Skill cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate), "
+              f"{self.writes} writes, {self.evictions} evictions ({self.path})")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,150 @@
+"""
+Single-pass multi-pattern skill matcher.
+
+Builds an Aho-Corasick automaton over a list of skill terms (including terms
+with punctuation such as "c++", "c#" or ".net") so that every occurrence of
+every term in a description can be found in one linear scan, instead of
+running a separate regex for each skill.
+"""
+
+import re
+from bisect import bisect_left
+from collections import deque
+from itertools import accumulate
+
+# Same definition of a "word" character as the regex \b anchor
+_WORD_CHAR = re.compile(r'\w')
+
+
+# Characters that survive lower() but match ASCII letters under re.IGNORECASE
+IGNORECASE_FOLD = [('ı', 'i'), ('ſ', 's')]
+
+
+def fold_ignorecase(text):
+    """
+    Lowercased text with the IGNORECASE_FOLD characters replaced, so a plain
+    lowercase match finds what an re.IGNORECASE regex would. Offsets are kept
+    (every fold is one character to one character).
+    """
+    # str.replace is much faster than str.translate
+    for char, folded in IGNORECASE_FOLD:
+        text = text.replace(char, folded)
+    return text
+
+
+def _is_word_char(ch):
+    return bool(_WORD_CHAR.match(ch))
+
+
+def has_word_boundary(text, pos):
+    """Return True if a regex \\b anchor would match at text[pos]."""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over a fixed set of lowercase skill terms."""
+
+    def __init__(self, terms):
+        # Keep terms in first-seen order so results are deterministic
+        self.terms = list(dict.fromkeys(term.lower() for term in terms if term))
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for term in self.terms:
+            state = 0
+            for ch in term:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][ch] = next_state
+                state = next_state
+            self._output[state].append(term)
+
+        # Breadth-first pass to compute failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def scan(self, text):
+        """
+        Find every (possibly overlapping) occurrence of every term in one pass.
+        Returns a dict mapping term -> list of start offsets in ascending order.
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        occurrences = {}
+        state = 0
+
+        for index, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                for term in output[state]:
+                    start = index - len(term) + 1
+                    if term in occurrences:
+                        occurrences[term].append(start)
+                    else:
+                        occurrences[term] = [start]
+
+        return occurrences
+
+
+def word_bounded_spans(text, term, starts):
+    """
+    Filter raw occurrences of a term down to the spans re.finditer would
+    return for r'\\b' + re.escape(term) + r'\\b': word-bounded on both sides
+    and non-overlapping, scanning left to right.
+    """
+    spans = []
+    last_end = 0
+    for start in starts:
+        end = start + len(term)
+        if start < last_end:
+            continue
+        if has_word_boundary(text, start) and has_word_boundary(text, end):
+            spans.append((start, end))
+            last_end = end
+    return spans
+
+
+class PhraseIndex:
+    """
+    Sorted offsets of every occurrence of a set of phrases, for answering
+    "does any phrase occur entirely inside text[lo:hi]" with a binary search
+    instead of slicing the window and testing each phrase with `in`.
+    Built from the result of SkillMatcher.scan, so the phrases must be terms
+    of the matcher that produced it.
+    """
+
+    def __init__(self, occurrences, phrases):
+        spans = []
+        for phrase in phrases:
+            for start in occurrences.get(phrase, ()):
+                spans.append((start, start + len(phrase)))
+        spans.sort()
+        self.starts = [start for start, _ in spans]
+
+        # min_end[i] is the smallest end offset among spans i..n-1
+        ends = [end for _, end in reversed(spans)]
+        self.min_end = list(accumulate(ends, min))[::-1]
+
+    def any_within(self, lo, hi):
+        """Return True if some phrase occurrence lies within text[lo:hi]."""
+        i = bisect_left(self.starts, lo)
+        return i < len(self.starts) and self.min_end[i] <= hi
@@ -0,0 +1,173 @@
+"""
+Sparse posting x skill matrix.
+
+Stores the skills extracted for every job posting as a scipy.sparse CSR
+matrix (one row per posting, one column per skill id) together with the skill
+vocabulary and each posting's role and salary. Counts, per-role skill counts,
+salary-by-skill and skill co-occurrence then become sparse matrix products
+instead of passes over Python lists. The matrix is saved as a single .npz
+file next to the other outputs so later analysis can load it directly.
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+def group_indicator(labels):
+    """
+    One-hot encode a sequence of labels.
+    Returns (groups, indicator) where indicator is a groups x len(labels) CSR
+    matrix with a 1 where posting j belongs to group i. Groups are in
+    first-seen order.
+    """
+    codes, groups = pd.factorize(pd.Series(labels, dtype=object), sort=False)
+    rows = np.flatnonzero(codes >= 0)
+    indicator = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (codes[rows], rows)),
+        shape=(len(groups), len(codes))
+    )
+    return list(groups), indicator
+
+
+class SkillMatrix:
+    """
+    Postings x skills matrix with its vocabulary and per-posting metadata.
+    Entries are 1 where a posting mentions a skill (the number of times its
+    skills list names it, if built with keep_duplicates).
+    """
+
+    def __init__(self, matrix, vocabulary, roles=None, salaries=None):
+        self.matrix = sp.csr_matrix(matrix)
+        self.vocabulary = list(vocabulary)
+        self.skill_index = {skill: i for i, skill in enumerate(self.vocabulary)}
+
+        n_postings = self.matrix.shape[0]
+        self.roles = np.asarray(roles if roles is not None else [''] * n_postings, dtype=str)
+        self.salaries = np.asarray(salaries if salaries is not None else np.full(n_postings, np.nan),
+                                   dtype=np.float64)
+
+        # Column-major copy for per-skill lookups, built on first use
+        self._csc = None
+
+    @classmethod
+    def from_skill_lists(cls, skill_lists, roles=None, salaries=None, vocabulary=None, keep_duplicates=False):
+        """
+        Build the matrix from one skills list per posting. Skill ids follow the
+        given vocabulary, extended with unseen skills in first-seen order.
+        Each row keeps its skills in list order, without duplicates; with
+        keep_duplicates, a skill named n times in a list is stored as n, so
+        skill_counts and role_skill_counts count every naming.
+        """
+        vocabulary = list(vocabulary) if vocabulary is not None else []
+        skill_index = {skill: i for i, skill in enumerate(vocabulary)}
+        indptr = [0]
+        indices = []
+        data = []
+
+        for skills in skill_lists:
+            positions = {}  # skill id -> position in indices
+            for skill in skills or ():
+                skill_id = skill_index.get(skill)
+                if skill_id is None:
+                    skill_id = skill_index[skill] = len(vocabulary)
+                    vocabulary.append(skill)
+                position = positions.get(skill_id)
+                if position is None:
+                    positions[skill_id] = len(indices)
+                    indices.append(skill_id)
+                    data.append(1)
+                elif keep_duplicates:
+                    data[position] += 1
+            indptr.append(len(indices))
+
+        dtype = np.int8 if max(data, default=1) <= np.iinfo(np.int8).max else np.int32
+        matrix = sp.csr_matrix(
+            (np.asarray(data, dtype=dtype), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(indptr) - 1, len(vocabulary))
+        )
+        return cls(matrix, vocabulary, roles, salaries)
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def row_skills(self, row):
+        """Skills of one posting, in the order they were extracted."""
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return [self.vocabulary[i] for i in self.matrix.indices[start:end]]
+
+    def skills_in_order(self, rows):
+        """Ids of the skills mentioned in the given postings, in first-mentioned order."""
+        indptr, indices = self.matrix.indptr, self.matrix.indices
+        mentioned = [indices[indptr[row]:indptr[row + 1]] for row in rows]
+        if not mentioned:
+            return np.array([], dtype=indices.dtype)
+        skill_ids, first = np.unique(np.concatenate(mentioned), return_index=True)
+        return skill_ids[np.argsort(first)]
+
+    def skill_counts(self):
+        """Number of postings mentioning each skill (aligned with vocabulary); namings if keep_duplicates."""
+        return np.asarray(self.matrix.sum(axis=0, dtype=np.int64)).ravel()
+
+    def role_counts(self):
+        """(roles, number of postings per role), roles in first-seen order."""
+        roles, indicator = group_indicator(self.roles)
+        return roles, np.asarray(indicator.sum(axis=1)).ravel()
+
+    def role_skill_counts(self):
+        """
+        (roles, roles x skills CSR matrix of postings per role mentioning each
+        skill; namings if keep_duplicates).
+        """
+        roles, indicator = group_indicator(self.roles)
+        return roles, (indicator @ self.matrix.astype(np.int64)).tocsr()
+
+    def salary_by_skill(self):
+        """
+        Salary totals per skill over postings with a salary.
+        Returns (count, total, mean) arrays aligned with vocabulary; the mean
+        is NaN for skills without salary data.
+        """
+        has_salary = ~np.isnan(self.salaries)
+        matrix_t = (self.matrix > 0).T.astype(np.float64)
+        count = matrix_t @ has_salary.astype(np.float64)
+        total = matrix_t @ np.where(has_salary, self.salaries, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, total / count, np.nan)
+        return count.astype(np.int64), total, mean
+
+    def skill_salaries(self, skill):
+        """Non-missing salaries of the postings mentioning a skill, in posting order."""
+        if self._csc is None:
+            self._csc = self.matrix.tocsc()
+            self._csc.sort_indices()
+        skill_id = self.skill_index[skill]
+        rows = self._csc.indices[self._csc.indptr[skill_id]:self._csc.indptr[skill_id + 1]]
+        salaries = self.salaries[rows]
+        return salaries[~np.isnan(salaries)]
+
+    def cooccurrence(self):
+        """Skills x skills CSR matrix of postings mentioning both skills (diagonal = counts)."""
+        matrix = (self.matrix > 0).astype(np.int64)
+        return (matrix.T @ matrix).tocsr()
+
+    def save(self, path):
+        """Write the matrix, vocabulary and metadata to a compressed .npz file."""
+        np.savez_compressed(
+            path,
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.asarray(self.matrix.shape),
+            vocabulary=np.asarray(self.vocabulary, dtype=str),
+            roles=self.roles,
+            salaries=self.salaries
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read a matrix written by save()."""
+        with np.load(path, allow_pickle=False) as npz:
+            matrix = sp.csr_matrix((npz['data'], npz['indices'], npz['indptr']), shape=tuple(npz['shape']))
+            return cls(matrix, npz['vocabulary'].tolist(), npz['roles'], npz['salaries'])
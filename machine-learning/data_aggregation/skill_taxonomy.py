@@ -0,0 +1,323 @@
+"""
+Shared skill taxonomy for the job market analysis scripts.
+
+All skill lists used by data_aggregation.py, skills_from_text.py, skill_parse.py
+and role_consolidator.py live here. SkillTaxonomy compiles the extraction
+lists once into frozen sets, lookup tables, canonicalization maps and the
+skill matcher automaton (about a millisecond). Nothing is compiled on
+import: get_skill_taxonomy() compiles it on first use, once per process.
+The taxonomy version is a hash of the extraction lists and of the matcher
+source, so it changes whenever any of them is edited.
+
+skill_parse.py and role_consolidator.py match display names from their own
+catalogs (SKILL_CATALOGS, read with skill_catalog). The two lists differ on
+purpose, as each script reports what it did before the lists moved here;
+they are not compiled and are left out of the version, which keys the
+extraction caches.
+"""
+
+import hashlib
+import json
+
+import skill_matcher
+from skill_matcher import SkillMatcher
+
+# Bump when the way SkillTaxonomy is compiled changes, so the caches keyed by
+# the taxonomy version are dropped
+TAXONOMY_FORMAT_VERSION = 4
+
+
+# Terms that are never reported as skills
+INVALID_SKILL_TERMS = {
+    "con edison", "con edison of", "coop", "co-op", "internship", "intern", "work study",
+    "summer internship", "research assistant", "graduate assistant", "student", "education",
+    "project", "team", "collaboration", "communication", "resume", "linkedin", "email",
+    "writing", "microsoft", "google", "apple", "amazon", "meta", "problem solving",
+    "school", "university", "volunteer", "training", "learning", "class", "lecture",
+    "campus", "leadership", "presentation", "organization", "detail-oriented", "motivation",
+    "hardworking", "job", "employment", "assistant", "associate"
+}
+
+# Common tech skills for initial extraction (can be expanded)
+COMMON_TECH_SKILLS = [
+    "python", "java", "javascript", "js", "typescript", "ts", "c++", "c#", "ruby", "php", "swift", 
+    "kotlin", "go", "rust", "scala", "dart", "perl", "r", "matlab", "sql", "nosql", "mongodb", 
+    "postgresql", "mysql", "oracle", "sql server", "cassandra", "redis", "elasticsearch", 
+    "dynamodb", "firebase", "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "k8s",
+    "jenkins", "gitlab", "github", "bitbucket", "terraform", "ansible", "puppet", "chef",
+    "react", "angular", "vue", "nextjs", "nodejs", "express", "django", "flask", "spring", 
+    "laravel", "rails", "asp.net", "html", "css", "sass", "less", "bootstrap", "tailwind",
+    "jquery", "redux", "graphql", "rest", "soap", "oauth", "jwt", "machine learning", "ml",
+    "artificial intelligence", "ai", "deep learning", "dl", "natural language processing", "nlp",
+    "computer vision", "cv", "data science", "big data", "hadoop", "spark", "kafka", "tableau",
+    "power bi", "looker", "qlik", "excel", "vba", "linux", "unix", "windows", "macos", "ios", 
+    "android", "flutter", "react native", "xamarin", "cordova", "unity", "unreal", "blender",
+    "maya", "photoshop", "illustrator", "figma", "sketch", "adobe xd", "ui", "ux", "agile", 
+    "scrum", "kanban", "jira", "confluence", "trello", "slack", "teams", "zoom", "git", "svn", 
+    "mercurial", "cicd", "devops", "sre", "security", "penetration testing", "pen testing", 
+    "ethical hacking", "cybersecurity", "blockchain", "ethereum", "solidity", "smart contracts",
+    "crypto", "cryptocurrency", "nft", "web3", "serverless", "microservices", "soa", "apigateway"
+]
+
+
+# Skills that are checked for directly as substrings (step 5 of extraction):
+# a few with special characters or alternative names, then every common tech skill
+CRITICAL_SKILLS = [
+    "c++", "c#", ".net", "asp.net", "node.js", "vue.js", "react.js", 
+    "typescript", "javascript", "python", "java", "golang", "ruby",
+    "tensorflow", "pytorch", "opencv", "docker", "kubernetes", "aws",
+    "azure", "gcp", "sql", "nosql", "mongodb", "postgresql", 
+] + COMMON_TECH_SKILLS
+
+
+# Variations of skills with special characters
+SKILL_VARIATIONS = {
+    "c++": ["c plus plus", "cplusplus", "c-plus-plus"],
+    "c#": ["c sharp", "csharp", "c-sharp"],
+    "node.js": ["node js", "nodejs"],
+    "vue.js": ["vue js", "vuejs"],
+    "react.js": ["react js", "reactjs"]
+}
+
+
+# Skill context indicators - words that suggest a term is a skill
+SKILL_INDICATORS = [
+    'experience', 'skill', 'knowledge', 'proficiency', 'familiar', 'working with',
+    'expertise', 'proficient', 'competent', 'trained in', 'certified', 'background in',
+    'understanding of', 'ability to use', 'ability to work with', 'hands-on', 'exposure to'
+]
+
+# Words to ignore as skills - generic terms
+GENERIC_TERMS = [
+    'software', 'programming', 'language', 'framework', 'library', 'platform', 'tool',
+    'environment', 'development', 'engineer', 'engineering', 'solution', 'system', 'quality',
+    'knowledge', 'experience', 'proficiency', 'familiar', 'ability', 'skill', 'expertise',
+    'proficient', 'competent', 'trained', 'certified', 'background', 'understanding', 
+    'hands-on', 'exposure', 'working', 'with', 'using', 'utilize', 'implementation',
+    'developing', 'designing', 'building', 'creating', 'writing', 'coding', 'implementing',
+    'supporting', 'maintaining', 'troubleshooting', 'debugging', 'testing', 'deploying',
+    'managing', 'leading', 'directing', 'coordinating', 'organizing'
+]
+
+# Abbreviations and variants mapped to standard skill names, as skills_from_text.py maps them
+BASE_SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vue",
+    "node.js": "nodejs",
+    "golang": "go",
+    "dotnet": ".net",
+    "postgres": "postgresql",
+    "aws cloud": "aws",
+    "amazon web services": "aws",
+    "microsoft azure": "azure",
+    "google cloud platform": "gcp",
+    "tensorflow": "tensorflow",
+    "opencv": "opencv",
+    "c plus plus": "c++",
+    "cplusplus": "c++",
+    "c-plus-plus": "c++",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "c-sharp": "c#",
+    "objective c": "objective-c",
+    "objective-c": "objective-c"
+}
+
+# data_aggregation.py also maps these
+SKILL_ALIASES = {
+    **BASE_SKILL_ALIASES,
+    "gcp": "google cloud",
+    "rest api development": "api development",
+    "api-development": "api development",
+    "api": "api development"
+}
+
+# Display names of the tech skills skill_parse.py matches (as listed there, 'Elasticsearch' twice),
+# and the short or ambiguous ones that need strict word boundary checks
+SKILL_PARSE_CATALOG = [
+    'HTML', 'CSS', 'JavaScript', 'TypeScript', 'React', 'Angular', 'Vue.js', 'Svelte', 'jQuery', 'Bootstrap',
+    'Tailwind CSS', 'Material UI', 'Redux', 'MobX', 'React Router', 'Webpack', 'Babel', 'ESLint', 'Prettier',
+    'Jest', 'Mocha', 'Chai', 'Enzyme', 'Cypress', 'React Testing Library', 'Selenium', 'Puppeteer', 'Node.js',
+    'Express.js', 'NestJS', 'Fastify', 'Koa', 'Hapi', 'Django', 'Flask', 'Ruby on Rails', 'Laravel',
+    'Spring Boot', 'ASP.NET Core', 'Phoenix', 'FastAPI', 'Symfony', 'CodeIgniter', 'PostgreSQL', 'MySQL',
+    'SQLite', 'Oracle Database', 'Microsoft SQL Server', 'MongoDB', 'Redis', 'Cassandra', 'DynamoDB',
+    'Firebase', 'Elasticsearch', 'Neo4j', 'CouchDB', 'InfluxDB', 'MariaDB', 'RabbitMQ', 'Kafka', 'GraphQL',
+    'REST API', 'SOAP', 'gRPC', 'WebSockets', 'OAuth', 'JWT', 'SAML', 'Microservices', 'Docker', 'Kubernetes',
+    'Docker Compose', 'Podman', 'AWS', 'Azure', 'Google Cloud Platform', 'Heroku', 'DigitalOcean', 'Netlify',
+    'Vercel', 'AWS Lambda', 'Azure Functions', 'Google Cloud Functions', 'AWS S3', 'AWS EC2', 'AWS RDS',
+    'AWS DynamoDB', 'Azure Blob Storage', 'Firebase Hosting', 'GitHub Actions', 'Jenkins', 'CircleCI',
+    'Travis CI', 'TeamCity', 'GitLab CI/CD', 'ArgoCD', 'Ansible', 'Terraform', 'Pulumi', 'CloudFormation',
+    'Chef', 'Puppet', 'Git', 'GitHub', 'GitLab', 'Bitbucket', 'SVN', 'Linux', 'Unix', 'Windows Server',
+    'Bash scripting', 'PowerShell', 'Python', 'Java', 'C#', 'Rust', 'C++', 'PHP', 'Ruby', 'Swift', 'Kotlin',
+    'Scala', 'Elixir', 'Haskell', 'Clojure', 'Groovy', 'Perl', 'Dart', 'Objective-C', 'MATLAB', 'Assembly',
+    'Solidity', 'WebAssembly', 'SQL', 'PL/SQL', 'T-SQL', 'Apache Spark', 'Apache Hadoop', 'Apache Airflow',
+    'Apache Beam', 'Apache Kafka', 'Elasticsearch', 'Logstash', 'Kibana', 'Prometheus', 'Grafana', 'Datadog',
+    'New Relic', 'Splunk', 'Jaeger', 'Zipkin', 'OpenTelemetry', 'Pandas', 'NumPy', 'TensorFlow', 'PyTorch',
+    'scikit-learn', 'Keras', 'NLTK', 'OpenCV', 'Matplotlib', 'Jupyter', 'Dask', 'Snowflake', 'BigQuery',
+    'Redshift', 'Databricks', 'Data Warehousing', 'ETL pipelines', 'Continuous Integration',
+    'Continuous Deployment', 'Infrastructure as Code', 'DevOps', 'SRE', 'Agile methodologies', 'Scrum',
+    'Kanban', 'Test-Driven Development', 'Behavior-Driven Development', 'Machine Learning',
+    'Natural Language Processing', 'Computer Vision', 'AI', 'Artificial Intelligence', 'LLM',
+    'Large Language Models', 'GenAI', 'Generative AI', 'Deep Learning'
+]
+SKILL_PARSE_SPECIAL_CASES = ['C', 'R', 'Go', 'D', 'J']
+
+# The same for role_consolidator.py
+ROLE_CONSOLIDATOR_CATALOG = [
+    'HTML', 'CSS', 'JavaScript', 'TypeScript', 'React', 'Angular', 'Vue.js', 'jQuery', 'Python', 'Java', 'C#',
+    'C++', 'Ruby', 'PHP', 'Swift', 'Kotlin', 'Go', 'Rust', 'SQL', 'PostgreSQL', 'MySQL', 'MongoDB', 'Redis',
+    'AWS', 'Azure', 'Google Cloud Platform', 'Docker', 'Kubernetes', 'Jenkins', 'Git', 'Linux', 'Node.js',
+    'Express', 'Django', 'Flask', 'Spring', '.NET', 'Machine Learning', 'Deep Learning', 'TensorFlow',
+    'PyTorch', 'AI', 'Artificial Intelligence', 'Data Science', 'Data Analysis', 'Big Data', 'Hadoop', 'Spark',
+    'Tableau', 'Power BI', 'R', 'Scala', 'GraphQL', 'REST API', 'Microservices', 'DevOps', 'CI/CD', 'Agile',
+    'Scrum', 'Jira', 'GitHub', 'GitLab', 'Bash', 'PowerShell', 'Object-Oriented Programming', 'OOP',
+    'Functional Programming', 'Test-Driven Development', 'TDD', 'Unit Testing', 'Jest', 'Mocha', 'Cypress',
+    'Selenium', 'Pandas', 'NumPy', 'SciPy', 'scikit-learn', 'Keras', 'Natural Language Processing', 'NLP',
+    'Computer Vision', 'OpenCV', 'Redux', 'Webpack', 'Babel', 'ESLint', 'Bootstrap', 'Tailwind CSS', 'SASS',
+    'LESS', 'WebSockets', 'OAuth', 'JWT', 'SAML', 'Serverless', 'Lambda', 'Terraform', 'Ansible', 'Kafka',
+    'Elasticsearch', 'ELK Stack', 'Prometheus', 'Grafana', 'Datadog', 'Splunk', 'Infrastructure as Code', 'IaC',
+    'SRE', 'Site Reliability Engineering', 'Continuous Integration', 'Continuous Deployment',
+    'Continuous Delivery', 'GitHub Actions', 'Large Language Models', 'LLM', 'GenAI', 'Generative AI',
+    'Snowflake', 'Databricks', 'Docker Compose', 'Kubernetes Helm', 'ETL', 'Data Warehousing',
+    'Data Engineering', 'Data Modeling', 'Data Visualization', 'Business Intelligence', 'BI', 'C'
+]
+ROLE_CONSOLIDATOR_SPECIAL_CASES = ['C', 'R', 'Go', 'D', '.NET', 'J']
+
+# Catalogs of the scripts that match display names: name -> (skills, special cases).
+# The lists differ on purpose, so each script's output is what it was before the lists moved here.
+SKILL_CATALOGS = {
+    'skill_parse': (SKILL_PARSE_CATALOG, SKILL_PARSE_SPECIAL_CASES),
+    'role_consolidator': (ROLE_CONSOLIDATOR_CATALOG, ROLE_CONSOLIDATOR_SPECIAL_CASES)
+}
+
+
+def build_skill_mapping(common_skills, aliases=SKILL_ALIASES):
+    """Aliases plus plural-to-singular forms of the common skills."""
+    skill_mapping = dict(aliases)
+
+    # Add plural to singular mapping
+    plural_mapping = {}
+    for skill in common_skills:
+        if skill.endswith('s') and skill[:-1] in common_skills:
+            plural_mapping[skill] = skill[:-1]
+        elif not skill.endswith('s'):
+            plural_mapping[f"{skill}s"] = skill
+
+    skill_mapping.update(plural_mapping)
+    return skill_mapping
+
+
+def build_skill_matcher(common_skills, critical_skills=CRITICAL_SKILLS, variations=SKILL_VARIATIONS,
+                        indicators=SKILL_INDICATORS):
+    """
+    Automaton covering the common skills, the critical skills and their
+    variations, plus the skill indicator phrases so the same pass also
+    locates the context words used for confidence scoring.
+    """
+    terms = list(common_skills) + list(critical_skills)
+    for variants in variations.values():
+        terms.extend(variants)
+    terms.extend(indicators)
+    return SkillMatcher(terms)
+
+
+def skill_catalog(name):
+    """(tech skills, special case skills) of a script's catalog in SKILL_CATALOGS."""
+    skills, special_cases = SKILL_CATALOGS[name]
+    return tuple(skills), tuple(special_cases)
+
+
+def taxonomy_source_hash():
+    """
+    Hash of the extraction lists in this module (not SKILL_CATALOGS) and of
+    the matcher source; used as the taxonomy version.
+    """
+    with open(skill_matcher.__file__, 'rb') as f:
+        matcher_source = hashlib.sha256(f.read()).hexdigest()
+    source = json.dumps([
+        TAXONOMY_FORMAT_VERSION, sorted(INVALID_SKILL_TERMS), COMMON_TECH_SKILLS, CRITICAL_SKILLS,
+        SKILL_VARIATIONS, SKILL_INDICATORS, GENERIC_TERMS, BASE_SKILL_ALIASES, SKILL_ALIASES, matcher_source
+    ], sort_keys=True)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+
+
+class SkillTaxonomy:
+    """Compiled, read-only view of the skill lists in this module."""
+
+    def __init__(self):
+        self.version = taxonomy_source_hash()
+
+        # Lists keep their order since extraction results depend on it
+        self.common_skills = tuple(COMMON_TECH_SKILLS)
+        self.common_skill_set = frozenset(COMMON_TECH_SKILLS)
+        self.critical_skills = tuple(CRITICAL_SKILLS)
+        self.variations = {skill: tuple(variants) for skill, variants in SKILL_VARIATIONS.items()}
+        self.invalid_terms = frozenset(INVALID_SKILL_TERMS)
+        self.skill_indicators = tuple(SKILL_INDICATORS)
+        self.generic_terms = frozenset(GENERIC_TERMS)
+        self.skill_mapping = build_skill_mapping(COMMON_TECH_SKILLS)
+        self.matcher = build_skill_matcher(COMMON_TECH_SKILLS)
+
+        # Compiled lookups for skill lists or aliases other than the defaults
+        self._custom = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_custom'] = {}
+        return state
+
+    def compiled_for(self, common_skills, aliases=SKILL_ALIASES):
+        """
+        Return (skill set, skill mapping, matcher) for a list of common skills
+        and aliases, reusing the precompiled ones for the defaults.
+        """
+        key = tuple(common_skills)
+        if key == self.common_skills and aliases is SKILL_ALIASES:
+            return self.common_skill_set, self.skill_mapping, self.matcher
+        cache_key = (key, tuple(aliases.items()))
+        if cache_key not in self._custom:
+            self._custom[cache_key] = (frozenset(key), build_skill_mapping(key, aliases), build_skill_matcher(key))
+        return self._custom[cache_key]
+
+    def search_terms(self):
+        """
+        Phrases that report each skill when found in a description, keyed by
+        the skill name they are stored under. 'words' are common skills,
+        matched on word boundaries (step 1 of extraction); 'substrings' are
+        critical skills and their variations, matched anywhere (step 5).
+        """
+        terms = {}
+
+        def add(skill, phrases, kind):
+            canonical = self.skill_mapping.get(skill, skill)
+            if canonical in self.generic_terms or canonical in self.invalid_terms or len(canonical) <= 1:
+                return
+            entry = terms.setdefault(canonical, {'words': [], 'substrings': []})
+            for phrase in phrases:
+                if phrase not in entry[kind]:
+                    entry[kind].append(phrase)
+
+        for skill in self.common_skills:
+            add(skill, [skill.lower()], 'words')
+        for skill in self.critical_skills:
+            add(skill, (skill,) + self.variations.get(skill, ()), 'substrings')
+        return {skill: {kind: sorted(phrases) for kind, phrases in entry.items()} for skill, entry in terms.items()}
+
+
+_taxonomy = None
+
+def get_skill_taxonomy():
+    """The shared taxonomy, compiled on first use (once per process)."""
+    global _taxonomy
+    if _taxonomy is None:
+        _taxonomy = SkillTaxonomy()
+    return _taxonomy
@@ -1,3 +1,8 @@
+import re
+
+from data_aggregation import get_nlp
+from skill_taxonomy import BASE_SKILL_ALIASES, COMMON_TECH_SKILLS, get_skill_taxonomy
+
 def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
     """Enhanced skill extraction with better NLP capabilities."""
     if not text or not isinstance(text, str):
@@ -10,26 +15,13 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
     
     # Process with spaCy for better entity recognition
 
-    doc = nlp(text)
-    
-    # Define skill context indicators - words that suggest a term is a skill
-    skill_indicators = [
-        'experience', 'skill', 'knowledge', 'proficiency', 'familiar', 'working with',
-        'expertise', 'proficient', 'competent', 'trained in', 'certified', 'background in',
-        'understanding of', 'ability to use', 'ability to work with', 'hands-on', 'exposure to'
-    ]
+    doc = get_nlp()(text)
     
-    # Define words to ignore as skills - generic terms
-    generic_terms = [
-        'software', 'programming', 'language', 'framework', 'library', 'platform', 'tool',
-        'environment', 'development', 'engineer', 'engineering', 'solution', 'system', 'quality',
-        'knowledge', 'experience', 'proficiency', 'familiar', 'ability', 'skill', 'expertise',
-        'proficient', 'competent', 'trained', 'certified', 'background', 'understanding', 
-        'hands-on', 'exposure', 'working', 'with', 'using', 'utilize', 'implementation',
-        'developing', 'designing', 'building', 'creating', 'writing', 'coding', 'implementing',
-        'supporting', 'maintaining', 'troubleshooting', 'debugging', 'testing', 'deploying',
-        'managing', 'leading', 'directing', 'coordinating', 'organizing'
-    ]
+    # Precompiled skill lists from the shared taxonomy
+    taxonomy = get_skill_taxonomy()
+    common_skill_set, skill_mapping, _ = taxonomy.compiled_for(common_skills, BASE_SKILL_ALIASES)
+    skill_indicators = taxonomy.skill_indicators
+    generic_terms = taxonomy.generic_terms
     
     # 1. Extract skills from common skills list with confidence scoring
 
@@ -45,7 +37,6 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
             confidence += min(len(matches), 3)
             
             # Check context around each mention
-            has_skill_context = False
             for match in matches:
                 start, end = match.span()
                 # Get context (up to 75 chars before and after)
@@ -55,7 +46,6 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
                 
                 # Check if it's used in a skill context
                 if any(indicator in context for indicator in skill_indicators):
-                    has_skill_context = True
                     confidence += 2
                     break
             
@@ -119,7 +109,7 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
             # Look for comma or bullet separated lists in these sections
             for skill_phrase in re.split(r',|\n|•|-|;|\|', skill_section):
                 skill_phrase = skill_phrase.strip()
-                if 2 <= len(skill_phrase.split()) <= 3 and skill_phrase and not any(generic == skill_phrase for generic in generic_terms):
+                if 2 <= len(skill_phrase.split()) <= 3 and skill_phrase and skill_phrase not in generic_terms:
                     # Check if it contains at least one technical indicator
                     if any(tech_word in skill_phrase for tech_word in ["framework", "language", "stack", "api", "sdk", "library"]):
                         extracted_skills_with_confidence[skill_phrase] = 2
@@ -128,40 +118,7 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
     # 5. SPECIAL STEP: Direct check for explicitly mentioned skills
     # This step ensures we don't miss important skills due to regex issues
 
-    critical_skills = [
-    "c++", "c#", ".net", "asp.net", "node.js", "vue.js", "react.js", 
-    "typescript", "javascript", "python", "java", "golang", "ruby",
-    "tensorflow", "pytorch", "opencv", "docker", "kubernetes", "aws",
-    "azure", "gcp", "sql", "nosql", "mongodb", "postgresql", 
-    "python", "java", "javascript", "js", "typescript", "ts", "c++", "c#", "ruby", "php", "swift", 
-    "kotlin", "go", "rust", "scala", "dart", "perl", "r", "matlab", "sql", "nosql", "mongodb", 
-    "postgresql", "mysql", "oracle", "sql server", "cassandra", "redis", "elasticsearch", 
-    "dynamodb", "firebase", "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "k8s",
-    "jenkins", "gitlab", "github", "bitbucket", "terraform", "ansible", "puppet", "chef",
-    "react", "angular", "vue", "nextjs", "nodejs", "express", "django", "flask", "spring", 
-    "laravel", "rails", "asp.net", "html", "css", "sass", "less", "bootstrap", "tailwind",
-    "jquery", "redux", "graphql", "rest", "soap", "oauth", "jwt", "machine learning", "ml",
-    "artificial intelligence", "ai", "deep learning", "dl", "natural language processing", "nlp",
-    "computer vision", "cv", "data science", "big data", "hadoop", "spark", "kafka", "tableau",
-    "power bi", "looker", "qlik", "excel", "vba", "linux", "unix", "windows", "macos", "ios", 
-    "android", "flutter", "react native", "xamarin", "cordova", "unity", "unreal", "blender",
-    "maya", "photoshop", "illustrator", "figma", "sketch", "adobe xd", "ui", "ux", "agile", 
-    "scrum", "kanban", "jira", "confluence", "trello", "slack", "teams", "zoom", "git", "svn", 
-    "mercurial", "cicd", "devops", "sre", "security", "penetration testing", "pen testing", 
-    "ethical hacking", "cybersecurity", "blockchain", "ethereum", "solidity", "smart contracts",
-    "crypto", "cryptocurrency", "nft", "web3", "serverless", "microservices", "soa", "apigateway"
-    ]
-    
-    # Add variations of skills with special characters
-    variations = {
-        "c++": ["c plus plus", "cplusplus", "c-plus-plus"],
-        "c#": ["c sharp", "csharp", "c-sharp"],
-        "node.js": ["node js", "nodejs"],
-        "vue.js": ["vue js", "vuejs"],
-        "react.js": ["react js", "reactjs"]
-    }
-    
-    for skill in critical_skills:
+    for skill in taxonomy.critical_skills:
         # Check for the skill itself
         if skill.lower() in text.lower():
             if skill not in extracted_skills:
@@ -169,8 +126,8 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
                 extracted_skills_with_confidence[skill] = 3  # High confidence for explicit mentions
                             
         # Check for variations if they exist
-        if skill in variations:
-            for variant in variations[skill]:
+        if skill in taxonomy.variations:
+            for variant in taxonomy.variations[skill]:
                 if variant.lower() in text.lower():
                     if skill not in extracted_skills:
                         extracted_skills.add(skill)
@@ -179,47 +136,6 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
     # 6. Skill mapping and normalization
     
     cleaned_skills = []
-    skill_mapping = {
-        "js": "javascript",
-        "ts": "typescript",
-        "k8s": "kubernetes",
-        "ml": "machine learning",
-        "ai": "artificial intelligence",
-        "dl": "deep learning",
-        "nlp": "natural language processing",
-        "cv": "computer vision",
-        "react.js": "react",
-        "reactjs": "react",
-        "vue.js": "vue",
-        "node.js": "nodejs",
-        "golang": "go",
-        "dotnet": ".net",
-        "postgres": "postgresql",
-        "aws cloud": "aws",
-        "amazon web services": "aws",
-        "microsoft azure": "azure",
-        "google cloud platform": "gcp",
-        "tensorflow": "tensorflow",
-        "opencv": "opencv",
-        "c plus plus": "c++",
-        "cplusplus": "c++",
-        "c-plus-plus": "c++",
-        "c sharp": "c#",
-        "csharp": "c#",
-        "c-sharp": "c#",
-        "objective c": "objective-c",
-        "objective-c": "objective-c"
-    }
-    
-    # Add plural to singular mapping
-    plural_mapping = {}
-    for skill in common_skills:
-        if skill.endswith('s') and skill[:-1] in common_skills:
-            plural_mapping[skill] = skill[:-1]
-        elif not skill.endswith('s'):
-            plural_mapping[f"{skill}s"] = skill
-    
-    skill_mapping.update(plural_mapping)
     
     # Sort skills by confidence score
     sorted_skills = sorted(
@@ -230,7 +146,7 @@ def extract_skills_from_text(text, common_skills=COMMON_TECH_SKILLS):
     
     # Keep only skills with sufficient confidence or that are in common skills list
     for skill, confidence in sorted_skills:
-        if confidence >= 2 or skill in common_skills:
+        if confidence >= 2 or skill in common_skill_set:
             # Map abbreviations and variants to standard names
             mapped_skill = skill_mapping.get(skill, skill)
             
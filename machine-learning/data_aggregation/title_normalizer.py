@@ -0,0 +1,286 @@
+"""
+Job title standardization shared by the job market analysis scripts.
+
+standardize_title (data_aggregation.py, skill_parse.py) and
+standardize_job_title (role_consolidator.py) run on precompiled patterns; the
+role pattern table is compiled into a single alternation with one named group
+per role. TitleNormalizer applies either of them to a whole title column by
+factorizing it, standardizing each distinct title once and mapping the results
+back through the codes, and keeps an LRU cache for one-title-at-a-time use.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_SIZE = 65536
+
+# Words left lowercase when capitalizing titles
+LOWERCASE_WORDS = frozenset(['and', 'or', 'the', 'in', 'on', 'at', 'for'])
+
+# Parenthetical departments kept in standardized titles
+DEPARTMENTS_TO_KEEP = ["orion", "starlink", "components"]
+
+# Remote/location designations
+_REMOTE_SUFFIX = re.compile(r'\s*-\s*.*remote.*', re.IGNORECASE)
+_REMOTE_PARENTHETICAL = re.compile(r'\s*\(.*remote.*\)', re.IGNORECASE)
+_REMOTE_WORD = re.compile(r'\s*remote\s*', re.IGNORECASE)
+
+# Roman numeral levels
+_LEVEL_I = re.compile(r'\bi+\b')
+_LEVEL_II = re.compile(r'\bii+\b')
+_LEVEL_III = re.compile(r'\biii+\b')
+
+_PARENTHETICAL = re.compile(r'\s*\((.*?)\)')
+_PARENTHETICAL_ALL = re.compile(r'\s*\(.*?\)')
+
+# Prefixes removed by standardize_job_title
+_JOB_ID_PREFIX = re.compile(r'^#\d+\s*-\s*')
+_USA_TAG = re.compile(r'\(USA\)\s*')
+_YEAR_PREFIX = re.compile(r'\d{4}\s+')  # Year prefixes like "2025 "
+_TRAILING_DETAILS = re.compile(r'[\(\,].*$')
+
+# Pattern-based role standardization for standardize_job_title, in priority order
+ROLE_PATTERNS = [
+    # Software Engineering roles
+    (r'(^|[^\w])(sr\.?\s*|senior\s+|junior\s+|jr\.?\s*|associate\s+|staff\s+)?software\s*(engineer|developer)(\s+i+)?', 'Software Engineer'),
+
+    # Data Science roles
+    (r'(^|[^\w])(sr\.?\s*|senior\s+|junior\s+|jr\.?\s*|associate\s+|staff\s+)?data\s+scientist(\s+i+)?', 'Data Scientist'),
+
+    # Data Engineering roles
+    (r'(^|[^\w])(sr\.?\s*|senior\s+|junior\s+|jr\.?\s*|associate\s+|staff\s+)?data\s+engineer(\s+i+)?', 'Data Engineer'),
+
+    # Full Stack roles
+    (r'(^|[^\w])(full\s*stack|fullstack)(\s+(engineer|developer|web\s*developer))?', 'Full Stack Developer'),
+
+    # Frontend roles
+    (r'(^|[^\w])(front\s*end|frontend)(\s+(engineer|developer|web\s*developer))?', 'Frontend Developer'),
+
+    # Backend roles
+    (r'(^|[^\w])(back\s*end|backend)(\s+(engineer|developer|web\s*developer))?', 'Backend Developer'),
+
+    # Web Developer roles
+    (r'(^|[^\w])(sr\.?\s*|senior\s+|junior\s+|jr\.?\s*)?web\s+(developer|engineer)', 'Web Developer'),
+
+    # AI/ML Engineering roles
+    (r'(^|[^\w])(ai(\s+&\s+|\s+and\s+|\s+)ml|machine\s+learning|artificial\s*intelligence)(\s+(engineer|developer))?', 'AI/ML Engineer'),
+
+    # Machine Learning roles
+    (r'(^|[^\w])(sr\.?\s*|senior\s+|junior\s+|jr\.?\s*|associate\s+|staff\s+)?machine\s+learning(\s+(engineer|scientist))?', 'Machine Learning Engineer'),
+
+    # Research Scientist roles
+    (r'(^|[^\w])(research\s+scientist|ai\s+researcher)', 'Research Scientist'),
+
+    # Data Analyst roles
+    (r'(^|[^\w])(sr\.?\s*|senior\s+|junior\s+|jr\.?\s*|associate\s+)?data\s+analyst', 'Data Analyst'),
+
+    # DevOps/SRE roles
+    (r'(^|[^\w])(devops|site\s+reliability)(\s+engineer)?', 'DevOps Engineer'),
+
+    # JavaScript/React Developer roles
+    (r'(^|[^\w])(react|javascript)(\s+developer|\s+engineer)', 'JavaScript/React Developer'),
+]
+
+
+def compile_role_patterns(role_patterns):
+    """
+    Compile (pattern, role) pairs into one regex with a named group per role
+    pattern, plus a group name -> role lookup. Each alternative is a lookahead
+    anchored at the start of the title, so the alternatives are tried in
+    order and the first pattern found anywhere in the title wins, exactly as
+    when searching for each pattern in turn.
+    """
+    alternatives = []
+    roles = {}
+    for i, (pattern, role_name) in enumerate(role_patterns):
+        group = f"role{i}"
+        alternatives.append(f"(?P<{group}>(?=.*?(?:{pattern})))")
+        roles[group] = role_name
+    return re.compile(r'^(?:' + '|'.join(alternatives) + ')', re.IGNORECASE | re.DOTALL), roles
+
+
+_ROLE_PATTERN, _ROLE_NAMES = compile_role_patterns(ROLE_PATTERNS)
+
+
+def capitalize_title(title):
+    """Capitalize each word except short connecting words."""
+    return ' '.join(word.capitalize() if word not in LOWERCASE_WORDS else word for word in title.split())
+
+
+def standardize_title(title):
+    """Standardize a job title to a role name, keeping seniority levels for common roles."""
+    if not isinstance(title, str):
+        return "Unknown Role"
+
+    # Convert to lowercase initially for better matching
+    title = title.lower()
+
+    # Remove remote/location designations
+    title = _REMOTE_SUFFIX.sub('', title)
+    title = _REMOTE_PARENTHETICAL.sub('', title)
+    title = _REMOTE_WORD.sub('', title)
+
+    # Standardize common variations
+    title = title.replace("front-end", "frontend")
+    title = title.replace("front end", "frontend")
+    title = title.replace("back-end", "backend")
+    title = title.replace("back end", "backend")
+    title = title.replace("full-stack", "full stack")
+    title = title.replace("fullstack", "full stack")
+
+    # Create standard categories
+    if "software engineer" in title:
+        # Handle levels for Software Engineer: collapse level I to default
+        if _LEVEL_II.search(title):  # Roman numeral II
+            title = "software engineer ii"
+        elif _LEVEL_III.search(title):  # Roman numeral III
+            title = "software engineer iii"
+        elif "senior" in title or "sr" in title:
+            title = "senior software engineer"
+        elif "junior" in title or "jr" in title:
+            title = "junior software engineer"
+        elif "staff" in title or "principal" in title:
+            title = "staff software engineer"
+        elif "associate" in title:
+            title = "associate software engineer"
+        else:
+            # This covers Software Engineer I and the default case
+            title = "software engineer"
+
+    elif "data scientist" in title:
+        # Handle levels for Data Scientist: collapse level I to default
+        if _LEVEL_II.search(title):
+            title = "data scientist ii"
+        elif _LEVEL_III.search(title):
+            title = "data scientist iii"
+        elif "senior" in title or "sr" in title:
+            title = "senior data scientist"
+        elif "junior" in title or "jr" in title:
+            title = "junior data scientist"
+        elif "staff" in title or "principal" in title:
+            title = "staff data scientist"
+        elif "associate" in title:
+            title = "associate data scientist"
+        else:
+            title = "data scientist"
+
+    elif "data engineer" in title:
+        if _LEVEL_I.search(title):
+            title = "data engineer"
+        elif _LEVEL_II.search(title):
+            title = "data engineer ii"
+        elif _LEVEL_III.search(title):
+            title = "data engineer iii"
+        elif "senior" in title or "sr" in title:
+            title = "senior data engineer"
+        elif "junior" in title or "jr" in title:
+            title = "junior data engineer"
+        elif "staff" in title or "principal" in title:
+            title = "staff data engineer"
+        elif "associate" in title:
+            title = "associate data engineer"
+        else:
+            title = "data engineer"
+
+    elif "web developer" in title:
+        if "frontend" in title or "front" in title:
+            title = "frontend web developer"
+        elif "backend" in title or "back" in title:
+            title = "backend web developer"
+        elif "full stack" in title:
+            title = "full stack web developer"
+        elif "senior" in title or "sr" in title:
+            title = "senior web developer"
+        elif "junior" in title or "jr" in title:
+            title = "junior web developer"
+        else:
+            title = "web developer"
+
+    elif "machine learning" in title:
+        if "senior" in title or "sr" in title:
+            title = "senior machine learning engineer"
+        elif "junior" in title or "jr" in title:
+            title = "junior machine learning engineer"
+        elif "scientist" in title:
+            title = "machine learning scientist"
+        else:
+            title = "machine learning engineer"
+
+    # Remove trailing commas and what follows
+    if "," in title:
+        title = title.split(",")[0]
+
+    # Remove parenthetical additions except for certain departments
+    match = _PARENTHETICAL.search(title)
+    if match and match.group(1).lower() not in DEPARTMENTS_TO_KEEP:
+        title = _PARENTHETICAL_ALL.sub('', title)
+
+    # Properly capitalize
+    return capitalize_title(title).strip()
+
+
+def standardize_job_title(title):
+    """Standardize job titles to consolidate similar roles (role_consolidator.py)."""
+    if not isinstance(title, str):
+        return "Unknown Role"
+
+    # Clean and normalize title
+    title = title.lower()
+
+    # Remove job IDs, locations and other prefixes
+    title = _JOB_ID_PREFIX.sub('', title)
+    title = _USA_TAG.sub('', title)
+    title = _YEAR_PREFIX.sub('', title)
+
+    # Match all role patterns at once; the named group tells which one matched
+    match = _ROLE_PATTERN.match(title)
+    if match:
+        return _ROLE_NAMES[match.lastgroup]
+
+    # If no specific match, return a cleaned version of the original title
+    simplified = _TRAILING_DETAILS.sub('', title).strip()
+
+    # Capitalize properly
+    return capitalize_title(simplified)
+
+
+class TitleNormalizer:
+    """Applies a title standardization function once per distinct title."""
+
+    def __init__(self, standardize, cache_size=DEFAULT_CACHE_SIZE):
+        self.standardize = standardize
+        self._cached = lru_cache(maxsize=cache_size)(standardize)
+
+    def __call__(self, title):
+        """Standardize a single title through the LRU cache (for streaming use)."""
+        try:
+            return self._cached(title)
+        except TypeError:  # Unhashable value
+            return self.standardize(title)
+
+    def standardize_column(self, titles):
+        """
+        Standardize a Series of titles: factorize it, standardize each unique
+        title once and broadcast the results back to the rows.
+        """
+        titles = pd.Series(titles)
+        codes, uniques = pd.factorize(titles)
+        # Missing titles get code -1, which picks the last entry
+        results = np.array(
+            [self(title) for title in uniques] + [self.standardize(None)], dtype=object
+        )
+        return pd.Series(results[codes], index=titles.index, name=titles.name)
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def cache_clear(self):
+        self._cached.cache_clear()
+
+
+# Shared normalizers for the two standardization schemes
+TITLE_NORMALIZER = TitleNormalizer(standardize_title)
+JOB_TITLE_NORMALIZER = TitleNormalizer(standardize_job_title)
@@ -0,0 +1,247 @@
+"""
+Pre-tokenized store of the aggregated job descriptions.
+
+Keeps every description as token ids in one flat int32 array (tokens.npy,
+memory-mapped on load) with per-posting offsets, plus the token vocabulary,
+each posting's key, role, industry and salary, and the skill search terms the
+stored Roles and Skills documents were built with. When the skill taxonomy
+changes, only the new or changed skills are looked up in the token arrays,
+which takes a vectorized pass per phrase instead of re-running NLP on every
+posting.
+
+Files in the store directory:
+    tokens.npy        token ids of all descriptions, concatenated
+    spacing.npy       whether each token follows whitespace
+    offsets.npy       start of each posting in tokens.npy (plus the end)
+    salaries.npy      calculated salary per posting (NaN if none)
+    vocabulary.json   token for each id
+    postings.json     key (title, company, url), role and industry per posting
+    skills.json       skill name -> search terms at the time of the last scan
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Words and single punctuation characters, so phrases like "c++" or
+# "node.js" are token sequences and matches respect word boundaries
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+WORD_TOKEN = re.compile(r'\w')
+
+# Fields of a job posting's key in the JobPostings collection
+POSTING_KEY_FIELDS = ('title', 'company', 'url')
+
+
+def tokenize_with_spacing(text):
+    """(tokens, whether each token follows whitespace) of a lowercased text."""
+    if not isinstance(text, str):
+        return [], []
+    text = text.lower()
+    tokens = []
+    spacing = []
+    for match in TOKEN_PATTERN.finditer(text):
+        tokens.append(match.group())
+        spacing.append(match.start() > 0 and text[match.start() - 1].isspace())
+    return tokens, spacing
+
+
+def _json_value(value):
+    return value if isinstance(value, str) else None
+
+
+class TokenStoreBuilder:
+    """
+    Tokenizes job postings as they are added, e.g. one CSV chunk at a time,
+    so only the token id arrays are kept rather than the descriptions.
+    """
+
+    def __init__(self):
+        self.token_index = {}
+        self.token_chunks = []
+        self.spacing_chunks = []
+        self.lengths = []
+        self.keys = []
+        self.roles = []
+        self.industries = []
+        self.salaries = []
+
+    @classmethod
+    def from_store(cls, store):
+        """A builder holding the postings of an existing store, to add more to."""
+        builder = cls()
+        builder.token_index = dict(store.token_index)
+        builder.token_chunks.append(np.asarray(store.tokens, dtype=np.int32))
+        builder.spacing_chunks.append(np.asarray(store.spacing, dtype=bool))
+        builder.lengths.extend(np.diff(store.offsets).tolist())
+        builder.keys = None if store.keys is None else list(store.keys)
+        builder.roles.extend(store.roles)
+        builder.industries.extend(store.industries)
+        builder.salaries.extend(store.salaries.tolist())
+        return builder
+
+    def add(self, job_postings):
+        tokenized = [tokenize_with_spacing(posting.get('description')) for posting in job_postings]
+        self.lengths.extend(len(tokens) for tokens, _ in tokenized)
+
+        # One factorize per batch; its uniques get ids in order of first appearance overall
+        codes, uniques = pd.factorize(pd.Series([token for tokens, _ in tokenized for token in tokens], dtype=object))
+        ids = np.fromiter((self.token_index.setdefault(token, len(self.token_index)) for token in uniques),
+                          dtype=np.int32, count=len(uniques))
+        self.token_chunks.append(ids[codes])
+        self.spacing_chunks.append(
+            np.fromiter((spaced for _, flags in tokenized for spaced in flags), dtype=bool, count=len(codes))
+        )
+
+        for posting in job_postings:
+            salary = posting.get('calculated_salary')
+            if self.keys is not None:
+                self.keys.append([_json_value(posting.get(field)) for field in POSTING_KEY_FIELDS])
+            self.roles.append(_json_value(posting.get('role')))
+            self.industries.append(_json_value(posting.get('industry')))
+            self.salaries.append(np.nan if salary is None else salary)
+
+    def build(self, skill_terms):
+        offsets = np.zeros(len(self.lengths) + 1, dtype=np.int64)
+        np.cumsum(np.asarray(self.lengths, dtype=np.int64), out=offsets[1:])
+        tokens = np.concatenate(self.token_chunks) if self.token_chunks else np.array([], dtype=np.int32)
+        spacing = np.concatenate(self.spacing_chunks) if self.spacing_chunks else np.array([], dtype=bool)
+        return TokenStore(tokens, spacing, offsets, list(self.token_index), self.roles, self.industries,
+                          self.salaries, skill_terms, self.keys)
+
+
+class TokenStore:
+    """
+    Token id arrays of the postings, with their metadata and scanned skill
+    terms. keys is None for stores written before posting keys were kept.
+    """
+
+    def __init__(self, tokens, spacing, offsets, vocabulary, roles, industries, salaries, skill_terms, keys=None):
+        self.tokens = tokens
+        self.spacing = spacing
+        self.offsets = offsets
+        self.vocabulary = list(vocabulary)
+        self.token_index = {token: i for i, token in enumerate(self.vocabulary)}
+        self.keys = None if keys is None else list(keys)
+        self.roles = list(roles)
+        self.industries = list(industries)
+        self.salaries = np.asarray(salaries, dtype=np.float64)
+        self.skill_terms = dict(skill_terms)
+
+        # Vocabulary as a Series for substring lookups, built on first use
+        self._vocabulary_series = None
+
+    @classmethod
+    def from_postings(cls, job_postings, skill_terms):
+        """Tokenize the descriptions of aggregated job postings."""
+        builder = TokenStoreBuilder()
+        builder.add(job_postings)
+        return builder.build(skill_terms)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _find_sequence(self, candidates, spacing):
+        """
+        Sorted indices of the postings with a run of tokens where the k-th
+        token id is one of candidates[k] and, after the first, follows
+        whitespace exactly when spacing[k] does.
+        """
+        span = len(candidates)
+        if not span or any(len(ids) == 0 for ids in candidates) or span > len(self.tokens):
+            return np.array([], dtype=np.int64)
+
+        positions = np.flatnonzero(np.isin(self.tokens[:len(self.tokens) - span + 1], candidates[0]))
+        for k, ids in enumerate(candidates[1:], 1):
+            positions = positions[np.isin(self.tokens[positions + k], ids) &
+                                  (self.spacing[positions + k] == spacing[k])]
+
+        # Drop matches that run past the end of their posting
+        postings = np.searchsorted(self.offsets, positions, side='right') - 1
+        postings = postings[positions + span <= self.offsets[postings + 1]]
+        return np.unique(postings)
+
+    def find(self, phrase):
+        """Postings whose description contains the phrase as whole tokens."""
+        tokens, spacing = tokenize_with_spacing(phrase)
+        ids = [self.token_index.get(token) for token in tokens]
+        return self._find_sequence([[token_id] if token_id is not None else [] for token_id in ids], spacing)
+
+    def find_substring(self, phrase):
+        """
+        Postings whose description contains the phrase anywhere, including
+        inside longer words: the first token may be the end of a word, the
+        last the start of one, and a single token any part of one.
+        """
+        tokens, spacing = tokenize_with_spacing(phrase)
+        if self._vocabulary_series is None:
+            self._vocabulary_series = pd.Series(self.vocabulary, dtype=object)
+        vocabulary = self._vocabulary_series.str
+
+        candidates = []
+        for k, token in enumerate(tokens):
+            first, last = k == 0, k == len(tokens) - 1
+            if not WORD_TOKEN.match(token) or not (first or last):
+                token_id = self.token_index.get(token)
+                candidates.append([token_id] if token_id is not None else [])
+            elif first and last:
+                candidates.append(np.flatnonzero(vocabulary.contains(token, regex=False)))
+            elif first:
+                candidates.append(np.flatnonzero(vocabulary.endswith(token)))
+            else:
+                candidates.append(np.flatnonzero(vocabulary.startswith(token)))
+        return self._find_sequence(candidates, spacing)
+
+    def find_skill(self, terms):
+        """Sorted indices of the postings matching any of a skill's search terms (see SkillTaxonomy.search_terms)."""
+        found = [self.find(phrase) for phrase in terms.get('words', [])]
+        found += [self.find_substring(phrase) for phrase in terms.get('substrings', [])]
+        return np.unique(np.concatenate(found)) if found else np.array([], dtype=np.int64)
+
+    def changed_skills(self, skill_terms):
+        """Skills of skill_terms that are new or whose search terms changed since the last scan."""
+        return [skill for skill, phrases in skill_terms.items() if self.skill_terms.get(skill) != phrases]
+
+    def removed_skills(self, skill_terms):
+        """Skills scanned for last time that are no longer in skill_terms."""
+        return [skill for skill in self.skill_terms if skill not in skill_terms]
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'tokens.npy'), self.tokens)
+        np.save(os.path.join(path, 'spacing.npy'), self.spacing)
+        np.save(os.path.join(path, 'offsets.npy'), self.offsets)
+        np.save(os.path.join(path, 'salaries.npy'), self.salaries)
+        with open(os.path.join(path, 'vocabulary.json'), 'w') as f:
+            json.dump(self.vocabulary, f)
+        with open(os.path.join(path, 'postings.json'), 'w') as f:
+            postings = {'roles': self.roles, 'industries': self.industries}
+            if self.keys is not None:
+                postings['keys'] = self.keys
+            json.dump(postings, f)
+        self.save_skill_terms(path)
+
+    def save_skill_terms(self, path):
+        """Record the skill terms the database now reflects."""
+        with open(os.path.join(path, 'skills.json'), 'w') as f:
+            json.dump(self.skill_terms, f, indent=1, sort_keys=True)
+
+    @classmethod
+    def load(cls, path):
+        """Open a store written by save(); the token arrays are memory-mapped."""
+        with open(os.path.join(path, 'vocabulary.json')) as f:
+            vocabulary = json.load(f)
+        with open(os.path.join(path, 'postings.json')) as f:
+            postings = json.load(f)
+        with open(os.path.join(path, 'skills.json')) as f:
+            skill_terms = json.load(f)
+        return cls(
+            np.load(os.path.join(path, 'tokens.npy'), mmap_mode='r'),
+            np.load(os.path.join(path, 'spacing.npy'), mmap_mode='r'),
+            np.load(os.path.join(path, 'offsets.npy')),
+            vocabulary, postings['roles'], postings['industries'],
+            np.load(os.path.join(path, 'salaries.npy')),
+            skill_terms, postings.get('keys')
+        )
@@ -1,7 +1,12 @@
+import os
+import sys
 import pandas as pd
 import re
 
-data = pd.read_csv('linkedin_jobs_filtered.csv')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_aggregation'))
+from dataset_loader import read_dataset
+
+data = read_dataset('linkedin_jobs_filtered.csv', columns=['title', 'company', 'location', 'date', 'job_description'])
 data.rename(columns={'date': 'posting_date'}, inplace=True)  
 
 def extract_salary(description):
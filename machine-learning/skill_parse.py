@@ -1,7 +1,15 @@
+import os
 import sys
+import numpy as np
 import pandas as pd
 import re
-from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_aggregation'))
+from dataset_loader import dataset_columns, read_dataset
+from salary_normalizer import clean_salary_column, filter_salary_outliers
+from skill_matrix import SkillMatrix
+from skill_taxonomy import skill_catalog
+from title_normalizer import TITLE_NORMALIZER
 
 print("Starting Tech Skill Extraction and Matching Script...")
 
@@ -12,7 +20,9 @@ if len(sys.argv) != 2:
 csv_path = sys.argv[1]
 
 try:
-    df = pd.read_csv(csv_path)
+    # Only the columns used below: titles, descriptions and salaries
+    columns = dataset_columns(csv_path)
+    df = read_dataset(csv_path, columns=[col for col in columns if col in ('title', 'job_description') or 'salary' in col.lower()])
     print(f"Successfully loaded CSV file: {csv_path}")
 except Exception as e:
     print(f"Error loading CSV file: {e}")
@@ -22,156 +32,13 @@ if 'job_description' not in df.columns or 'title' not in df.columns:
     print("Error: 'job_description' or 'title' column not found in CSV.")
     sys.exit(1)
 
-# Define tech skills list with special handling for ambiguous skills
-tech_skills = [
-    'HTML', 'CSS', 'JavaScript', 'TypeScript', 'React', 'Angular', 'Vue.js', 'Svelte', 'jQuery', 'Bootstrap', 
-    'Tailwind CSS', 'Material UI', 'Redux', 'MobX', 'React Router', 'Webpack', 'Babel', 'ESLint', 'Prettier', 
-    'Jest', 'Mocha', 'Chai', 'Enzyme', 'Cypress', 'React Testing Library', 'Selenium', 'Puppeteer', 'Node.js', 
-    'Express.js', 'NestJS', 'Fastify', 'Koa', 'Hapi', 'Django', 'Flask', 'Ruby on Rails', 'Laravel', 
-    'Spring Boot', 'ASP.NET Core', 'Phoenix', 'FastAPI', 'Symfony', 'CodeIgniter', 'PostgreSQL', 'MySQL', 
-    'SQLite', 'Oracle Database', 'Microsoft SQL Server', 'MongoDB', 'Redis', 'Cassandra', 'DynamoDB', 'Firebase', 
-    'Elasticsearch', 'Neo4j', 'CouchDB', 'InfluxDB', 'MariaDB', 'RabbitMQ', 'Kafka', 'GraphQL', 'REST API', 
-    'SOAP', 'gRPC', 'WebSockets', 'OAuth', 'JWT', 'SAML', 'Microservices', 'Docker', 'Kubernetes', 
-    'Docker Compose', 'Podman', 'AWS', 'Azure', 'Google Cloud Platform', 'Heroku', 'DigitalOcean', 'Netlify', 
-    'Vercel', 'AWS Lambda', 'Azure Functions', 'Google Cloud Functions', 'AWS S3', 'AWS EC2', 'AWS RDS', 
-    'AWS DynamoDB', 'Azure Blob Storage', 'Firebase Hosting', 'GitHub Actions', 'Jenkins', 'CircleCI', 
-    'Travis CI', 'TeamCity', 'GitLab CI/CD', 'ArgoCD', 'Ansible', 'Terraform', 'Pulumi', 'CloudFormation', 
-    'Chef', 'Puppet', 'Git', 'GitHub', 'GitLab', 'Bitbucket', 'SVN', 'Linux', 'Unix', 'Windows Server', 
-    'Bash scripting', 'PowerShell', 'Python', 'Java', 'C#', 'Rust', 'C++', 'PHP', 'Ruby', 'Swift', 
-    'Kotlin', 'Scala', 'Elixir', 'Haskell', 'Clojure', 'Groovy', 'Perl', 'Dart', 'Objective-C', 'MATLAB', 
-    'Assembly', 'Solidity', 'WebAssembly', 'SQL', 'PL/SQL', 'T-SQL', 'Apache Spark', 'Apache Hadoop', 
-    'Apache Airflow', 'Apache Beam', 'Apache Kafka', 'Elasticsearch', 'Logstash', 'Kibana', 'Prometheus', 
-    'Grafana', 'Datadog', 'New Relic', 'Splunk', 'Jaeger', 'Zipkin', 'OpenTelemetry', 'Pandas', 'NumPy', 
-    'TensorFlow', 'PyTorch', 'scikit-learn', 'Keras', 'NLTK', 'OpenCV', 'Matplotlib', 'Jupyter', 'Dask', 
-    'Snowflake', 'BigQuery', 'Redshift', 'Databricks', 'Data Warehousing', 'ETL pipelines', 
-    'Continuous Integration', 'Continuous Deployment', 'Infrastructure as Code', 'DevOps', 'SRE', 
-    'Agile methodologies', 'Scrum', 'Kanban', 'Test-Driven Development', 'Behavior-Driven Development', 
-    'Machine Learning', 'Natural Language Processing', 'Computer Vision', 'AI', 'Artificial Intelligence', 
-    'LLM', 'Large Language Models', 'GenAI', 'Generative AI', 'Deep Learning'
-]
-
-# Special case skills that need word boundary checks
-special_case_skills = ['C', 'R', 'Go', 'D', 'J']
+# Tech skills list and ambiguous skills that need special handling, from the shared taxonomy
+tech_skills, special_case_skills = map(list, skill_catalog('skill_parse'))
 
 print(f"Tech skills list loaded with {len(tech_skills)} skills.")
 
-# Function to standardize job titles to avoid duplicates
-def standardize_title(title):
-    if not isinstance(title, str):
-        return "Unknown Role"
-        
-    # Convert to lowercase initially for better matching
-    title = title.lower()
-    
-    # Remove remote/location designations
-    title = re.sub(r'\s*-\s*.*remote.*', '', title, flags=re.IGNORECASE)
-    title = re.sub(r'\s*\(.*remote.*\)', '', title, flags=re.IGNORECASE)
-    title = re.sub(r'\s*remote\s*', '', title, flags=re.IGNORECASE)
-    
-    # Standardize common variations
-    title = title.replace("front-end", "frontend")
-    title = title.replace("front end", "frontend")
-    title = title.replace("back-end", "backend")
-    title = title.replace("back end", "backend")
-    title = title.replace("full-stack", "full stack")
-    title = title.replace("fullstack", "full stack")
-    
-    # Create standard categories
-    if "software engineer" in title:
-        # Handle levels for Software Engineer: collapse level I to default
-        if re.search(r'\bii+\b', title):  # Roman numeral II
-            title = "software engineer ii"
-        elif re.search(r'\biii+\b', title):  # Roman numeral III
-            title = "software engineer iii"
-        elif "senior" in title or "sr" in title:
-            title = "senior software engineer"
-        elif "junior" in title or "jr" in title:
-            title = "junior software engineer"
-        elif "staff" in title or "principal" in title:
-            title = "staff software engineer"
-        elif "associate" in title:
-            title = "associate software engineer"
-        else:
-            # This covers Software Engineer I and the default case
-            title = "software engineer"
-    
-    elif "data scientist" in title:
-        # Handle levels for Data Scientist: collapse level I to default
-        if re.search(r'\bii+\b', title):
-            title = "data scientist ii"
-        elif re.search(r'\biii+\b', title):
-            title = "data scientist iii"
-        elif "senior" in title or "sr" in title:
-            title = "senior data scientist"
-        elif "junior" in title or "jr" in title:
-            title = "junior data scientist"
-        elif "staff" in title or "principal" in title:
-            title = "staff data scientist"
-        elif "associate" in title:
-            title = "associate data scientist"
-        else:
-            title = "data scientist"
-            
-    elif "data engineer" in title:
-        if re.search(r'\bi+\b', title):
-            title = "data engineer"
-        elif re.search(r'\bii+\b', title):
-            title = "data engineer ii"
-        elif re.search(r'\biii+\b', title):
-            title = "data engineer iii"
-        elif "senior" in title or "sr" in title:
-            title = "senior data engineer"
-        elif "junior" in title or "jr" in title:
-            title = "junior data engineer"
-        elif "staff" in title or "principal" in title:
-            title = "staff data engineer"
-        elif "associate" in title:
-            title = "associate data engineer"
-        else:
-            title = "data engineer"
-    
-    elif "web developer" in title:
-        if "frontend" in title or "front" in title:
-            title = "frontend web developer"
-        elif "backend" in title or "back" in title:
-            title = "backend web developer"
-        elif "full stack" in title:
-            title = "full stack web developer"
-        elif "senior" in title or "sr" in title:
-            title = "senior web developer"
-        elif "junior" in title or "jr" in title:
-            title = "junior web developer"
-        else:
-            title = "web developer"
-    
-    elif "machine learning" in title:
-        if "senior" in title or "sr" in title:
-            title = "senior machine learning engineer"
-        elif "junior" in title or "jr" in title:
-            title = "junior machine learning engineer"
-        elif "scientist" in title:
-            title = "machine learning scientist"
-        else:
-            title = "machine learning engineer"
-    
-    # Remove trailing commas and what follows
-    if "," in title:
-        title = title.split(",")[0]
-    
-    # Remove parenthetical additions except for certain departments
-    departments_to_keep = ["orion", "starlink", "components"]
-    match = re.search(r'\s*\((.*?)\)', title)
-    if match and match.group(1).lower() not in departments_to_keep:
-        title = re.sub(r'\s*\(.*?\)', '', title)
-    
-    # Properly capitalize
-    title = ' '.join(word.capitalize() if word not in ['and', 'or', 'the', 'in', 'on', 'at', 'for'] 
-                     else word for word in title.split())
-    
-    return title.strip()
-
-# Apply standardization to job titles
-df['standardized_title'] = df['title'].apply(standardize_title)
+# Apply standardization to job titles (each distinct title is standardized once)
+df['standardized_title'] = TITLE_NORMALIZER.standardize_column(df['title'])
 print(f"Standardized {len(df['title'].unique())} job titles to {len(df['standardized_title'].unique())} unique roles.")
 
 # Function to extract mentioned skills from a job description with proper word boundary handling
@@ -218,10 +85,16 @@ def extract_mentioned_skills(description, skill_list, special_cases=special_case
 print("Extracting tech skills from job descriptions...")
 df['mentioned_skills'] = df['job_description'].apply(lambda x: extract_mentioned_skills(x, tech_skills))
 
+# Sparse job x skill matrix (skill ids in first-mentioned order) used for the counts below.
+# The counts are of every match, so a skill the catalog lists twice (Elasticsearch) counts twice
+skill_matrix = SkillMatrix.from_skill_lists(df['mentioned_skills'], roles=df['standardized_title'],
+                                            keep_duplicates=True)
+
 # Get the most common skills across all job descriptions
-all_mentioned_skills = [skill for sublist in df['mentioned_skills'] for skill in sublist]
-skill_counts = Counter(all_mentioned_skills)
-most_common_skills = skill_counts.most_common(50)
+# (stable sort, so ties stay in first-mentioned order)
+skill_counts = skill_matrix.skill_counts()
+most_common_skills = [(skill_matrix.vocabulary[i], int(skill_counts[i]))
+                      for i in np.argsort(-skill_counts, kind='stable')[:50]]
 
 print("\nTop 20 most common tech skills across all job descriptions:")
 for skill, count in most_common_skills[:20]:
@@ -253,23 +126,22 @@ def get_top_skills_by_role(df, top_n=5, min_jobs=3):
     role_counts = df['standardized_title'].value_counts()
     valid_roles = role_counts[role_counts >= min_jobs].index
     
+    # Count skill mentions for every role at once (roles x skills)
+    roles, role_skill_counts = skill_matrix.role_skill_counts()
+    role_rows = {role: i for i, role in enumerate(roles)}
+    
     for role in valid_roles:
-        # Get all job descriptions for this role
-        role_df = df[df['standardized_title'] == role]
-        
-        # Collect all skills mentioned in these job descriptions
-        role_skills_list = [skill for sublist in role_df['mentioned_skills'] for skill in sublist]
-        
-        # Count occurrences of each skill
-        role_skill_counts = Counter(role_skills_list)
+        # Skills mentioned in this role's job descriptions, in first-mentioned order
+        skill_ids = skill_matrix.skills_in_order(np.flatnonzero(skill_matrix.roles == role))
+        counts = role_skill_counts[role_rows[role]].toarray().ravel()[skill_ids]
         
         # Calculate percentage of job postings mentioning each skill
-        total_jobs = len(role_df)
-        role_skill_percentages = {skill: (count / total_jobs * 100) for skill, count in role_skill_counts.items()}
+        total_jobs = role_counts[role]
+        percentages = counts / total_jobs * 100
         
         # Get the top N skills with their percentages
-        top_skills_with_pct = [(skill, pct) for skill, pct in 
-                              sorted(role_skill_percentages.items(), key=lambda x: x[1], reverse=True)[:top_n]]
+        top_skills_with_pct = [(skill_matrix.vocabulary[skill_ids[i]], float(percentages[i]))
+                               for i in np.argsort(-percentages, kind='stable')[:top_n]]
         
         # Add to our dictionary
         role_skills[role] = top_skills_with_pct
@@ -316,99 +188,17 @@ else:
     print(f"Found salary column(s): {', '.join(salary_columns)}")
     salary_col = salary_columns[0]  # Use the first salary column found
     
-    # Replace the existing clean_salary function with this improved version
-    def clean_salary(salary):
-        if not isinstance(salary, str) or pd.isna(salary) or salary == 'NA':
-            return None
-        
-        try:
-            # Convert to lowercase for consistent detection
-            salary_lower = salary.lower()
-            
-            # Skip nonsensical values
-            if any(term in salary_lower for term in ['call', 'contact', 'competitive', 'negotiable']):
-                return None
-            
-            # Determine if hourly or annual
-            is_hourly = 'per hour' in salary_lower or 'hourly' in salary_lower
-            
-            # Extract all numbers from the string
-            import re
-            numbers = re.findall(r'[\d,]+\.?\d*', salary)
-            if not numbers:
-                return None
-                
-            # Clean the extracted numbers
-            cleaned_numbers = []
-            for num in numbers:
-                try:
-                    cleaned_numbers.append(float(num.replace(',', '')))
-                except ValueError:
-                    continue
-            
-            if not cleaned_numbers:
-                return None
-                
-            # Handle salary ranges
-            if len(cleaned_numbers) >= 2:
-                # Take the average of the first two numbers (likely a range)
-                min_val, max_val = cleaned_numbers[0], cleaned_numbers[1]
-                # Ensure min <= max
-                if min_val > max_val:
-                    min_val, max_val = max_val, min_val
-                avg_salary = (min_val + max_val) / 2
-            else:
-                # Just one number found
-                avg_salary = cleaned_numbers[0]
-            
-            # Sanity check for very low values that are likely hourly rates without explicit "per hour"
-            if not is_hourly and avg_salary < 1000:
-                is_hourly = True
-                
-            # Convert hourly to annual (standard 2080 hours per year)
-            if is_hourly:
-                annual_salary = avg_salary * 2080
-            else:
-                annual_salary = avg_salary
-                
-            # Sanity check for reasonable salary range (exclude extreme outliers)
-            if annual_salary < 10000 or annual_salary > 1000000:
-                return None
-                
-            return annual_salary
-                
-        except Exception as e:
-            return None
-
-    # Apply the improved salary cleaning function
-    df['cleaned_salary'] = df[salary_col].apply(clean_salary)
-
-    # Additional outlier removal for better accuracy
-    def remove_salary_outliers(salary_series):
-        if len(salary_series) <= 2:
-            return salary_series
-        
-        # Calculate Q1, Q3 and IQR
-        Q1 = salary_series.quantile(0.25)
-        Q3 = salary_series.quantile(0.75)
-        IQR = Q3 - Q1
-        
-        # Define outlier bounds (more conservative than typical 1.5*IQR)
-        lower_bound = max(25000, Q1 - 1.5 * IQR)  # Minimum reasonable salary
-        upper_bound = min(400000, Q3 + 1.5 * IQR)  # Maximum reasonable salary
-        
-        # Filter out outliers
-        return salary_series[(salary_series >= lower_bound) & (salary_series <= upper_bound)]
+    # Clean the salary text (each distinct value once) into annual salaries
+    df['cleaned_salary'] = clean_salary_column(df[salary_col])
 
     # Apply outlier removal before analyzing
     print(f"\nBefore outlier removal: {df['cleaned_salary'].dropna().count()} salary data points")
-    df['cleaned_salary_filtered'] = df.groupby('standardized_title')['cleaned_salary'].transform(
-        lambda x: x if len(x) <= 10 else remove_salary_outliers(x)
-    )
+    df['cleaned_salary_filtered'] = filter_salary_outliers(df['standardized_title'], df['cleaned_salary'])
     print(f"After outlier removal: {df['cleaned_salary_filtered'].dropna().count()} salary data points")
 
     # Use the filtered salary for all analysis
     df['cleaned_salary'] = df['cleaned_salary_filtered']
+    skill_matrix.salaries = pd.to_numeric(df['cleaned_salary']).to_numpy(dtype=np.float64)
     
     # Calculate salary stats only for non-null values
     salary_data_available = df['cleaned_salary'].notna().sum()
@@ -459,19 +249,18 @@ else:
         print("\nAnalyzing salaries by skill...")
         
         skill_salary_data = []
-        # Get list of all unique skills
-        all_skills = set(skill for sublist in df['mentioned_skills'] for skill in sublist)
+        # Number of jobs with a valid salary per skill, as one sparse product
+        salary_counts, _, _ = skill_matrix.salary_by_skill()
         
-        for skill in all_skills:
-            # Find all jobs that mention this skill
-            skill_jobs = df[df['mentioned_skills'].apply(lambda x: skill in x)]
+        for skill_id in np.flatnonzero(salary_counts >= 3):  # Only include if we have at least 3 data points
+            skill = skill_matrix.vocabulary[skill_id]
             
-            # Get valid salaries for these jobs
-            valid_salaries = skill_jobs['cleaned_salary'].dropna()
+            # Get valid salaries for the jobs that mention this skill
+            valid_salaries = skill_matrix.skill_salaries(skill)
             
-            if len(valid_salaries) >= 3:  # Only include if we have at least 3 data points
+            if len(valid_salaries) >= 3:
                 avg_salary = valid_salaries.mean()
-                median_salary = valid_salaries.median()
+                median_salary = np.median(valid_salaries)
                 job_count = len(valid_salaries)
                 
                 skill_salary_data.append({
@@ -503,6 +292,10 @@ else:
     else:
         print("No valid salary information found in the dataset after cleaning.")
 
+# Save the job x skill matrix with its vocabulary, roles and salaries for later analysis
+skill_matrix.save("skill_matrix.npz")
+print(f"✅ Job/skill matrix saved to 'skill_matrix.npz'")
+
 # Create visualizations if data is available
 print("\nGenerating visualizations based on the collected data...")
 